@@ -0,0 +1,329 @@
+import os
+import json
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Directory holding match_results.csv (defaults to the one this script lives in)
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+MATCH_RESULTS_FILE = "match_results.csv"
+STATE_FILE_NAME = "aggregates_state.json"
+STATE_VERSION = 1
+
+# Match rows read per chunk
+DEFAULT_CHUNK_SIZE = 100000
+
+# Every aggregate is a roll-up of additive counters kept per (team_1, team_2, venue),
+# with the pair in alphabetical order and the counters oriented to it. Sums can be
+# topped up with new matches, so appending results never needs a full re-read.
+KEYS = ["team_1", "team_2", "venue"]
+COUNTERS = [
+    "matches",
+    "wins_team_1",
+    "wins_team_2",
+    "draws",
+    "toss_wins",        # toss winner won the match
+    "toss_bat",         # toss winner chose to bat
+    "toss_bat_wins",
+    "toss_field",       # toss winner chose to field
+    "toss_field_wins",
+    "bat_first_wins",   # won by runs
+    "chase_wins",       # won by wickets
+    "runs_margin",
+    "wickets_margin",
+]
+
+# The derived tables, written under the same names as the old static snapshots
+TABLE_FILES = {
+    "head_to_head_results": "head_to_head_results.csv",
+    "head_to_head_by_venue": "head_to_head_by_venue.csv",
+    "toss_impact_by_venue": "toss_impact_by_venue.csv",
+    "venue_statistics": "venue_statistics.csv",
+    "venue_categorized": "venue_categorized.csv",
+    "team_statistics": "team_statistics.csv",
+}
+
+def match_counters(matches):
+    """Per-match counter rows (KEYS + COUNTERS) for a frame of match_results rows"""
+    team_1 = matches["team_1"].astype(str)
+    team_2 = matches["team_2"].astype(str)
+    winner = matches["winner"].astype(str)
+    toss_won = matches["toss_winner"].astype(str) == winner
+    toss_bat = matches["toss_decision"] == "bat"
+    runs = pd.to_numeric(matches["win_by_runs"], errors="coerce").fillna(0)
+    wickets = pd.to_numeric(matches["win_by_wickets"], errors="coerce").fillna(0)
+
+    # Orient every fixture to its alphabetical pair so both home/away orders share a row
+    first = np.where(team_1 <= team_2, team_1, team_2)
+    second = np.where(team_1 <= team_2, team_2, team_1)
+    first_won = winner.to_numpy() == first
+    second_won = winner.to_numpy() == second
+
+    return pd.DataFrame({
+        "team_1": first,
+        "team_2": second,
+        "venue": matches["venue"].astype(str).to_numpy(),
+        "matches": 1,
+        "wins_team_1": first_won,
+        "wins_team_2": second_won,
+        "draws": ~(first_won | second_won),
+        "toss_wins": toss_won.to_numpy(),
+        "toss_bat": toss_bat.to_numpy(),
+        "toss_bat_wins": (toss_bat & toss_won).to_numpy(),
+        "toss_field": (matches["toss_decision"] == "field").to_numpy(),
+        "toss_field_wins": ((matches["toss_decision"] == "field") & toss_won).to_numpy(),
+        "bat_first_wins": (runs > 0).to_numpy(),
+        "chase_wins": (wickets > 0).to_numpy(),
+        "runs_margin": runs.to_numpy(),
+        "wickets_margin": wickets.to_numpy(),
+    })
+
+def sum_counters(matches):
+    """The single groupby pass: counters summed per (team_1, team_2, venue)"""
+    return match_counters(matches).groupby(KEYS, sort=False)[COUNTERS].sum().astype("float64")
+
+def fold(base, new):
+    """Add new counter sums into the running totals"""
+    if base is None or base.empty:
+        return new
+    return base.add(new, fill_value=0)
+
+def percentage(numerator, denominator):
+    """100 * numerator / denominator, 0 where there's nothing to divide by"""
+    return (numerator / denominator.where(denominator > 0) * 100).fillna(0)
+
+def derive_tables(base):
+    """Every aggregate table, rolled up from the (team_1, team_2, venue) counters"""
+    base = base.reset_index()
+
+    # Head-to-head per venue
+    by_venue = base.sort_values(KEYS)
+    head_to_head_by_venue = pd.DataFrame({
+        "Team 1": by_venue["team_1"],
+        "Team 2": by_venue["team_2"],
+        "Venue": by_venue["venue"],
+        "Total Matches": by_venue["matches"].astype(int),
+        "Wins Team 1": by_venue["wins_team_1"].astype(int),
+        "Wins Team 2": by_venue["wins_team_2"].astype(int),
+        "Draws": by_venue["draws"].astype(int),
+        "Win % Team 1": percentage(by_venue["wins_team_1"], by_venue["matches"]),
+        "Win % Team 2": percentage(by_venue["wins_team_2"], by_venue["matches"]),
+        "Bat First Win %": percentage(by_venue["bat_first_wins"], by_venue["matches"]),
+        "Chase Win %": percentage(by_venue["chase_wins"], by_venue["matches"]),
+    })
+
+    # Head-to-head overall
+    pairs = base.groupby(["team_1", "team_2"])[COUNTERS].sum().reset_index()
+    head_to_head_results = pd.DataFrame({
+        "Teams": pairs["team_1"] + " vs " + pairs["team_2"],
+        "Total Matches": pairs["matches"].astype(int),
+        "Wins Team 1": pairs["wins_team_1"].astype(int),
+        "Wins Team 2": pairs["wins_team_2"].astype(int),
+        "Draws": pairs["draws"].astype(int),
+    })
+
+    # Venues
+    venues = base.groupby("venue")[COUNTERS].sum()
+    bat_first = percentage(venues["toss_bat_wins"], venues["toss_bat"])
+    bowl_first = percentage(venues["toss_field_wins"], venues["toss_field"])
+    toss_impact_by_venue = pd.DataFrame({
+        "Venue": venues.index,
+        "Total Matches": venues["matches"].astype(int),
+        "Toss Win %": percentage(venues["toss_wins"], venues["matches"]),
+        "Bat First Win %": bat_first,
+        "Bowl First Win %": bowl_first,
+        "Venue Type": np.select([bat_first > bowl_first, bat_first < bowl_first],
+                                ["Batting-Friendly", "Bowling-Friendly"], "Neutral"),
+    }).reset_index(drop=True)
+
+    venue_statistics = pd.DataFrame({
+        "venue": venues.index,
+        "win_by_runs": venues["runs_margin"] / venues["matches"],
+        "win_by_wickets": venues["wickets_margin"] / venues["matches"],
+        "matches_played": venues["matches"].astype(int),
+    }).reset_index(drop=True)
+
+    # Big average run margins with small wicket margins: batting; the reverse: bowling
+    venue_categorized = venue_statistics.assign(venue_category=np.select(
+        [(venue_statistics["win_by_runs"] > 30) & (venue_statistics["win_by_wickets"] < 3),
+         (venue_statistics["win_by_wickets"] > 4) & (venue_statistics["win_by_runs"] < 20)],
+        ["Batting-Friendly", "Bowling-Friendly"], "Balanced"))
+
+    # Teams, from both sides of every pair
+    sides = pd.concat([
+        base[["team_1", "matches", "wins_team_1"]].set_axis(["team", "matches", "wins"], axis=1),
+        base[["team_2", "matches", "wins_team_2"]].set_axis(["team", "matches", "wins"], axis=1),
+    ]).groupby("team")[["matches", "wins"]].sum()
+    team_statistics = pd.DataFrame({
+        "team": sides.index,
+        "total_matches": sides["matches"],
+        "total_wins": sides["wins"],
+        "win_percentage": percentage(sides["wins"], sides["matches"]),
+    }).reset_index(drop=True)
+
+    return {
+        "head_to_head_results": head_to_head_results,
+        "head_to_head_by_venue": head_to_head_by_venue.reset_index(drop=True),
+        "toss_impact_by_venue": toss_impact_by_venue,
+        "venue_statistics": venue_statistics,
+        "venue_categorized": venue_categorized,
+        "team_statistics": team_statistics,
+    }
+
+def file_sha1(file_path, length=None):
+    """Content hash of a file, or of its first length bytes"""
+    digest = hashlib.sha1()
+    remaining = os.path.getsize(file_path) if length is None else length
+    with open(file_path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+def load_state(state_file):
+    """Saved counters and source fingerprint, or None if there is no usable state"""
+    if not os.path.exists(state_file):
+        return None
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read aggregate state, rebuilding: {e}")
+        return None
+    if state.get("version") != STATE_VERSION:
+        print("Aggregate state is from an older version, rebuilding")
+        return None
+    return state
+
+def save_state(state_file, source, match_ids, base):
+    """Writes the counters, seen match ids and source fingerprint atomically"""
+    state = {
+        "version": STATE_VERSION,
+        "source": source,
+        "match_ids": sorted(match_ids),
+        "counters": base.reset_index().values.tolist(),
+    }
+    temp_file = state_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temp_file, state_file)
+
+def state_counters(state):
+    rows = state["counters"]
+    if not rows:
+        return None
+    return pd.DataFrame(rows, columns=KEYS + COUNTERS).set_index(KEYS).astype("float64")
+
+def read_new_rows(match_path, offset, columns, chunk_size):
+    """Chunks of match_results rows starting at a byte offset (0 reads the whole file, header included)"""
+    with open(match_path, "rb") as f:
+        if offset == 0:
+            yield from pd.read_csv(f, chunksize=chunk_size, dtype={"match_id": str})
+        else:
+            f.seek(offset)
+            yield from pd.read_csv(f, chunksize=chunk_size, header=None, names=columns, dtype={"match_id": str})
+
+def update_aggregates(data_dir=base_dir, chunk_size=DEFAULT_CHUNK_SIZE, full_rebuild=False):
+    """
+    Bring the aggregates up to date with match_results.csv and return the derived tables.
+
+    Rows appended since the last run are read from where the last run stopped and
+    folded into the saved counters; match ids already counted are skipped. If the
+    already-processed part of the file changed (or full_rebuild=True) everything is
+    recomputed from scratch, since counters can't be un-added.
+    """
+    match_path = os.path.join(data_dir, MATCH_RESULTS_FILE)
+    state_file = os.path.join(data_dir, STATE_FILE_NAME)
+    columns = pd.read_csv(match_path, nrows=0).columns.tolist()
+    size = os.path.getsize(match_path)
+
+    state = None if full_rebuild else load_state(state_file)
+    if state is not None:
+        source = state["source"]
+        if (source["columns"] != columns or size < source["bytes"]
+                or file_sha1(match_path, source["bytes"]) != source["sha1"]):
+            print("match_results.csv was rewritten since the last run, rebuilding aggregates")
+            state = None
+
+    if state is None:
+        base, match_ids, offset = None, set(), 0
+    else:
+        base, match_ids, offset = state_counters(state), set(state["match_ids"]), state["source"]["bytes"]
+
+    new_matches = 0
+    if offset < size:
+        for chunk in read_new_rows(match_path, offset, columns, chunk_size):
+            chunk = chunk[~chunk["match_id"].isin(match_ids)].drop_duplicates("match_id")
+            if chunk.empty:
+                continue
+            match_ids.update(chunk["match_id"])
+            base = fold(base, sum_counters(chunk))
+            new_matches += len(chunk)
+
+    if base is None:
+        raise ValueError(f"No match results found in {match_path}")
+
+    if state is None:
+        print(f"Aggregated {new_matches} matches from {match_path}")
+    else:
+        print(f"Folded {new_matches} new matches into saved aggregates")
+    if state is None or new_matches or offset < size:
+        save_state(state_file, {"bytes": size, "sha1": file_sha1(match_path), "columns": columns}, match_ids, base)
+
+    return derive_tables(base)
+
+def append_results(new_results_path, data_dir=base_dir):
+    """Append new match result rows to match_results.csv, skipping match ids it already has"""
+    match_path = os.path.join(data_dir, MATCH_RESULTS_FILE)
+    columns = pd.read_csv(match_path, nrows=0).columns.tolist()
+    new_results = pd.read_csv(new_results_path, dtype={"match_id": str})
+
+    missing = [column for column in columns if column not in new_results.columns]
+    if missing:
+        raise ValueError(f"{new_results_path} is missing columns: {missing}")
+
+    known_ids = set(pd.read_csv(match_path, usecols=["match_id"], dtype={"match_id": str})["match_id"])
+    new_results = new_results[~new_results["match_id"].isin(known_ids)].drop_duplicates("match_id")
+    if new_results.empty:
+        print("No new match results to append")
+        return 0
+
+    # Make sure the appended rows start on a new line
+    with open(match_path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    new_results[columns].to_csv(match_path, mode="a", header=False, index=False)
+    print(f"Appended {len(new_results)} match results to {match_path}")
+    return len(new_results)
+
+def write_tables(tables, output_dir):
+    for name, table in tables.items():
+        output_path = os.path.join(output_dir, TABLE_FILES[name])
+        table.to_csv(output_path, index=False)
+        print(f"✅ Saved {name} ({len(table)} rows) to '{output_path}'")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Derive head-to-head, venue, toss and team aggregates from match_results.csv")
+    parser.add_argument("--data-dir", default=base_dir, help="Directory holding match_results.csv")
+    parser.add_argument("--output-dir", default=None,
+                        help="Where to write the aggregate CSVs (default: the data directory)")
+    parser.add_argument("--append", default=None, metavar="CSV",
+                        help="Append the new match results in this CSV to match_results.csv first")
+    parser.add_argument("--full-rebuild", action="store_true", help="Recompute from scratch, ignoring saved state")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.append:
+        append_results(args.append, args.data_dir)
+    tables = update_aggregates(args.data_dir, args.chunk_size, args.full_rebuild)
+    write_tables(tables, args.output_dir or args.data_dir)
@@ -1,67 +1,255 @@
-import pandas as pd
 import os
+import argparse
+
+import pandas as pd
+
+from aggregates import MATCH_RESULTS_FILE, TABLE_FILES, update_aggregates
+
+# Parquet output needs pyarrow; without it the merged table is streamed to CSV
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Directory holding the CSV files (defaults to the one this script lives in)
+base_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Define the base directory where CSV files are stored
-base_dir = "c:/sem6/cricket_predictor/data/match_data/"
-
-# Define file paths
-file_paths = {
-    "match_results": os.path.join(base_dir, "match_results.csv"),
-    "team_statistics": os.path.join(base_dir, "team_statistics.csv"),
-    "toss_impact_by_venue": os.path.join(base_dir, "toss_impact_by_venue.csv"),
-    "venue_categorized": os.path.join(base_dir, "venue_categorized.csv"),
-    "venue_statistics": os.path.join(base_dir, "venue_statistics.csv"),
-    "head_to_head_by_venue": os.path.join(base_dir, "head_to_head_by_venue.csv"),
-    "head_to_head_results": os.path.join(base_dir, "head_to_head_results.csv"),
+# Match rows read per chunk; only one chunk (plus the small lookup tables) is in memory at a time
+DEFAULT_CHUNK_SIZE = 100000
+
+# Categorical match columns and the domain they share: team columns all use one
+# category set so the team joins compare integer codes
+CATEGORY_COLUMNS = {
+    "team_1": "team",
+    "team_2": "team",
+    "winner": "team",
+    "toss_winner": "team",
+    "venue": "venue",
+    "city": "city",
+    "toss_decision": "toss_decision",
+    "match_type": "match_type",
 }
+NUMERIC_COLUMNS = ["win_by_runs", "win_by_wickets"]
+
+# Head-to-head columns that belong to one side and swap when a fixture is read the other way round
+TEAM_SIDE_COLUMNS = [
+    ("wins_team_1", "wins_team_2"),
+    ("win_pct_team_1", "win_pct_team_2"),
+]
+
+def normalize_columns(df):
+    """Snake-case column names so every table agrees ('Win % Team 1' -> 'win_pct_team_1')"""
+    df.columns = (df.columns.str.strip().str.lower()
+                  .str.replace("%", "pct", regex=False)
+                  .str.replace(r"[^a-z0-9]+", "_", regex=True)
+                  .str.strip("_"))
+    return df
+
+def scan_category_domains(match_path, chunk_size):
+    """
+    First pass over match_results, reading only the categorical columns, to collect
+    every value each category domain takes. Fixing the categories up front gives every
+    chunk identical dtypes, so joins stay on codes and the output schema never changes.
+    """
+    raw_header = pd.read_csv(match_path, nrows=0).columns
+    header = normalize_columns(pd.DataFrame(columns=raw_header)).columns
+    usecols = [raw for raw, column in zip(raw_header, header) if column in CATEGORY_COLUMNS]
+    columns = [column for column in header if column in CATEGORY_COLUMNS]
+    domains = {domain: set() for domain in CATEGORY_COLUMNS.values()}
+    rows = 0
+
+    reader = pd.read_csv(match_path, dtype=str, chunksize=chunk_size, usecols=usecols)
+    for chunk in reader:
+        normalize_columns(chunk)
+        rows += len(chunk)
+        for column in columns:
+            domains[CATEGORY_COLUMNS[column]].update(chunk[column].dropna().unique())
+
+    dtypes = {domain: pd.CategoricalDtype(sorted(values)) for domain, values in domains.items()}
+    return {column: dtypes[CATEGORY_COLUMNS[column]] for column in columns}, rows
+
+def check_unique_keys(df, keys, name):
+    """
+    Every lookup must have at most one row per join key, otherwise each match row
+    it joins to is duplicated. Fail before merging rather than after the blowup.
+    """
+    duplicated = df.duplicated(keys, keep=False)
+    if duplicated.any():
+        per_key = df[duplicated].groupby(keys, observed=True).size()
+        example = per_key.idxmax()
+        raise ValueError(
+            f"{name} has {duplicated.sum()} rows sharing {keys} values (up to {per_key.max()} rows for {example}); "
+            f"joining it would multiply match rows. Deduplicate {name} first.")
+
+def both_orientations(df, keys):
+    """
+    Add every head-to-head row with team_1 and team_2 swapped (and the side-specific
+    columns swapped to match), so a fixture finds its row whichever side each team is on.
+    Rows present in the file keep priority over swapped copies.
+    """
+    swap = {"team_1": "team_2", "team_2": "team_1"}
+    for first, second in TEAM_SIDE_COLUMNS:
+        if first in df.columns and second in df.columns:
+            swap[first], swap[second] = second, first
+    swapped = df.rename(columns=swap)[df.columns]
+    return pd.concat([df, swapped], ignore_index=True).drop_duplicates(keys, keep="first")
+
+def type_lookup(df, keys, prefix, key_dtypes):
+    """
+    Prefix a lookup's columns, cast its keys to the match dtypes and its other columns
+    to float32 / category. Keys the matches never use fall out of the category set and
+    are dropped, since they can't join anything.
+    """
+    df = df.rename(columns={column: f"{prefix}{column}" for column in df.columns if column not in keys})
+    for key in keys:
+        df[key] = df[key].astype(key_dtypes[key])
+    df = df.dropna(subset=keys)
+
+    for column in df.columns:
+        if column in keys:
+            continue
+        if pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = df[column].astype("float32")
+        else:
+            df[column] = df[column].astype("category")
+    return df
+
+def load_lookups(aggregates, key_dtypes):
+    """The small aggregate tables, checked and typed, as a list of (table, join keys)"""
+    tables = {name: normalize_columns(table.copy()) for name, table in aggregates.items()}
+
+    lookups = []
+
+    # Toss impact per venue
+    toss = tables["toss_impact_by_venue"]
+    check_unique_keys(toss, ["venue"], "toss_impact_by_venue")
+    lookups.append((type_lookup(toss, ["venue"], "toss_", key_dtypes), ["venue"]))
+
+    # Venue statistics, with the category column from venue_categorized
+    venue = tables["venue_statistics"]
+    categorized = tables["venue_categorized"]
+    check_unique_keys(venue, ["venue"], "venue_statistics")
+    check_unique_keys(categorized, ["venue"], "venue_categorized")
+    extra_columns = ["venue"] + [column for column in categorized.columns if column not in venue.columns]
+    venue = venue.merge(categorized[extra_columns], on="venue", how="left", validate="one_to_one")
+    lookups.append((type_lookup(venue, ["venue"], "venue_", key_dtypes), ["venue"]))
+
+    # Team statistics, joined once for each side of the fixture
+    teams = tables["team_statistics"]
+    check_unique_keys(teams, ["team"], "team_statistics")
+    for side in ("team_1", "team_2"):
+        side_stats = teams.rename(columns={"team": side})
+        lookups.append((type_lookup(side_stats, [side], f"{side}_", key_dtypes), [side]))
+
+    # Head-to-head record, from 'A vs B' fixture names
+    head_to_head = tables["head_to_head_results"]
+    if "teams" not in head_to_head.columns:
+        raise KeyError("head_to_head_results has no 'Teams' column to split into team_1 and team_2")
+    head_to_head[["team_1", "team_2"]] = head_to_head["teams"].str.split(" vs ", n=1, expand=True)
+    head_to_head = head_to_head.drop(columns="teams")
+    check_unique_keys(head_to_head, ["team_1", "team_2"], "head_to_head_results")
+    head_to_head = both_orientations(head_to_head, ["team_1", "team_2"])
+    lookups.append((type_lookup(head_to_head, ["team_1", "team_2"], "h2h_", key_dtypes), ["team_1", "team_2"]))
 
-# Load all CSV files into a dictionary of DataFrames
-dfs = {name: pd.read_csv(path) for name, path in file_paths.items()}
+    # Head-to-head record at the fixture's venue
+    venue_keys = ["team_1", "team_2", "venue"]
+    head_to_head_venue = tables["head_to_head_by_venue"]
+    check_unique_keys(head_to_head_venue, venue_keys, "head_to_head_by_venue")
+    head_to_head_venue = both_orientations(head_to_head_venue, venue_keys)
+    lookups.append((type_lookup(head_to_head_venue, venue_keys, "h2h_venue_", key_dtypes), venue_keys))
 
-# Convert all column names to lowercase and strip spaces for consistency
-for name, df in dfs.items():
-    df.columns = df.columns.str.lower().str.strip()
-    print(f"✅ Columns in {name}: {list(df.columns)}")  # Debugging Step
+    return lookups
 
-# 🔹 Check if 'teams' column exists in head_to_head_results
-if "teams" in dfs["head_to_head_results"].columns:
-    print("🔄 Splitting 'teams' column into 'team 1' and 'team 2'...")
-    dfs["head_to_head_results"][["team 1", "team 2"]] = dfs["head_to_head_results"]["teams"].str.split(" vs ", expand=True)
+def merged_chunks(match_path, lookups, key_dtypes, chunk_size):
+    """Stream match_results in chunks, left-joining every lookup onto each chunk"""
+    for chunk in pd.read_csv(match_path, chunksize=chunk_size, dtype={"match_id": str}):
+        normalize_columns(chunk)
+        for column, dtype in key_dtypes.items():
+            chunk[column] = chunk[column].astype(dtype)
+        for column in NUMERIC_COLUMNS:
+            if column in chunk.columns:
+                chunk[column] = pd.to_numeric(chunk[column], errors="coerce").astype("float32")
+        if "date" in chunk.columns:
+            chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce")
 
-    # Confirm that split was successful
-    print(dfs["head_to_head_results"][["teams", "team 1", "team 2"]].head())
-else:
-    print("❌ Error: 'teams' column not found in head_to_head_results!")
+        rows = len(chunk)
+        for lookup, keys in lookups:
+            chunk = chunk.merge(lookup, on=keys, how="left", sort=False)
+        # Guaranteed by check_unique_keys; a mismatch means a lookup changed under us
+        if len(chunk) != rows:
+            raise RuntimeError(f"Merge changed a chunk from {rows} to {len(chunk)} rows")
 
-# 🔹 Verify 'team 1' and 'team 2' exist before merging
-if "team 1" not in dfs["head_to_head_results"].columns or "team 2" not in dfs["head_to_head_results"].columns:
-    raise KeyError("❌ 'team 1' and 'team 2' are still missing after splitting 'teams'. Check the CSV format!")
+        # Matches without a lookup row get 0 for its numeric stats
+        numeric = chunk.columns[chunk.dtypes == "float32"].difference(NUMERIC_COLUMNS)
+        chunk[numeric] = chunk[numeric].fillna(0)
+        yield chunk
 
-# 🔹 Merge venue data
-venue_data = dfs["venue_statistics"].merge(dfs["venue_categorized"], on="venue", how="left")
+def write_chunks(chunks, output_path):
+    """
+    Write chunks to Parquet (one row group per chunk) or CSV as they arrive.
+    Written to a temporary file first, so a failed run never leaves a partial output.
+    """
+    tmp_path = f"{output_path}.tmp"
+    writer = None
+    rows = 0
+    try:
+        for i, chunk in enumerate(chunks):
+            if output_path.endswith(".parquet"):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, output_path)
+    return rows
 
-# 🔹 Merge toss impact data
-match_data = dfs["match_results"].merge(dfs["toss_impact_by_venue"], on="venue", how="left")
+def load_snapshot_tables(data_dir):
+    """The aggregate tables as static CSVs in data_dir, instead of derived from match_results"""
+    return {name: pd.read_csv(os.path.join(data_dir, file_name)) for name, file_name in TABLE_FILES.items()}
 
-# 🔹 Merge team statistics (Check if 'team' column exists)
-if "team" in dfs["team_statistics"].columns:
-    match_data = match_data.merge(dfs["team_statistics"], on="team", how="left")
+def merge(data_dir=base_dir, output_path=None, chunk_size=DEFAULT_CHUNK_SIZE, output_format=None, snapshots=False):
+    """
+    Merge match results with every lookup table into one row per match.
+    The lookups are derived from match_results itself (see aggregates.py), so they are
+    never staler than the matches; snapshots=True joins the CSVs in data_dir instead.
+    """
+    match_path = os.path.join(data_dir, MATCH_RESULTS_FILE)
+    output_format = output_format or ("parquet" if HAS_PYARROW else "csv")
+    if output_format == "parquet" and not HAS_PYARROW:
+        raise ImportError("Parquet output needs pyarrow; install it or pass --format csv")
+    output_path = output_path or os.path.join(data_dir, f"merged_cricket_data.{output_format}")
 
-# 🔹 Merge head-to-head data
-if "team 1" in dfs["head_to_head_results"].columns and "team 2" in dfs["head_to_head_results"].columns:
-    head_to_head_data = dfs["head_to_head_results"].merge(
-        dfs["head_to_head_by_venue"], on=["team 1", "team 2"], how="left"
-    )
-else:
-    print("❌ Error: 'team 1' and 'team 2' columns not found after splitting 'teams'!")
+    key_dtypes, match_rows = scan_category_domains(match_path, chunk_size)
+    print(f"✅ Scanned {match_rows} match rows: " +
+          ", ".join(f"{len(dtype.categories)} {column}" for column, dtype in key_dtypes.items()))
 
-# 🔹 Merge all data together
-final_data = match_data.merge(head_to_head_data, on=["team 1", "team 2"], how="left")
+    aggregates = load_snapshot_tables(data_dir) if snapshots else update_aggregates(data_dir, chunk_size)
+    for name, table in aggregates.items():
+        print(f"✅ {name}: {len(table)} rows")
+    lookups = load_lookups(aggregates, key_dtypes)
+    rows = write_chunks(merged_chunks(match_path, lookups, key_dtypes, chunk_size), output_path)
 
-# Handle missing values
-final_data.fillna(0, inplace=True)
+    print(f"✅ Data merging complete! {rows} rows saved to '{output_path}'.")
+    return output_path
 
-# Save preprocessed data
-final_data.to_csv(os.path.join(base_dir, "merged_cricket_data.csv"), index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge match results with venue, toss, team and head-to-head tables")
+    parser.add_argument("--data-dir", default=base_dir, help="Directory holding the match_data CSV files")
+    parser.add_argument("--output", default=None,
+                        help="Output file (default: <data-dir>/merged_cricket_data.parquet, or .csv without pyarrow)")
+    parser.add_argument("--format", dest="output_format", choices=["parquet", "csv"], default=None,
+                        help="Output format (default: parquet if pyarrow is installed, else csv)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Match rows merged per chunk (bounds memory)")
+    parser.add_argument("--snapshots", action="store_true",
+                        help="Join the static aggregate CSVs instead of deriving them from match_results")
+    args = parser.parse_args()
 
-print("✅ Data preprocessing and merging complete! File saved as 'merged_cricket_data.csv'.")
+    merge(args.data_dir, args.output, args.chunk_size, args.output_format, args.snapshots)
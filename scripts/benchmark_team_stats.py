@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+
+import calculateTeamStats as team_stats
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+def generate_synthetic_archive(output_dir, match_count, team_count=10, squad_size=300, overs=2, seed=42):
+    """
+    Writes a synthetic Cricsheet-style archive to output_dir/t20.
+    Each team draws its XI from a pool of squad_size players, so over many matches
+    every team accumulates a few hundred historic players, as in a real archive
+    """
+    rng = random.Random(seed)
+    format_dir = os.path.join(output_dir, "t20")
+    os.makedirs(format_dir, exist_ok=True)
+
+    teams = [f"Team {i}" for i in range(team_count)]
+    squads = {team: [f"{team} Player {j}" for j in range(squad_size)] for team in teams}
+
+    for match_number in range(match_count):
+        team1, team2 = rng.sample(teams, 2)
+        xis = {team1: rng.sample(squads[team1], 11), team2: rng.sample(squads[team2], 11)}
+
+        innings = []
+        for batting_team, bowling_team in [(team1, team2), (team2, team1)]:
+            batters = xis[batting_team]
+            bowlers = xis[bowling_team][6:]
+            striker = 0
+            overs_data = []
+            for over in range(overs):
+                deliveries = []
+                for _ in range(6):
+                    runs = rng.choice([0, 0, 1, 1, 2, 4, 6])
+                    delivery = {
+                        "batter": batters[striker % 11],
+                        "bowler": bowlers[over % len(bowlers)],
+                        "runs": {"batter": runs, "extras": 0, "total": runs}
+                    }
+                    if rng.random() < 0.05:
+                        delivery["wickets"] = [{"player_out": batters[striker % 11], "kind": "bowled"}]
+                        striker += 1
+                    deliveries.append(delivery)
+                overs_data.append({"over": over, "deliveries": deliveries})
+            innings.append({"team": batting_team, "overs": overs_data})
+
+        match = {
+            "info": {
+                "teams": [team1, team2],
+                "outcome": {"winner": rng.choice([team1, team2])}
+            },
+            "innings": innings
+        }
+        with open(os.path.join(format_dir, f"{match_number}.json"), 'w', encoding='utf-8') as f:
+            json.dump(match, f, separators=(',', ':'))
+
+def root_commit():
+    """The repository's first commit, whose calculateTeamStats.py is the unoptimized baseline"""
+    result = subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=script_dir,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.split()[0]
+
+def load_baseline(ref, work_dir):
+    """
+    Writes calculateTeamStats.py as of a git revision to work_dir/scripts and imports it,
+    unmodified. The old script reads ../public/teamData relative to itself, so the
+    synthetic archive is linked in there by time_baseline_run.
+    """
+    source = subprocess.run(["git", "show", f"{ref}:scripts/calculateTeamStats.py"], cwd=script_dir,
+                            capture_output=True, text=True, check=True).stdout
+    module_path = os.path.join(work_dir, "scripts", "baseline_team_stats.py")
+    os.makedirs(os.path.dirname(module_path), exist_ok=True)
+    with open(module_path, 'w', encoding='utf-8') as f:
+        f.write(source)
+
+    spec = importlib.util.spec_from_file_location("baseline_team_stats", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def time_baseline_run(input_dir, baseline, work_dir):
+    """Times the baseline calculate_team_stats over the archive in input_dir"""
+    public_dir = os.path.join(work_dir, "public")
+    os.makedirs(public_dir, exist_ok=True)
+    team_data_dir = os.path.join(public_dir, "teamData")
+    if os.path.lexists(team_data_dir):
+        os.remove(team_data_dir)
+    os.symlink(input_dir, team_data_dir)
+
+    start = time.perf_counter()
+    baseline.calculate_team_stats()
+    return time.perf_counter() - start
+
+def time_run(input_dir):
+    """Times a full rebuild with the current calculate_team_stats"""
+    output_dir = tempfile.mkdtemp(prefix="team_stats_bench_out_")
+    try:
+        start = time.perf_counter()
+        team_stats.calculate_team_stats(input_dir=input_dir, output_dir=output_dir, full_rebuild=True)
+        return time.perf_counter() - start
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark calculate_team_stats against its unoptimized baseline")
+    parser.add_argument("--matches", type=int, nargs="+", default=[5000, 10000, 20000],
+                        help="Archive sizes to benchmark")
+    parser.add_argument("--overs", type=int, default=2,
+                        help="Overs per innings in the synthetic matches (kept small so parsing doesn't dominate)")
+    parser.add_argument("--baseline-ref", default=None,
+                        help="Git revision whose calculateTeamStats.py is the baseline (default: the first commit)")
+    args = parser.parse_args()
+
+    baseline_dir = tempfile.mkdtemp(prefix="team_stats_bench_baseline_")
+    try:
+        baseline = load_baseline(args.baseline_ref or root_commit(), baseline_dir)
+
+        results = []
+        for match_count in args.matches:
+            input_dir = tempfile.mkdtemp(prefix="team_stats_bench_in_")
+            try:
+                print(f"Generating {match_count} synthetic matches...")
+                generate_synthetic_archive(input_dir, match_count, overs=args.overs)
+
+                before = time_baseline_run(input_dir, baseline, baseline_dir)
+                after = time_run(input_dir)
+                results.append((match_count, before, after))
+            finally:
+                shutil.rmtree(input_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(baseline_dir, ignore_errors=True)
+
+    print("\nmatches | baseline (s) | current (s) | speedup")
+    for match_count, before, after in results:
+        print(f"{match_count:7d} | {before:12.2f} | {after:11.2f} | {before / after:6.1f}x")
+
+if __name__ == "__main__":
+    main()
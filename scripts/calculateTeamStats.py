@@ -1,18 +1,35 @@
 import os
 import json
 import math
-from collections import defaultdict
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-def calculate_team_stats():
+FORMATS = ["t20", "odi", "test", "ipl"]
+
+# Raw accumulators plus the manifest of processed match files, kept next to the output
+STATE_FILE_NAME = "accumulator_state.json"
+STATE_VERSION = 2
+
+def calculate_team_stats(workers=1, input_dir=None, output_dir=None, full_rebuild=False):
     """
     Calculates team statistics from the downloaded cricsheet data
     Stores results in public/teamStats folder
+
+    With workers > 1 the match files are split into shards that are parsed and
+    aggregated in a process pool, then merged into a single set of accumulators
+
+    Runs are incremental: the accumulators and a manifest of match file hashes are
+    saved after each run, and later runs only fold in new files. A changed or
+    removed file (or full_rebuild=True) recomputes everything from scratch
     """
     script_dir = os.path.dirname(os.path.abspath(__file__))
 
-    input_dir = os.path.join(script_dir, '..', 'public', 'teamData')
-    output_dir = os.path.join(script_dir, '..', 'public', 'teamStats')
+    if input_dir is None:
+        input_dir = os.path.join(script_dir, '..', 'public', 'teamData')
+    if output_dir is None:
+        output_dir = os.path.join(script_dir, '..', 'public', 'teamStats')
 
     
     input_dir = os.path.abspath(input_dir)
@@ -20,54 +37,64 @@ def calculate_team_stats():
 
     os.makedirs(output_dir, exist_ok=True)
     
-    # Dictionary to store all team data
-    all_teams_data = {
-        "t20": defaultdict(lambda: create_default_team_stats()),
-        "odi": defaultdict(lambda: create_default_team_stats()),
-        "test": defaultdict(lambda: create_default_team_stats()),
-        "ipl": defaultdict(lambda: create_default_team_stats())
-    }
-    
-    # Process each format
-    for format_name in ["t20", "odi", "test", "ipl"]:
+    # Collect the match files for each format
+    format_files = {}
+    for format_name in FORMATS:
         format_dir = os.path.join(input_dir, format_name)
         if not os.path.exists(format_dir):
             continue
             
         json_files = [f for f in os.listdir(format_dir) if f.endswith('.json')]
-        
-        for file_name in json_files:
-            file_path = os.path.join(format_dir, file_name)
-            process_match_file(file_path, format_name, all_teams_data)
+        format_files[format_name] = [os.path.join(format_dir, f) for f in json_files]
     
-    # Calculate derived statistics
-    for format_name in all_teams_data:
+    # Work out which files are new since the last run
+    state_file = os.path.join(output_dir, STATE_FILE_NAME)
+    state = None if full_rebuild else load_accumulator_state(state_file)
+    previous_manifest = state["manifest"] if state else {}
+    manifest = build_manifest(input_dir, format_files, previous_manifest)
+    
+    if state is not None:
+        new_files, stale_files = diff_manifest(previous_manifest, manifest)
+        if stale_files:
+            # Accumulators can't be un-added, so changed or removed matches force a rebuild
+            print(f"{len(stale_files)} match files changed or were removed, rebuilding from scratch")
+            state = None
+    
+    # Raw counters for every team, restored from the saved state when running incrementally
+    accumulator = StatsAccumulator.from_state(state["formats"]) if state else StatsAccumulator()
+    
+    if state is None:
+        files_to_process = format_files
+    else:
+        files_to_process = {}
+        for format_name, file_paths in format_files.items():
+            new_paths = [path for path in file_paths if manifest_key(input_dir, path) in new_files]
+            if new_paths:
+                files_to_process[format_name] = new_paths
+        print(f"Folding {len(new_files)} new match files into saved accumulators")
+    
+    if workers > 1:
+        aggregate_in_parallel(files_to_process, accumulator, workers)
+    else:
+        for format_name, file_paths in files_to_process.items():
+            for file_path in file_paths:
+                process_match_file(file_path, format_name, accumulator)
+    
+    # Only formats that received matches need their output files rewritten
+    if state is None:
+        updated_formats = list(FORMATS)
+    else:
+        updated_formats = [format_name for format_name in FORMATS if format_name in files_to_process]
+    
+    # Expand the counters and calculate derived statistics
+    all_teams_data = {}
+    for format_name in FORMATS:
+        all_teams_data[format_name] = accumulator.to_team_stats(format_name)
         for team_name in all_teams_data[format_name]:
-            team_data = all_teams_data[format_name][team_name]
-            
-            # Calculate batting averages and strike rates
-            for player in team_data["players"]:
-                player_stats = team_data["players"][player]
-                
-                # Batting stats
-                if player_stats["batting"]["dismissals"] > 0:
-                    player_stats["batting"]["average"] = round(player_stats["batting"]["runs"] / player_stats["batting"]["dismissals"], 2)
-                if player_stats["batting"]["balls_faced"] > 0:
-                    player_stats["batting"]["strike_rate"] = round((player_stats["batting"]["runs"] / player_stats["batting"]["balls_faced"]) * 100, 2)
-                
-                # Bowling stats
-                if player_stats["bowling"]["wickets"] > 0:
-                    player_stats["bowling"]["average"] = round(player_stats["bowling"]["runs_conceded"] / player_stats["bowling"]["wickets"], 2)
-                if player_stats["bowling"]["balls_bowled"] > 0:
-                    player_stats["bowling"]["economy"] = round((player_stats["bowling"]["runs_conceded"] / player_stats["bowling"]["balls_bowled"]) * 6, 2)
-                    if player_stats["bowling"]["wickets"] > 0:
-                        player_stats["bowling"]["strike_rate"] = round(player_stats["bowling"]["balls_bowled"] / player_stats["bowling"]["wickets"], 2)
-            
-            # Identify team strengths
-            identify_team_strengths(team_data)
+            calculate_derived_stats(all_teams_data[format_name][team_name])
     
     # Save results
-    for format_name in all_teams_data:
+    for format_name in updated_formats:
         format_output = {}
         for team_name, team_data in all_teams_data[format_name].items():
             format_output[team_name] = team_data
@@ -93,12 +120,145 @@ def calculate_team_stats():
     with open(summary_file, 'w', encoding='utf-8') as f:
         json.dump(summary, f, indent=2)
     
+    # Persist the accumulators and manifest for the next incremental run
+    save_accumulator_state(state_file, manifest, accumulator)
+    
     # Update timestamp
     with open(os.path.join(output_dir, 'last_updated.txt'), 'w') as f:
         f.write(datetime.now().isoformat())
     
     print("Team statistics calculated and saved successfully!")
 
+def manifest_key(input_dir, file_path):
+    """Manifest key for a match file: its path relative to the input directory"""
+    return os.path.relpath(file_path, input_dir).replace(os.sep, '/')
+
+def file_sha1(file_path):
+    """Content hash of a match file"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_manifest(input_dir, format_files, previous_manifest):
+    """
+    Maps every match file to its content hash.
+    Files whose size and mtime are unchanged reuse the previous hash instead of being re-read.
+    """
+    manifest = {}
+    for file_paths in format_files.values():
+        for file_path in file_paths:
+            key = manifest_key(input_dir, file_path)
+            file_stat = os.stat(file_path)
+            previous = previous_manifest.get(key)
+            if previous and previous["size"] == file_stat.st_size and previous["mtime"] == file_stat.st_mtime:
+                manifest[key] = previous
+            else:
+                manifest[key] = {
+                    "sha1": file_sha1(file_path),
+                    "size": file_stat.st_size,
+                    "mtime": file_stat.st_mtime
+                }
+    return manifest
+
+def diff_manifest(previous_manifest, manifest):
+    """Returns (new files, changed or removed files) between two manifests"""
+    new_files = set()
+    stale_files = set()
+    for key, entry in manifest.items():
+        previous = previous_manifest.get(key)
+        if previous is None:
+            new_files.add(key)
+        elif previous["sha1"] != entry["sha1"]:
+            stale_files.add(key)
+    stale_files.update(key for key in previous_manifest if key not in manifest)
+    return new_files, stale_files
+
+def load_accumulator_state(state_file):
+    """Loads the saved accumulators and manifest, or None if there is no usable state"""
+    if not os.path.exists(state_file):
+        return None
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read accumulator state, rebuilding: {e}")
+        return None
+    if state.get("version") != STATE_VERSION:
+        print("Accumulator state is from an older version, rebuilding")
+        return None
+    return state
+
+def save_accumulator_state(state_file, manifest, accumulator):
+    """Writes the accumulators and manifest atomically"""
+    state = {
+        "version": STATE_VERSION,
+        "manifest": manifest,
+        "formats": accumulator.to_state()
+    }
+    temp_file = state_file + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_file, state_file)
+
+def calculate_derived_stats(team_data):
+    """Derives win percentage, averages, strike rates, roles and strengths from the raw counters"""
+    if team_data["matches_played"] > 0:
+        team_data["win_percentage"] = round((team_data["matches_won"] / team_data["matches_played"]) * 100, 2)
+    
+    # Calculate batting averages and strike rates
+    for player in team_data["players"]:
+        player_stats = team_data["players"][player]
+        
+        # Batting stats
+        if player_stats["batting"]["dismissals"] > 0:
+            player_stats["batting"]["average"] = round(player_stats["batting"]["runs"] / player_stats["batting"]["dismissals"], 2)
+        if player_stats["batting"]["balls_faced"] > 0:
+            player_stats["batting"]["strike_rate"] = round((player_stats["batting"]["runs"] / player_stats["batting"]["balls_faced"]) * 100, 2)
+        
+        # Bowling stats
+        if player_stats["bowling"]["wickets"] > 0:
+            player_stats["bowling"]["average"] = round(player_stats["bowling"]["runs_conceded"] / player_stats["bowling"]["wickets"], 2)
+        if player_stats["bowling"]["balls_bowled"] > 0:
+            player_stats["bowling"]["economy"] = round((player_stats["bowling"]["runs_conceded"] / player_stats["bowling"]["balls_bowled"]) * 6, 2)
+            if player_stats["bowling"]["wickets"] > 0:
+                player_stats["bowling"]["strike_rate"] = round(player_stats["bowling"]["balls_bowled"] / player_stats["bowling"]["wickets"], 2)
+    
+    # Roles depend on the totals, so classify once all matches are in
+    identify_player_roles(team_data["players"])
+    
+    # Identify team strengths
+    identify_team_strengths(team_data)
+
+def chunk_files(file_paths, chunk_size):
+    """Splits a list of files into contiguous shards so merged output keeps file order"""
+    return [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+
+def process_match_shard(format_name, file_paths):
+    """Worker: parses a shard of match files into a partial accumulator"""
+    shard_accumulator = StatsAccumulator()
+    for file_path in file_paths:
+        process_match_file(file_path, format_name, shard_accumulator)
+    return shard_accumulator
+
+def aggregate_in_parallel(format_files, accumulator, workers):
+    """Map match-file shards over a process pool and reduce them into the accumulator"""
+    tasks = []
+    for format_name, file_paths in format_files.items():
+        # A few shards per worker keeps the pool busy when file sizes vary
+        chunk_size = max(1, math.ceil(len(file_paths) / (workers * 4)))
+        for shard in chunk_files(file_paths, chunk_size):
+            tasks.append((format_name, shard))
+    
+    if not tasks:
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() yields in submission order, so the merge is deterministic
+        for shard_accumulator in executor.map(process_match_shard, *zip(*tasks)):
+            accumulator.merge(shard_accumulator)
+
 def create_default_team_stats():
     """Creates a default structure for team statistics"""
     return {
@@ -113,8 +273,140 @@ def create_default_team_stats():
         "strengths": []
     }
 
-def process_match_file(file_path, format_name, all_teams_data):
-    """Process a single match file and update team statistics"""
+# Additive counters that can be summed across shards; everything else is derived
+TEAM_COUNTERS = (
+    "matches_played",
+    "matches_won",
+    "total_runs_scored",
+    "total_wickets_taken",
+    "total_runs_conceded",
+    "total_wickets_lost"
+)
+
+BATTING_COUNTERS = ("innings", "runs", "balls_faced", "dismissals", "fours", "sixes")
+BOWLING_COUNTERS = ("runs_conceded", "wickets", "balls_bowled")
+
+BOWLER_WICKET_KINDS = frozenset(["bowled", "caught", "lbw", "caught and bowled", "stumped"])
+
+class NameIndex:
+    """Interns team or player names into small integer ids"""
+    __slots__ = ("ids", "names")
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.ids[name] = name_id
+            self.names.append(name)
+        return name_id
+
+class PlayerAccumulator:
+    """Integer batting and bowling counters for one player in one team"""
+    __slots__ = BATTING_COUNTERS + BOWLING_COUNTERS
+
+    def __init__(self, counters=None):
+        if counters is None:
+            counters = (0,) * len(self.__slots__)
+        for field, value in zip(self.__slots__, counters):
+            setattr(self, field, value)
+
+    def counters(self):
+        return [getattr(self, field) for field in self.__slots__]
+
+class TeamAccumulator:
+    """Team counters plus its players' accumulators, keyed by interned player id"""
+    __slots__ = TEAM_COUNTERS + ("players",)
+
+    def __init__(self, counters=None):
+        if counters is None:
+            counters = (0,) * len(TEAM_COUNTERS)
+        for field, value in zip(TEAM_COUNTERS, counters):
+            setattr(self, field, value)
+        self.players = {}
+
+    def player(self, player_id):
+        stats = self.players.get(player_id)
+        if stats is None:
+            stats = self.players[player_id] = PlayerAccumulator()
+        return stats
+
+    def counters(self):
+        return [getattr(self, field) for field in TEAM_COUNTERS]
+
+class StatsAccumulator:
+    """Raw counters for every team in every format, with interned team and player names"""
+
+    def __init__(self):
+        self.team_names = NameIndex()
+        self.player_names = NameIndex()
+        self.formats = {format_name: {} for format_name in FORMATS}
+
+    def team(self, format_name, team_name):
+        teams = self.formats[format_name]
+        team_id = self.team_names.intern(team_name)
+        team_stats = teams.get(team_id)
+        if team_stats is None:
+            team_stats = teams[team_id] = TeamAccumulator()
+        return team_stats
+
+    def player_id(self, player_name):
+        return self.player_names.intern(player_name)
+
+    def merge(self, other):
+        """Folds another accumulator (e.g. a worker's shard) into this one"""
+        for format_name, teams in other.formats.items():
+            for team_id, partial in teams.items():
+                team_stats = self.team(format_name, other.team_names.names[team_id])
+                for field in TEAM_COUNTERS:
+                    setattr(team_stats, field, getattr(team_stats, field) + getattr(partial, field))
+                
+                for player_id, partial_player in partial.players.items():
+                    player_stats = team_stats.player(self.player_id(other.player_names.names[player_id]))
+                    for field in PlayerAccumulator.__slots__:
+                        setattr(player_stats, field, getattr(player_stats, field) + getattr(partial_player, field))
+
+    def to_team_stats(self, format_name):
+        """Expands one format into {team name: team statistics} ready for the derived pass"""
+        return {
+            self.team_names.names[team_id]: team_to_dict(team_stats, self.player_names.names)
+            for team_id, team_stats in self.formats[format_name].items()
+        }
+
+    def to_state(self):
+        """Serializable form: counters as flat lists, names spelled out"""
+        return {
+            format_name: {
+                self.team_names.names[team_id]: {
+                    "counters": team_stats.counters(),
+                    "players": {
+                        self.player_names.names[player_id]: stats.counters()
+                        for player_id, stats in team_stats.players.items()
+                    }
+                }
+                for team_id, team_stats in teams.items()
+            }
+            for format_name, teams in self.formats.items()
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        accumulator = cls()
+        for format_name, teams in state.items():
+            if format_name not in accumulator.formats:
+                continue
+            for team_name, saved in teams.items():
+                team_stats = TeamAccumulator(saved["counters"])
+                accumulator.formats[format_name][accumulator.team_names.intern(team_name)] = team_stats
+                for player_name, counters in saved["players"].items():
+                    team_stats.players[accumulator.player_id(player_name)] = PlayerAccumulator(counters)
+        return accumulator
+
+def process_match_file(file_path, format_name, accumulator):
+    """Process a single match file and update the raw team and player counters"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             match_data = json.load(f)
@@ -127,21 +419,18 @@ def process_match_file(file_path, format_name, all_teams_data):
         team1, team2 = teams
         winner = info.get("outcome", {}).get("winner")
         
+        team1_stats = accumulator.team(format_name, team1)
+        team2_stats = accumulator.team(format_name, team2)
+        
         # Update matches played
-        all_teams_data[format_name][team1]["matches_played"] += 1
-        all_teams_data[format_name][team2]["matches_played"] += 1
+        team1_stats.matches_played += 1
+        team2_stats.matches_played += 1
         
         # Update matches won
         if winner == team1:
-            all_teams_data[format_name][team1]["matches_won"] += 1
+            team1_stats.matches_won += 1
         elif winner == team2:
-            all_teams_data[format_name][team2]["matches_won"] += 1
-        
-        # Calculate win percentage
-        for team in [team1, team2]:
-            team_data = all_teams_data[format_name][team]
-            if team_data["matches_played"] > 0:
-                team_data["win_percentage"] = round((team_data["matches_won"] / team_data["matches_played"]) * 100, 2)
+            team2_stats.matches_won += 1
         
         # Process innings data
         innings = match_data.get("innings", [])
@@ -153,13 +442,15 @@ def process_match_file(file_path, format_name, all_teams_data):
             if batting_team not in teams or bowling_team not in teams:
                 continue
             
+            batting_stats = team1_stats if batting_team == team1 else team2_stats
+            bowling_stats = team2_stats if batting_team == team1 else team1_stats
+            
             total_runs = 0
             total_wickets = 0
             
             # Process deliveries - Fixed to match Cricsheet JSON format
             overs = inning.get("overs", [])
             for over_data in overs:
-                over_number = over_data.get("over")
                 deliveries = over_data.get("deliveries", [])
                 
                 for delivery in deliveries:
@@ -187,77 +478,86 @@ def process_match_file(file_path, format_name, all_teams_data):
                             
                             # Update player dismissal
                             if player_out:
-                                ensure_player_exists(all_teams_data[format_name][batting_team]["players"], player_out)
-                                all_teams_data[format_name][batting_team]["players"][player_out]["batting"]["dismissals"] += 1
+                                batting_stats.player(accumulator.player_id(player_out)).dismissals += 1
                                 
                             # Update bowler wickets (only if it's a bowler-credited wicket)
                             kind = wicket.get("kind", "")
-                            if bowler and kind in ["bowled", "caught", "lbw", "caught and bowled", "stumped"]:
-                                ensure_player_exists(all_teams_data[format_name][bowling_team]["players"], bowler)
-                                all_teams_data[format_name][bowling_team]["players"][bowler]["bowling"]["wickets"] += 1
+                            if bowler and kind in BOWLER_WICKET_KINDS:
+                                bowling_stats.player(accumulator.player_id(bowler)).wickets += 1
                     
                     # Update batsman stats
                     if batsman:
-                        ensure_player_exists(all_teams_data[format_name][batting_team]["players"], batsman)
-                        player_stats = all_teams_data[format_name][batting_team]["players"][batsman]["batting"]
-                        player_stats["innings"] += 1
-                        player_stats["runs"] += runs
-                        player_stats["balls_faced"] += 1
+                        player_stats = batting_stats.player(accumulator.player_id(batsman))
+                        player_stats.innings += 1
+                        player_stats.runs += runs
+                        player_stats.balls_faced += 1
                         
                         # Track boundaries
                         if runs == 4:
-                            player_stats["fours"] += 1
+                            player_stats.fours += 1
                         elif runs == 6:
-                            player_stats["sixes"] += 1
+                            player_stats.sixes += 1
                     
-                    # Update bowler stats
+                    # Update bowler stats (overs are derived from balls at output time)
                     if bowler:
-                        ensure_player_exists(all_teams_data[format_name][bowling_team]["players"], bowler)
-                        player_stats = all_teams_data[format_name][bowling_team]["players"][bowler]["bowling"]
-                        player_stats["overs"] += 1/6  # Add 1/6 of an over per delivery
-                        player_stats["runs_conceded"] += total_delivery_runs
-                        player_stats["balls_bowled"] += 1
+                        player_stats = bowling_stats.player(accumulator.player_id(bowler))
+                        player_stats.runs_conceded += total_delivery_runs
+                        player_stats.balls_bowled += 1
             
             # Update team totals
-            all_teams_data[format_name][batting_team]["total_runs_scored"] += total_runs
-            all_teams_data[format_name][batting_team]["total_wickets_lost"] += total_wickets
-            all_teams_data[format_name][bowling_team]["total_runs_conceded"] += total_runs
-            all_teams_data[format_name][bowling_team]["total_wickets_taken"] += total_wickets
-            
-        # After processing all innings, identify player roles
-        for team in teams:
-            identify_player_roles(all_teams_data[format_name][team]["players"])
+            batting_stats.total_runs_scored += total_runs
+            batting_stats.total_wickets_lost += total_wickets
+            bowling_stats.total_runs_conceded += total_runs
+            bowling_stats.total_wickets_taken += total_wickets
+        
+        # Win percentage and player roles are derived once, in calculate_derived_stats
     
     except Exception as e:
         print(f"Error processing match file {file_path}: {str(e)}")
         import traceback
         traceback.print_exc() 
      
-def ensure_player_exists(players_dict, player_name):
-    """Ensures a player exists in the players dictionary"""
-    if player_name not in players_dict:
-        players_dict[player_name] = {
-            "role": "Unknown",
-            "batting": {
-                "innings": 0,
-                "runs": 0,
-                "balls_faced": 0,
-                "dismissals": 0,
-                "average": 0,
-                "strike_rate": 0,
-                "fours": 0,
-                "sixes": 0
-            },
-            "bowling": {
-                "overs": 0,
-                "runs_conceded": 0,
-                "wickets": 0,
-                "economy": 0,
-                "average": 0,
-                "strike_rate": 0,
-                "balls_bowled": 0
-            }
+def create_default_player_stats():
+    """Creates a default structure for player statistics"""
+    return {
+        "role": "Unknown",
+        "batting": {
+            "innings": 0,
+            "runs": 0,
+            "balls_faced": 0,
+            "dismissals": 0,
+            "average": 0,
+            "strike_rate": 0,
+            "fours": 0,
+            "sixes": 0
+        },
+        "bowling": {
+            "overs": 0,
+            "runs_conceded": 0,
+            "wickets": 0,
+            "economy": 0,
+            "average": 0,
+            "strike_rate": 0,
+            "balls_bowled": 0
         }
+    }
+
+def team_to_dict(team_stats, player_names):
+    """Expands a compact team accumulator into the team statistics structure written to JSON"""
+    team_data = create_default_team_stats()
+    for field in TEAM_COUNTERS:
+        team_data[field] = getattr(team_stats, field)
+    
+    for player_id, stats in team_stats.players.items():
+        player_data = create_default_player_stats()
+        for field in BATTING_COUNTERS:
+            player_data["batting"][field] = getattr(stats, field)
+        for field in BOWLING_COUNTERS:
+            player_data["bowling"][field] = getattr(stats, field)
+        player_data["bowling"]["overs"] = stats.balls_bowled / 6
+        team_data["players"][player_names[player_id]] = player_data
+    
+    return team_data
 
 def identify_player_roles(players):
     """Identifies player roles based on their stats"""
@@ -337,5 +637,12 @@ def identify_team_strengths(team_data):
     team_data["strengths"] = strengths
 
 if __name__ == "__main__":
-    calculate_team_stats()
+    parser = argparse.ArgumentParser(description="Calculate team statistics from cricsheet data")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes for parsing match files (default: 1, serial)")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore saved accumulators and recompute every match")
+    args = parser.parse_args()
+    
+    calculate_team_stats(workers=args.workers, full_rebuild=args.full)
     print("Team statistics calculated successfully!")
\ No newline at end of file
@@ -0,0 +1,299 @@
+import os
+import json
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Parquet needs pyarrow; without it the cache falls back to pandas pickles
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.abspath(os.path.join(script_dir, '..', 'public'))
+
+# Cricsheet JSON archives that are flattened into the cache
+SOURCES = {
+    'teamData': os.path.join(PUBLIC_DIR, 'teamData'),
+    'statsData': os.path.join(PUBLIC_DIR, 'statsData'),
+    'vrdata': os.path.join(PUBLIC_DIR, 'vrdata')
+}
+
+CACHE_DIR = os.path.join(PUBLIC_DIR, 'deliveryCache')
+
+# Bumped whenever the table layout changes, so older caches are rebuilt
+CACHE_VERSION = 2
+
+# One row per delivery, with compact dtypes
+DELIVERY_DTYPES = {
+    'match_id': 'category',
+    'innings': 'int8',
+    'super_over': 'bool',
+    'batting_team': 'category',
+    'bowling_team': 'category',
+    'over': 'int16',
+    'ball': 'int8',
+    'batter': 'category',
+    'bowler': 'category',
+    'non_striker': 'category',
+    'runs_batter': 'int16',
+    'runs_extras': 'int16',
+    'runs_total': 'int16',
+    'extras_type': 'category',
+    'is_legal': 'bool',
+    'wickets': 'int8',
+    'wicket_kind': 'category',
+    'player_out': 'category',
+    'wicket_kind_2': 'category',
+    'player_out_2': 'category'
+}
+
+# One row per match
+MATCH_DTYPES = {
+    'match_id': 'category',
+    'format': 'category',
+    'match_type': 'category',
+    'gender': 'category',
+    'date': 'datetime64[ns]',
+    'event': 'category',
+    'venue': 'category',
+    'city': 'category',
+    'team_1': 'category',
+    'team_2': 'category',
+    'toss_winner': 'category',
+    'toss_decision': 'category',
+    'winner': 'category',
+    'result': 'category'
+}
+
+# Wides and no-balls have to be re-bowled; byes and leg byes still count as a ball
+ILLEGAL_EXTRAS = ('wides', 'noballs')
+
+def flatten_match(file_path, format_name=None):
+    """
+    Flatten one Cricsheet match file into a match record and a list of delivery tuples
+    (in DELIVERY_DTYPES column order). A ball can dismiss at most both batters, so
+    its wickets fit in the wicket_kind / player_out and wicket_kind_2 / player_out_2 pairs
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        match_data = json.load(f)
+
+    match_id = os.path.splitext(os.path.basename(file_path))[0]
+    info = match_data.get('info', {})
+    teams = info.get('teams', [])
+    outcome = info.get('outcome', {})
+    toss = info.get('toss', {})
+    event = info.get('event', {})
+
+    match_record = {
+        'match_id': match_id,
+        'format': format_name or str(info.get('match_type', '')).lower(),
+        'match_type': info.get('match_type'),
+        'gender': info.get('gender'),
+        'date': (info.get('dates') or [None])[0],
+        'event': event.get('name') if isinstance(event, dict) else None,
+        'venue': info.get('venue'),
+        'city': info.get('city'),
+        'team_1': teams[0] if len(teams) > 0 else None,
+        'team_2': teams[1] if len(teams) > 1 else None,
+        'toss_winner': toss.get('winner'),
+        'toss_decision': toss.get('decision'),
+        'winner': outcome.get('winner'),
+        'result': outcome.get('result')
+    }
+
+    deliveries = []
+    for innings_number, inning in enumerate(match_data.get('innings', []), 1):
+        batting_team = inning.get('team')
+        bowling_team = next((team for team in teams if team != batting_team), None)
+        super_over = bool(inning.get('super_over', False))
+
+        for over_data in inning.get('overs', []):
+            over_number = over_data.get('over', 0)
+            for ball_number, delivery in enumerate(over_data.get('deliveries', []), 1):
+                runs = delivery.get('runs', {})
+                extras = delivery.get('extras', {})
+                extras_type = next(iter(extras), None) if extras else None
+
+                wickets = delivery.get('wickets', [])
+                if isinstance(wickets, dict):
+                    wickets = [wickets]
+                wickets = [wicket for wicket in wickets if wicket]
+                first_wicket = wickets[0] if wickets else {}
+                second_wicket = wickets[1] if len(wickets) > 1 else {}
+
+                deliveries.append((
+                    match_id,
+                    innings_number,
+                    super_over,
+                    batting_team,
+                    bowling_team,
+                    over_number,
+                    ball_number,
+                    delivery.get('batter'),
+                    delivery.get('bowler'),
+                    delivery.get('non_striker'),
+                    runs.get('batter', 0),
+                    runs.get('extras', 0),
+                    runs.get('total', 0),
+                    extras_type,
+                    not any(kind in extras for kind in ILLEGAL_EXTRAS),
+                    len(wickets),
+                    first_wicket.get('kind'),
+                    first_wicket.get('player_out'),
+                    second_wicket.get('kind'),
+                    second_wicket.get('player_out')
+                ))
+
+    return match_record, deliveries
+
+def list_match_files(source_dir):
+    """Match files in a source archive as (format or None, path); format comes from the sub-directory"""
+    match_files = []
+    for entry in sorted(os.listdir(source_dir)):
+        entry_path = os.path.join(source_dir, entry)
+        if os.path.isdir(entry_path):
+            for file_name in sorted(os.listdir(entry_path)):
+                if file_name.endswith('.json'):
+                    match_files.append((entry, os.path.join(entry_path, file_name)))
+        elif entry.endswith('.json'):
+            match_files.append((None, entry_path))
+    return match_files
+
+def flatten_shard(match_files):
+    """Worker: flatten a shard of match files"""
+    match_records = []
+    deliveries = []
+    for format_name, file_path in match_files:
+        try:
+            match_record, match_deliveries = flatten_match(file_path, format_name)
+        except (OSError, ValueError) as e:
+            print(f"Error flattening {file_path}: {e}")
+            continue
+        match_records.append(match_record)
+        deliveries.extend(match_deliveries)
+    return match_records, deliveries
+
+def to_typed_frame(rows, dtypes, from_records=False):
+    """Build a DataFrame and cast it to the cache's compact dtypes"""
+    if from_records:
+        df = pd.DataFrame.from_records(rows, columns=list(dtypes))
+    else:
+        df = pd.DataFrame(rows, columns=list(dtypes))
+    for column, dtype in dtypes.items():
+        if dtype.startswith('datetime'):
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+def cache_paths(source):
+    """Paths of the cached delivery table, match table and source manifest for a source"""
+    extension = 'parquet' if HAS_PYARROW else 'pkl'
+    return {
+        'deliveries': os.path.join(CACHE_DIR, f"{source}_deliveries.{extension}"),
+        'matches': os.path.join(CACHE_DIR, f"{source}_matches.{extension}"),
+        'manifest': os.path.join(CACHE_DIR, f"{source}_manifest.json")
+    }
+
+def source_manifest(match_files, source_dir):
+    """Relative path -> [size, mtime] for every match file, used to detect a stale cache"""
+    manifest = {}
+    for _, file_path in match_files:
+        file_stat = os.stat(file_path)
+        manifest[os.path.relpath(file_path, source_dir).replace(os.sep, '/')] = [file_stat.st_size, file_stat.st_mtime]
+    return manifest
+
+def is_cache_fresh(source, manifest):
+    """True if the cache exists, has the current layout and was built from exactly these source files"""
+    paths = cache_paths(source)
+    if not all(os.path.exists(path) for path in paths.values()):
+        return False
+    try:
+        with open(paths['manifest'], 'r', encoding='utf-8') as f:
+            return json.load(f) == {'version': CACHE_VERSION, 'files': manifest}
+    except (OSError, ValueError):
+        return False
+
+def write_table(df, path):
+    if HAS_PYARROW:
+        df.to_parquet(path, index=False)
+    else:
+        df.to_pickle(path)
+
+def read_table(path, columns=None):
+    if HAS_PYARROW:
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_pickle(path)
+    return df[columns] if columns is not None else df
+
+def build_delivery_cache(source='teamData', workers=1, force=False):
+    """
+    Flatten every match in a Cricsheet archive into typed delivery and match tables.
+    The cache is only rebuilt when the set of source files (or their size/mtime) changes.
+    """
+    source_dir = SOURCES.get(source, source)
+    source = os.path.basename(os.path.normpath(source_dir))
+    if not os.path.isdir(source_dir):
+        raise FileNotFoundError(f"Cricsheet source directory not found: {source_dir}")
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    paths = cache_paths(source)
+
+    match_files = list_match_files(source_dir)
+    manifest = source_manifest(match_files, source_dir)
+    if not force and is_cache_fresh(source, manifest):
+        return paths
+
+    print(f"Building delivery cache for {source} ({len(match_files)} match files)...")
+
+    match_records = []
+    deliveries = []
+    if workers > 1 and len(match_files) > 1:
+        chunk_size = max(1, math.ceil(len(match_files) / (workers * 4)))
+        shards = [match_files[i:i + chunk_size] for i in range(0, len(match_files), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_matches, shard_deliveries in executor.map(flatten_shard, shards):
+                match_records.extend(shard_matches)
+                deliveries.extend(shard_deliveries)
+    else:
+        match_records, deliveries = flatten_shard(match_files)
+
+    write_table(to_typed_frame(deliveries, DELIVERY_DTYPES, from_records=True), paths['deliveries'])
+    write_table(to_typed_frame(match_records, MATCH_DTYPES), paths['matches'])
+    with open(paths['manifest'], 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': manifest}, f)
+
+    print(f"Cached {len(deliveries)} deliveries from {len(match_records)} matches to {paths['deliveries']}")
+    return paths
+
+def load_deliveries(source='teamData', columns=None, workers=1):
+    """
+    Delivery-level table for a Cricsheet archive (built or refreshed on demand).
+
+    Example: runs per batter across the archive
+        load_deliveries(columns=['batter', 'runs_batter']).groupby('batter', observed=True)['runs_batter'].sum()
+    """
+    paths = build_delivery_cache(source, workers=workers)
+    return read_table(paths['deliveries'], columns)
+
+def load_matches(source='teamData', columns=None, workers=1):
+    """Match-level table (teams, venue, toss, result) for a Cricsheet archive"""
+    paths = build_delivery_cache(source, workers=workers)
+    return read_table(paths['matches'], columns)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flatten Cricsheet JSON archives into a delivery-level cache")
+    parser.add_argument("sources", nargs="*", default=list(SOURCES),
+                        help="Archives to cache (default: all of teamData, statsData, vrdata)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes for parsing match files")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the cache is fresh")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        build_delivery_cache(source, workers=args.workers, force=args.force)
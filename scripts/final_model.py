@@ -2,23 +2,75 @@ import pandas as pd
 import numpy as np
 import json
 import os
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder, OneHotEncoder
-from sklearn.metrics import accuracy_score
+import hashlib
+import argparse
+import time
+import joblib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, wait
+from joblib.externals.loky import get_reusable_executor
+from sklearn.base import clone
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import StratifiedKFold
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder, OrdinalEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 import glob
-from visualizations import create_visualizations
+from player_index import PlayerStatsTables, get_player_index, player_table_sources
+from player_resolver import PlayerResolver
+
+# Optional gradient boosting libraries for model selection
+try:
+    from lightgbm import LGBMClassifier
+except ImportError:
+    LGBMClassifier = None
+try:
+    from xgboost import XGBClassifier
+except ImportError:
+    XGBClassifier = None
 
 # Paths to data files
 base_path = "./public"
 processed_data_path = os.path.join(base_path, "processed_data2.csv")
 matches_json_path = os.path.join(base_path, "matches.json")
 player_data_path = os.path.join(base_path, "player_data")
+name_cache_path = os.path.join(player_data_path, "name_resolution_cache.json")
+player_cache_path = os.path.join(player_data_path, "cache")
 prediction_output_path = os.path.join(base_path, "model/predictions.json")
 visualizations_output_path = os.path.join(base_path, "visualizations")
+model_artifact_path = os.path.join(base_path, "model/match_predictor.joblib")
+model_metadata_path = os.path.join(base_path, "model/match_predictor.json")
+
+# Bump when feature engineering or the pipeline changes so persisted models are retrained
+MODEL_VERSION = 6
+
+# Model family: one model per format, trained on matches whose match_type contains the pattern.
+# match_type is only ever ODI, T20 or Test (IPL matches are T20), and the player tables
+# use the same three formats
+MODEL_FORMATS = {
+    'odi': 'ODI',
+    't20': 'T20',
+    'test': 'Test'
+}
+
+# Formats to score a fixture with when its own format has no trained model
+FORMAT_FALLBACKS = {
+    't20': ['odi'],
+    'test': ['odi'],
+    'odi': ['t20']
+}
+
+# Fewest training matches a format needs to get its own model
+MIN_FORMAT_MATCHES = 50
+
+# Most category codes per column for native categorical models (HistGradientBoosting's bin limit)
+MAX_CATEGORY_CODES = 255
+
+# Wall-clock budget (seconds) for scoring model candidates; a candidate whose folds
+# are still running when it runs out is stopped, and later candidates are skipped
+MODEL_SEARCH_BUDGET = 600
 
 def load_datasets():
     """Load the training and testing datasets"""
@@ -34,66 +86,49 @@ def load_datasets():
     # Load player metadata
     player_metadata = pd.read_csv(os.path.join(player_data_path, "metadata.csv"))
     
-    # Load player statistics (sample - we'll do more comprehensive loading later)
-    odi_batting = pd.read_csv(os.path.join(player_data_path, "odi", "odi_batting.csv"))
-    odi_bowling = pd.read_csv(os.path.join(player_data_path, "odi", "odi_bowling.csv"))
-    odi_fielding = pd.read_csv(os.path.join(player_data_path, "odi", "odi_fielding.csv"))
-    odi_all_round = pd.read_csv(os.path.join(player_data_path, "odi", "odi_all_round.csv"))
+    # Player statistics sample (ODI tables), each read on first access
+    odi_sources = {key: path for key, path in player_table_sources(player_data_path, formats=['odi']).items()
+                   if key.startswith('odi_')}
     
     print(f"Training data shape: {train_data.shape}")
     print(f"Test data (upcoming matches): {len(test_data)}")
     
-    return train_data, test_data, player_metadata, {
-        'odi_batting': odi_batting,
-        'odi_bowling': odi_bowling, 
-        'odi_fielding': odi_fielding,
-        'odi_all_round': odi_all_round
-    }
+    return train_data, test_data, player_metadata, PlayerStatsTables(odi_sources, player_cache_path)
 
 def load_all_player_stats():
-    """Load all player statistics from different formats"""
-    player_stats = {}
-    
-    # Define formats and stat types
-    formats = ['odi', 't20', 'test']
-    stat_types = ['batting', 'bowling', 'fielding', 'all_round']
-    
-    # Load regular stats
-    for format_type in formats:
-        format_path = os.path.join(player_data_path, format_type)
-        if os.path.exists(format_path):
-            for stat_type in stat_types:
-                file_path = os.path.join(format_path, f"{format_type}_{stat_type}.csv")
-                if os.path.exists(file_path):
-                    key = f"{format_type}_{stat_type}"
-                    player_stats[key] = pd.read_csv(file_path)
-    
-    # Load recent form stats
-    recent_form_path = os.path.join(player_data_path, "recent_form")
-    if os.path.exists(recent_form_path):
-        for format_type in formats:
-            recent_path = os.path.join(recent_form_path, format_type)
-            if os.path.exists(recent_path):
-                for stat_type in stat_types:
-                    file_path = os.path.join(recent_path, f"{format_type}_{stat_type}.csv")
-                    if os.path.exists(file_path):
-                        key = f"recent_{format_type}_{stat_type}"
-                        player_stats[key] = pd.read_csv(file_path)
+    """
+    Player statistics for every format, loaded lazily: each table is read (with
+    compact dtypes, through the player_data cache) the first time it's used, and
+    its name index is built on first lookup
+    """
+    player_stats = PlayerStatsTables(player_table_sources(player_data_path), player_cache_path)
+    
+    # Cricbuzz names are resolved to the tables' Cricsheet names through the metadata registry
+    metadata_path = os.path.join(player_data_path, "metadata.csv")
+    if os.path.exists(metadata_path):
+        player_stats.resolver = PlayerResolver.load(metadata_path, name_cache_path)
     
     return player_stats
 
-def extract_team_stats_from_players(player_details, player_stats, format_type='odi'):
-    """Extract team statistics based on player details with focus on key predictive features"""
-    team_stats = {
-        'batting_average': 0,
-        'batting_strike_rate': 0,
-        'bowling_average': 0,
-        'bowling_strike_rate': 0,
-        'economy': 0,
-        'all_round_index': 0,
-        'total_runs': 0,
-        'total_wickets': 0
-    }
+# Team-level stats derived from a playing XI, in output column order
+TEAM_STAT_NAMES = [
+    'batting_average',
+    'batting_strike_rate',
+    'bowling_average',
+    'bowling_strike_rate',
+    'economy',
+    'all_round_index',
+    'total_runs',
+    'total_wickets'
+]
+
+def extract_team_stats_from_players(player_details, player_stats, format_type='odi', team=None):
+    """
+    Extract team statistics based on player details with focus on key predictive features.
+    team is an optional hint for telling apart players whose names resolve ambiguously.
+    """
+    team_stats = {stat: 0 for stat in TEAM_STAT_NAMES}
+    resolver = getattr(player_stats, 'resolver', None)
     
     # Convert format type to lowercase to match file naming
     format_type = format_type.lower()
@@ -117,121 +152,43 @@ def extract_team_stats_from_players(player_details, player_stats, format_type='o
     bowling_key = f"{format_type}_bowling"
     all_round_key = f"{format_type}_all_round"
     
-    # Count how many players we found stats for
-    batting_count = 0
-    bowling_count = 0
-    all_round_count = 0
+    # Resolve the XI against each table's prebuilt name index, then gather and average
+    batting_index = get_player_index(player_stats, batting_key)
+    if batting_index is not None:
+        sums, batting_count = batting_index.gather(batting_index.lookup_players(player_details, resolver, team))
+        if batting_count > 0:
+            team_stats['batting_average'] = sums.get('batting_average', 0) / batting_count
+            team_stats['batting_strike_rate'] = sums.get('strike_rate', 0) / batting_count
+        team_stats['total_runs'] = sums.get('runs', 0)
+    
+    bowling_index = get_player_index(player_stats, bowling_key)
+    if bowling_index is not None:
+        sums, bowling_count = bowling_index.gather(bowling_index.lookup_players(player_details, resolver, team))
+        if bowling_count > 0:
+            for stat in ['bowling_average', 'bowling_strike_rate', 'economy']:
+                team_stats[stat] = sums.get(stat, 0) / bowling_count
+        team_stats['total_wickets'] = sums.get('wickets', 0)
     
-    for player in player_details:
-        player_name = player['name']
-        full_name = player.get('fullName', player_name)
-        
-        # Try both the name and full name for matching
-        names_to_try = [player_name, full_name]
-        
-        # Look for matching player in batting stats
-        if batting_key in player_stats:
-            batting_df = player_stats[batting_key]
-            
-            for name in names_to_try:
-                player_batting = batting_df[batting_df['player'].str.contains(name, case=False, na=False)]
-                if not player_batting.empty:
-                    for stat in ['batting_average', 'strike_rate']:
-                        if stat in player_batting.columns:
-                            stat_value = player_batting[stat].values[0]
-                            # Convert to float and handle non-numeric values
-                            try:
-                                stat_value = float(stat_value)
-                                # Handle infinity or very large values (cap at reasonable maximum)
-                                if stat == 'batting_average':
-                                    if np.isinf(stat_value) or stat_value > 100:
-                                        stat_value = 50  # Cap at reasonable maximum
-                                    team_stats['batting_average'] += stat_value
-                                elif stat == 'strike_rate':
-                                    if np.isinf(stat_value) or stat_value > 250:
-                                        stat_value = 100  # Cap at reasonable maximum
-                                    team_stats['batting_strike_rate'] += stat_value
-                            except (ValueError, TypeError):
-                                # If value can't be converted to float, skip it
-                                continue
-                    
-                    # Add runs if available
-                    if 'runs' in player_batting.columns:
-                        try:
-                            runs = float(player_batting['runs'].values[0])
-                            team_stats['total_runs'] += runs
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    batting_count += 1
-                    break  # Found a match, no need to check other name variations
-        
-        # Look for matching player in bowling stats
-        if bowling_key in player_stats:
-            bowling_df = player_stats[bowling_key]
-            
-            for name in names_to_try:
-                player_bowling = bowling_df[bowling_df['player'].str.contains(name, case=False, na=False)]
-                if not player_bowling.empty:
-                    for stat in ['bowling_average', 'bowling_strike_rate', 'economy']:
-                        if stat in player_bowling.columns:
-                            try:
-                                stat_value = float(player_bowling[stat].values[0])
-                                # Handle infinity or very large values
-                                if np.isinf(stat_value) or stat_value > 100:
-                                    if stat == 'bowling_average':
-                                        stat_value = 30  # Cap at reasonable value
-                                    elif stat == 'bowling_strike_rate':
-                                        stat_value = 50  # Cap at reasonable value
-                                    elif stat == 'economy':
-                                        stat_value = 8  # Cap at reasonable value
-                                
-                                team_stats[stat] += stat_value
-                            except (ValueError, TypeError):
-                                continue
-                    
-                    # Add wickets if available
-                    if 'wickets' in player_bowling.columns:
-                        try:
-                            wickets = float(player_bowling['wickets'].values[0])
-                            team_stats['total_wickets'] += wickets
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    bowling_count += 1
-                    break  # Found a match, no need to check other name variations
-        
-        # Look for matching player in all-round stats
-        if all_round_key in player_stats:
-            all_round_df = player_stats[all_round_key]
-            
-            for name in names_to_try:
-                player_all_round = all_round_df[all_round_df['player'].str.contains(name, case=False, na=False)]
-                if not player_all_round.empty:
-                    if 'all_round_index' in player_all_round.columns:
-                        try:
-                            all_round_index = float(player_all_round['all_round_index'].values[0])
-                            team_stats['all_round_index'] += all_round_index
-                        except (ValueError, TypeError):
-                            pass
-                    all_round_count += 1
-                    break  # Found a match, no need to check other name variations
-    
-    # Calculate averages for the team
-    if batting_count > 0:
-        team_stats['batting_average'] /= batting_count
-        team_stats['batting_strike_rate'] /= batting_count
-    
-    if bowling_count > 0:
-        team_stats['bowling_average'] /= bowling_count
-        team_stats['bowling_strike_rate'] /= bowling_count
-        team_stats['economy'] /= bowling_count
-    
-    if all_round_count > 0:
-        team_stats['all_round_index'] /= all_round_count
+    all_round_index = get_player_index(player_stats, all_round_key)
+    if all_round_index is not None:
+        sums, all_round_count = all_round_index.gather(all_round_index.lookup_players(player_details, resolver, team))
+        if all_round_count > 0:
+            team_stats['all_round_index'] = sums.get('all_round_index', 0) / all_round_count
     
     return team_stats
 
+def build_team_stats_table(team_to_players, player_stats, format_type='odi'):
+    """
+    Compute player-derived stats once per team for a format.
+    Returns a DataFrame indexed by team name with one column per stat.
+    """
+    team_rows = {}
+    for team, players in team_to_players.items():
+        if players:
+            team_rows[team] = extract_team_stats_from_players(players, player_stats, format_type)
+    
+    return pd.DataFrame.from_dict(team_rows, orient='index', columns=list(TEAM_STAT_NAMES))
+
 def extract_features_from_processed_data(processed_data, player_stats, format_type='odi'):
     """
     Extract player-based features from processed data to align with prediction phase.
@@ -255,6 +212,10 @@ def extract_features_from_processed_data(processed_data, player_stats, format_ty
                 player_team_df = player_stats[key][['player', 'team']].drop_duplicates()
                 player_team_mapping = pd.concat([player_team_mapping, player_team_df])
     
+    if player_team_mapping.empty:
+        print(f"No {format_type} player tables with a 'team' column, skipping player-based features")
+        return processed_data
+    
     player_team_mapping = player_team_mapping.drop_duplicates().reset_index(drop=True)
     
     # Create dummy player rosters for each team
@@ -269,28 +230,22 @@ def extract_features_from_processed_data(processed_data, player_stats, format_ty
             top_players = team_players['player'].iloc[:min(11, len(team_players))].tolist()
             team_to_players[team] = [{'name': player} for player in top_players]
     
-    # Add player-based features to the training data
+    # Compute each team's player-derived stats once, then map them onto both team columns
+    team_stats_table = build_team_stats_table(team_to_players, player_stats, format_type)
+    
     enhanced_data = processed_data.copy()
     
-    # Add player-based stats for each match
-    for idx, row in enhanced_data.iterrows():
-        team1 = row['team_1']
-        team2 = row['team_2']
-        
-        # Extract player details for each team
-        team1_players = team_to_players.get(team1, [])
-        team2_players = team_to_players.get(team2, [])
-        
-        # Calculate team stats based on player details
-        if team1_players:
-            team1_stats = extract_team_stats_from_players(team1_players, player_stats, format_type)
-            for stat, value in team1_stats.items():
-                enhanced_data.at[idx, f'{stat}_{format_type}_team_1_from_players'] = value
-        
-        if team2_players:
-            team2_stats = extract_team_stats_from_players(team2_players, player_stats, format_type)
-            for stat, value in team2_stats.items():
-                enhanced_data.at[idx, f'{stat}_{format_type}_team_2_from_players'] = value
+    for team_num in ['1', '2']:
+        if team_stats_table.empty:
+            break
+        team_col = f'team_{team_num}'
+        for stat in team_stats_table.columns:
+            col = f'{stat}_{format_type}_team_{team_num}_from_players'
+            values = enhanced_data[team_col].map(team_stats_table[stat]).astype('float64')
+            if col in enhanced_data.columns:
+                # Keep existing values for teams we have no roster for
+                values = values.fillna(enhanced_data[col])
+            enhanced_data[col] = values
     
     # Fill NaN values for the new columns
     player_stat_cols = [col for col in enhanced_data.columns if col.endswith('_from_players')]
@@ -300,16 +255,19 @@ def extract_features_from_processed_data(processed_data, player_stats, format_ty
             base_col = col.replace('_from_players', '')
             if base_col in enhanced_data.columns:
                 # Fill missing player-based stats with existing pre-calculated stats
-                enhanced_data[col].fillna(enhanced_data[base_col], inplace=True)
+                enhanced_data[col] = enhanced_data[col].fillna(enhanced_data[base_col])
             else:
                 # Fill remaining NaNs with 0
-                enhanced_data[col].fillna(0, inplace=True)
+                enhanced_data[col] = enhanced_data[col].fillna(0)
     
     print(f"Enhanced training data with player-based features: {enhanced_data.shape}")
     return enhanced_data
 
-def clean_training_data(train_data):
-    """Clean and prepare the training data"""
+def clean_training_data(train_data, match_format='odi'):
+    """
+    Clean and prepare the training data, keeping only matches of match_format
+    (a MODEL_FORMATS key; all formats if None)
+    """
     print("Cleaning training data...")
     
     # Select essential columns, prioritizing performance metrics across all formats
@@ -376,8 +334,8 @@ def clean_training_data(train_data):
     cleaned_data = cleaned_data.dropna(subset=['winner'])
     
     # Filter only for matches with the format in the test data (ODI for ICC Champions Trophy)
-    if 'match_type' in cleaned_data.columns:
-        cleaned_data = cleaned_data[cleaned_data['match_type'].str.contains('ODI', case=False, na=False)]
+    if match_format is not None and 'match_type' in cleaned_data.columns:
+        cleaned_data = cleaned_data[cleaned_data['match_type'].str.contains(MODEL_FORMATS[match_format], case=False, na=False)]
     
     # Convert string columns to category for lighter memory usage
     categorical_cols = ['team_1', 'team_2', 'winner', 'venue', 'city', 'match_type', 
@@ -392,10 +350,110 @@ def clean_training_data(train_data):
     print(f"Cleaned training data shape: {cleaned_data.shape}")
     return cleaned_data
 
-def prepare_test_data(test_data, player_stats, train_data):
-    """Prepare test data (upcoming matches) for prediction"""
+def split_training_by_format(cleaned_data, player_stats=None):
+    """
+    Split training data cleaned for all formats into one frame per MODEL_FORMATS entry.
+    Formats with too few matches (or only one outcome) to train on are left out.
+    With player_stats, each format's frame gets player-derived features from that
+    format's player tables.
+    """
+    if 'match_type' not in cleaned_data.columns:
+        return {'odi': cleaned_data}
+    
+    # Match the format patterns against the category labels once, not every row
+    match_type = cleaned_data['match_type'].astype('category')
+    labels = match_type.cat.categories.astype(str)
+    
+    format_data = {}
+    for format_type, pattern in MODEL_FORMATS.items():
+        matching_labels = match_type.cat.categories[labels.str.contains(pattern, case=False)]
+        subset = cleaned_data[match_type.isin(matching_labels)]
+        if len(subset) < MIN_FORMAT_MATCHES or subset['team_1_won'].nunique() < 2:
+            print(f"Skipping {format_type} model: only {len(subset)} training matches")
+            continue
+        if player_stats is not None:
+            subset = extract_features_from_processed_data(subset, player_stats, format_type)
+        format_data[format_type] = subset
+    return format_data
+
+def fixture_format(match_info):
+    """Model format for an upcoming fixture: its match format"""
+    format_type = str(match_info.get('matchFormat', '')).lower()
+    if format_type == 'international':
+        format_type = 'odi'  # Default
+    return format_type
+
+def resolve_model_format(format_type, available_formats):
+    """The trained format a fixture is scored with, falling back to the closest trained format"""
+    for candidate in [format_type] + FORMAT_FALLBACKS.get(format_type, []):
+        if candidate in available_formats:
+            return candidate
+    return next(iter(available_formats))
+
+def prepare_fixtures_by_format(test_data, player_stats, histories):
+    """
+    Prepare test data with each fixture's history taken from its own format's history
+    index ({format: build_history_index(format training data)}), and player-derived
+    features from the player tables of the format whose model scores it. Adds a
+    model_format column naming that model; rows keep the order of test_data.
+    """
+    routes = {}
+    for position, match in enumerate(test_data):
+        model_format = resolve_model_format(fixture_format(match['details']['matchInfo']), histories)
+        routes.setdefault(model_format, []).append(position)
+    
+    prepared = []
+    for model_format, positions in routes.items():
+        format_fixtures = prepare_test_data([test_data[position] for position in positions], player_stats,
+                                            None, history=histories[model_format], format_type=model_format)
+        format_fixtures['model_format'] = model_format
+        format_fixtures.index = positions
+        prepared.append(format_fixtures)
+    
+    return pd.concat(prepared).sort_index().reset_index(drop=True)
+
+def build_history_index(train_data):
+    """
+    Aggregate training history once: matches played and won per team, and the most
+    common venue_category per venue, so each upcoming fixture is a dictionary lookup
+    """
+    team_1 = train_data['team_1'].astype(object)
+    team_2 = train_data['team_2'].astype(object)
+    winner = train_data['winner'].astype(object)
+    
+    # A team plays a match if it is on either side, and wins it if it is also the winner
+    teams = pd.concat([team_1, team_2], ignore_index=True)
+    team_matches = teams.value_counts()
+    team_won = (winner == team_1) | (winner == team_2)
+    team_wins = winner[team_won].value_counts()
+    
+    venue_category = {}
+    if 'venue_category' in train_data.columns:
+        # Equivalent of mode()[0] per venue: highest count, ties go to the first category in sort order
+        counts = train_data.groupby(
+            [train_data['venue'].astype(object), train_data['venue_category'].astype(object)]
+        ).size()
+        if not counts.empty:
+            venue_category = counts.groupby(level=0).idxmax().map(lambda key: key[1]).to_dict()
+    
+    return {
+        'team_matches': team_matches.to_dict(),
+        'team_wins': team_wins.to_dict(),
+        'venue_category': venue_category
+    }
+
+def prepare_test_data(test_data, player_stats, train_data, history=None, format_type=None):
+    """
+    Prepare test data (upcoming matches) for prediction.
+    Player-derived features use format_type's player tables, or each fixture's own
+    match format if format_type is None.
+    """
     print("Preparing test data...")
     
+    # Team and venue history from the training data, aggregated once for all fixtures
+    if history is None:
+        history = build_history_index(train_data)
+    
     test_features = []
     
     for match in test_data:
@@ -417,68 +475,48 @@ def prepare_test_data(test_data, player_stats, train_data):
             match_dict['toss_winner'] = match_info['toss'].get('winner', '')
             match_dict['toss_decision'] = match_info['toss'].get('decision', '')
         
+        # Player stats come from the scoring model's format, so the columns match its training data
+        stats_format = format_type or fixture_format(match_info)
+        
         # Extract team 1 player details and calculate team stats
         team1_players = match_info['team1']['playerDetails']
         team1_stats = extract_team_stats_from_players(team1_players, player_stats, 
-                                                     format_type=match_info['matchFormat'])
+                                                     format_type=stats_format,
+                                                     team=match_dict['team_1'])
         
         # Extract team 2 player details and calculate team stats
         team2_players = match_info['team2']['playerDetails']
         team2_stats = extract_team_stats_from_players(team2_players, player_stats,
-                                                     format_type=match_info['matchFormat'])
+                                                     format_type=stats_format,
+                                                     team=match_dict['team_2'])
         
         # Add team stats to match dictionary
-        format_type = match_info['matchFormat'].lower()
-        if format_type == 'international':
-            format_type = 'odi'  # Default
-            
         for stat, value in team1_stats.items():
             # Use the same column names as in training data with player-derived suffix
-            match_dict[f'{stat}_{format_type}_team_1_from_players'] = value
+            match_dict[f'{stat}_{stats_format}_team_1_from_players'] = value
         
         for stat, value in team2_stats.items():
             # Use the same column names as in training data with player-derived suffix
-            match_dict[f'{stat}_{format_type}_team_2_from_players'] = value
+            match_dict[f'{stat}_{stats_format}_team_2_from_players'] = value
         
         # Add historical win percentages if available in training data
-        team1_name = match_dict['team_1']
-        team2_name = match_dict['team_2']
-        
-        # Calculate historical win percentages from training data
-        team1_matches = train_data[(train_data['team_1'] == team1_name) | (train_data['team_2'] == team1_name)]
-        
-        # Fix Boolean Series key reindexing warning by properly filtering
-        team1_wins_condition1 = (train_data['team_1'] == team1_name) & (train_data['winner'] == team1_name)
-        team1_wins_condition2 = (train_data['team_2'] == team1_name) & (train_data['winner'] == team1_name)
-        team1_wins = len(train_data[team1_wins_condition1 | team1_wins_condition2])
-        
-        team2_matches = train_data[(train_data['team_1'] == team2_name) | (train_data['team_2'] == team2_name)]
-        
-        # Fix Boolean Series key reindexing warning by properly filtering
-        team2_wins_condition1 = (train_data['team_1'] == team2_name) & (train_data['winner'] == team2_name)
-        team2_wins_condition2 = (train_data['team_2'] == team2_name) & (train_data['winner'] == team2_name)
-        team2_wins = len(train_data[team2_wins_condition1 | team2_wins_condition2])
-        
-        if len(team1_matches) > 0:
-            match_dict['team_1_win_percentage'] = team1_wins / len(team1_matches) * 100
-        else:
-            match_dict['team_1_win_percentage'] = 50  # Default if no history
-            
-        if len(team2_matches) > 0:
-            match_dict['team_2_win_percentage'] = team2_wins / len(team2_matches) * 100
-        else:
-            match_dict['team_2_win_percentage'] = 50  # Default if no history
+        for team_key in ['team_1', 'team_2']:
+            team_name = match_dict[team_key]
+            matches_played = history['team_matches'].get(team_name, 0)
+            if matches_played > 0:
+                match_dict[f'{team_key}_win_percentage'] = history['team_wins'].get(team_name, 0) / matches_played * 100
+            else:
+                match_dict[f'{team_key}_win_percentage'] = 50  # Default if no history
         
         # Add venue category if available
-        venue_name = match_dict['venue']
-        venue_data = train_data[train_data['venue'] == venue_name]
-        if 'venue_category' in train_data.columns and not venue_data.empty:
-            match_dict['venue_category'] = venue_data['venue_category'].mode()[0]
-        else:
-            match_dict['venue_category'] = 'Neutral'  # Default if no category found
+        match_dict['venue_category'] = history['venue_category'].get(match_dict['venue'], 'Neutral')  # Default if no category found
             
         test_features.append(match_dict)
     
+    # Keep this run's name resolutions for the next one
+    if getattr(player_stats, 'resolver', None) is not None:
+        player_stats.resolver.save()
+    
     test_df = pd.DataFrame(test_features)
     print(f"Test data prepared with shape: {test_df.shape}")
     
@@ -496,8 +534,105 @@ def align_feature_columns(test_data, train_columns):
     
     return test_data
 
-def train_model(train_data):
-    """Train a prediction model using processed training data"""
+def build_preprocessor(numerical_cols, categorical_cols, encoding='onehot'):
+    """
+    Imputation and categorical encoding shared by the model candidates.
+    
+    encoding='onehot' one-hot encodes categoricals sparsely; once the one-column-per-venue
+    blow-up makes the matrix mostly zeros it is kept sparse, so memory grows with the
+    non-zero entries rather than with the number of venues.
+    encoding='ordinal' integer-codes them for models with native categorical splits;
+    categoricals come first in the output (columns 0..len(categorical_cols)-1).
+    """
+    numerical_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='mean'))
+    ])
+    
+    if encoding == 'ordinal':
+        # Unseen values become NaN, which native categorical splits treat as missing.
+        # Rare categories beyond HistGradientBoosting's 255-bin limit share one code
+        categorical_transformer = Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+            ('ordinal', OrdinalEncoder(
+                handle_unknown='use_encoded_value', unknown_value=np.nan,
+                max_categories=MAX_CATEGORY_CODES
+            ))
+        ])
+    else:
+        categorical_transformer = Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=True))
+        ])
+    
+    # Create preprocessor with non-empty transformers
+    transformers = []
+    if categorical_cols and encoding == 'ordinal':
+        transformers.append(('cat', categorical_transformer, categorical_cols))
+    if numerical_cols:
+        transformers.append(('num', numerical_transformer, numerical_cols))
+    if categorical_cols and encoding != 'ordinal':
+        transformers.append(('cat', categorical_transformer, categorical_cols))
+    
+    return ColumnTransformer(
+        transformers=transformers,
+        remainder='drop',  # Drop any columns not specified
+        sparse_threshold=0.3  # Stays dense while there are few venues, goes sparse once one-hot columns dominate
+    )
+
+def build_model_candidates(n_jobs=-1, n_categorical=0):
+    """
+    Candidate classifiers for model selection, cheapest first, as
+    (name, classifier, encoding). Gradient boosting stops early on an internal
+    validation split. HistGradientBoosting splits natively on the n_categorical
+    integer-coded columns; the others take sparse one-hot input.
+    """
+    candidates = [
+        ('RandomForest', RandomForestClassifier(
+            n_estimators=100, n_jobs=n_jobs, random_state=42
+        ), 'onehot'),
+        ('RandomForest (tuned)', RandomForestClassifier(
+            n_estimators=200,           # Increased from 100
+            max_depth=20,               # Control tree depth
+            min_samples_split=5,        # Min samples required to split
+            min_samples_leaf=2,         # Min samples required at leaf
+            bootstrap=True,             # Use bootstrap samples
+            class_weight='balanced',    # Handle class imbalance
+            n_jobs=n_jobs,
+            random_state=42
+        ), 'onehot'),
+        ('HistGradientBoosting', HistGradientBoostingClassifier(
+            max_iter=500, learning_rate=0.05, early_stopping=True,
+            validation_fraction=0.1, n_iter_no_change=20, random_state=42,
+            categorical_features=list(range(n_categorical)) or None
+        ), 'ordinal')
+    ]
+    
+    # LightGBM and XGBoost are optional
+    if LGBMClassifier is not None:
+        candidates.append(('LightGBM', LGBMClassifier(
+            n_estimators=300, learning_rate=0.05, num_leaves=31, n_jobs=n_jobs, random_state=42, verbose=-1
+        ), 'onehot'))
+    if XGBClassifier is not None:
+        candidates.append(('XGBoost', XGBClassifier(
+            n_estimators=300, learning_rate=0.05, max_depth=6, tree_method='hist',
+            n_jobs=n_jobs, random_state=42, eval_metric='logloss'
+        ), 'onehot'))
+    
+    return candidates
+
+def score_fold(pipeline, X, y, train_index, test_index):
+    """Worker: fit a pipeline on one CV fold and return its accuracy on the held-out rows"""
+    pipeline.fit(X.iloc[train_index], y.iloc[train_index])
+    return pipeline.score(X.iloc[test_index], y.iloc[test_index])
+
+def train_model(train_data, n_jobs=-1, time_budget=None, cv_folds=5):
+    """
+    Train a prediction model using processed training data.
+    Candidates from build_model_candidates are all scored on the same CV folds until
+    time_budget seconds have passed, and the best one is refitted on all rows.
+    """
+    if time_budget is None:
+        time_budget = MODEL_SEARCH_BUDGET
     print("Training prediction model...")
     
     # Identify high-importance categorical and numerical columns based on your results
@@ -532,62 +667,78 @@ def train_model(train_data):
     numerical_cols = [col for col in train_data.columns 
                       if col not in categorical_cols and col not in non_feature_cols]
     
-    # Create a RandomForestClassifier with better hyperparameters
-    classifier = RandomForestClassifier(
-        n_estimators=200,           # Increased from 100
-        max_depth=20,               # Control tree depth
-        min_samples_split=5,        # Min samples required to split
-        min_samples_leaf=2,         # Min samples required at leaf
-        bootstrap=True,             # Use bootstrap samples
-        class_weight='balanced',    # Handle class imbalance
-        random_state=42
-    )
-    
-    # Rest of the function remains mostly the same with preprocessing... 
-    # Prepare preprocessing pipeline
-    categorical_transformer = Pipeline(steps=[
-        ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
-    ])
-    
-    numerical_transformer = Pipeline(steps=[
-        ('imputer', SimpleImputer(strategy='mean'))
-    ])
-    
-    # Create preprocessor with non-empty transformers
-    transformers = []
-    if numerical_cols:
-        transformers.append(('num', numerical_transformer, numerical_cols))
-    if categorical_cols:
-        transformers.append(('cat', categorical_transformer, categorical_cols))
-    
-    preprocessor = ColumnTransformer(
-        transformers=transformers,
-        remainder='drop'  # Drop any columns not specified
-    )
-    
-    # Create the model pipeline
-    model = Pipeline(steps=[
-        ('preprocessor', preprocessor),
-        ('classifier', RandomForestClassifier(n_estimators=100, random_state=42))
-    ])
-    
     # Target variable
     y = train_data['team_1_won']
     
     # Features - drop non-feature columns
     X = train_data.drop(non_feature_cols, axis=1)
     
-    # Train-validation split
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Every candidate is scored on the same folds, so their accuracies are comparable
+    folds = list(StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42).split(X, y))
+    # Folds run in worker processes (at least two, so there is always a process to stop);
+    # each fit is single-threaded since the folds are the parallelism
+    fold_workers = max(2, min(joblib.effective_n_jobs(n_jobs), len(folds)))
     
-    # Fit the model
-    model.fit(X_train, y_train)
-    
-    # Evaluate the model
-    y_pred = model.predict(X_val)
-    accuracy = accuracy_score(y_val, y_pred)
-    print(f"Model validation accuracy: {accuracy:.4f}")
+    # Score every candidate, then refit the best one on all training rows
+    results = []
+    search_deadline = time.perf_counter() + time_budget
+    for name, classifier, encoding in build_model_candidates(1, len(categorical_cols)):
+        remaining = search_deadline - time.perf_counter()
+        if results and remaining <= 0:
+            print(f"Search budget of {time_budget}s used up, skipping {name}")
+            continue
+        
+        candidate = Pipeline(steps=[
+            ('preprocessor', build_preprocessor(numerical_cols, categorical_cols, encoding)),
+            ('classifier', classifier)
+        ])
+        
+        candidate_start = time.perf_counter()
+        executor = get_reusable_executor(max_workers=fold_workers)
+        futures = [executor.submit(score_fold, clone(candidate), X, y, train_index, test_index)
+                   for train_index, test_index in folds]
+        # The first candidate always finishes, so there is a model to select
+        _, pending = wait(futures, timeout=remaining if results else None)
+        if pending:
+            # Kill the workers so overrunning fits stop now instead of running on in the background
+            executor.shutdown(wait=True, kill_workers=True)
+            print(f"Search budget of {time_budget}s used up while scoring {name}, skipping it")
+            continue
+        try:
+            score = np.mean([future.result() for future in futures])
+        except Exception as e:
+            print(f"Warning: Could not evaluate {name}: {e}")
+            continue
+        seconds = time.perf_counter() - candidate_start
+        
+        print(f"  {name:<24} cv accuracy {score:.4f}  ({seconds:.1f}s)")
+        results.append((score, name, candidate))
+    
+    if not results:
+        raise RuntimeError("No model candidate could be trained")
+    
+    # Highest score wins; ties keep the earlier (cheaper) candidate
+    score, name, model = max(results, key=lambda result: result[0])
+    print(f"Selected {name}")
+    
+    # The final fit has the machine to itself, so let it use every core
+    if 'n_jobs' in model['classifier'].get_params():
+        model.set_params(classifier__n_jobs=n_jobs)
+    model.fit(X, y)
+    
+    print(f"Model validation accuracy: {score:.4f}")
+    
+    if not hasattr(model['classifier'], 'feature_importances_'):
+        # Models without impurity importances (HistGradientBoosting) get permutation
+        # importances instead, measured on the raw input columns of the training rows
+        importances = permutation_importance(model, X, y, scoring='accuracy', n_repeats=5,
+                                             random_state=42, n_jobs=n_jobs)
+        model.permutation_importances_ = importances.importances_mean
+        print("Top 10 important features (permutation):")
+        print(pd.DataFrame({
+            'Feature': X.columns,
+            'Importance': model.permutation_importances_
+        }).sort_values(by='Importance', ascending=False).head(10))
     
     # Get feature importance if available
     if hasattr(model['classifier'], 'feature_importances_'):
@@ -631,79 +782,232 @@ def train_model(train_data):
     
     return model, X.columns.tolist()
 
-def predict_matches(model, test_data, feature_cols):
-    """Make predictions on upcoming matches"""
+def predict_with_model_family(model_family, test_data):
+    """
+    Make predictions on upcoming matches, scoring each fixture with the model for
+    its format (the model_format column set by prepare_fixtures_by_format)
+    """
     print("Making predictions on upcoming matches...")
     
-    # Align test data columns with training feature columns
-    X_test = align_feature_columns(test_data, feature_cols)
-    
-    # Make predictions
-    team1_win_prob = model.predict_proba(X_test)[:, 1]
+    team1_win_prob = np.zeros(len(test_data))
+    for format_type, positions in test_data.groupby('model_format', sort=False).indices.items():
+        entry = model_family[format_type]
+        # Columns only other formats' fixtures have are all-NaN here; drop them so they default like any missing feature
+        format_rows = test_data.iloc[positions].dropna(axis=1, how='all')
+        X_test = align_feature_columns(format_rows, entry['feature_cols'])
+        team1_win_prob[positions] = entry['model'].predict_proba(X_test)[:, 1]
     
+    return format_prediction_records(test_data, team1_win_prob)
+
+def format_prediction_records(test_data, team1_win_prob):
+    """Add win probabilities to test_data and build the display records"""
     # Add predictions to test data
     test_data['team_1_win_probability'] = team1_win_prob
     test_data['team_2_win_probability'] = 1 - team1_win_prob
     
-    # Format results for display
-    results = []
-    for _, match in test_data.iterrows():
-        result = {
-            'Match': f"{match['team_1']} vs {match['team_2']}",
-            'Venue': f"{match['venue']}, {match['city']}",
-            'Format': match['match_type'],
+    # Format results for display, a column at a time
+    matches = test_data['team_1'].astype(str) + " vs " + test_data['team_2'].astype(str)
+    venues = test_data['venue'].astype(str) + ", " + test_data['city'].astype(str)
+    team1_pct = format_percentages(test_data['team_1_win_probability'])
+    team2_pct = format_percentages(test_data['team_2_win_probability'])
+    
+    results = [
+        {
+            'match_id': match_id,
+            'Match': match,
+            'Venue': venue,
+            'Format': match_type,
             'Prediction': {
-                match['team_1']: f"{match['team_1_win_probability'] * 100:.2f}%",
-                match['team_2']: f"{match['team_2_win_probability'] * 100:.2f}%"
+                team1: f"{pct1}%",
+                team2: f"{pct2}%"
             }
         }
-        results.append(result)
+        for match_id, match, venue, match_type, team1, team2, pct1, pct2 in zip(
+            test_data['match_id'].tolist(), matches.tolist(), venues.tolist(),
+            test_data['match_type'].tolist(), test_data['team_1'].tolist(), test_data['team_2'].tolist(),
+            team1_pct.tolist(), team2_pct.tolist())
+    ]
     
     return results
 
-def save_predictions_to_json(predictions, test_data, output_path):
-    """Save predictions to JSON file for frontend use"""
+def format_percentages(probabilities):
+    """Win probabilities (0-1) as percentage strings with two decimals"""
+    return (probabilities * 100).map('{:.2f}'.format)
+
+def save_predictions_to_json(test_data, output_path, ndjson=False):
+    """
+    Save predictions to JSON file for frontend use.
+    test_data must be the frame predict_with_model_family scored (it carries match_id and
+    the win probabilities). With ndjson=True the records are streamed one per line
+    instead of written as a single array.
+    """
     print(f"Saving predictions to {output_path}...")
     
     # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
     
-    # Format predictions for JSON
-    formatted_predictions = []
-    for pred in predictions:
-        match_id = None
-        for _, match_row in test_data.iterrows():
-            if (f"{match_row['team_1']} vs {match_row['team_2']}" == pred['Match'] and 
-                match_row['venue'] in pred['Venue']):
-                match_id = match_row['match_id']
-                break
-        
-        # Safely get the team names from prediction keys
-        prediction_keys = list(pred['Prediction'].keys())
-        team1 = prediction_keys[0] if prediction_keys else "Unknown"
-        team2 = prediction_keys[1] if len(prediction_keys) > 1 else "Unknown"
-        
-        formatted_pred = {
+    # Probabilities are rounded exactly as they are displayed
+    team1_pct = format_percentages(test_data['team_1_win_probability']).astype(float)
+    team2_pct = format_percentages(test_data['team_2_win_probability']).astype(float)
+    venues = test_data['venue'].astype(str) + ", " + test_data['city'].astype(str)
+    
+    formatted_predictions = (
+        {
             "match_id": match_id,
             "teams": {
                 "team1": team1,
                 "team2": team2
             },
             "probabilities": {
-                team1: float(pred['Prediction'].get(team1, "0").strip('%')) if team1 != "Unknown" else 0,
-                team2: float(pred['Prediction'].get(team2, "0").strip('%')) if team2 != "Unknown" else 0
+                team1: pct1,
+                team2: pct2
             },
-            "venue": pred['Venue'],
-            "format": pred['Format']
+            "venue": venue,
+            "format": match_type
         }
-        formatted_predictions.append(formatted_pred)
+        for match_id, team1, team2, pct1, pct2, venue, match_type in zip(
+            test_data['match_id'].tolist(), test_data['team_1'].tolist(), test_data['team_2'].tolist(),
+            team1_pct.tolist(), team2_pct.tolist(), venues.tolist(), test_data['match_type'].tolist())
+    )
+    
+    if ndjson:
+        count = write_predictions_ndjson(formatted_predictions, output_path)
+    else:
+        formatted_predictions = list(formatted_predictions)
+        count = len(formatted_predictions)
+        # Compact separators keep large batches small
+        with open(output_path, 'w') as f:
+            json.dump(formatted_predictions, f, separators=(',', ':'))
     
-    # Write to JSON file
+    print(f"Saved {count} prediction results to {output_path}")
+
+def predictions_path(ndjson=False):
+    """Output path for predictions; NDJSON output goes next to predictions.json"""
+    if ndjson:
+        return os.path.splitext(prediction_output_path)[0] + ".ndjson"
+    return prediction_output_path
+
+def write_predictions_ndjson(records, output_path):
+    """Stream prediction records to a newline-delimited JSON file, one record per line"""
+    count = 0
     with open(output_path, 'w') as f:
-        json.dump(formatted_predictions, f, indent=2)
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+def file_sha256(file_path):
+    """Content hash of a file"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def player_data_sha256(data_dir=player_data_path):
+    """Combined hash of every player_data CSV (stats tables and metadata), keyed by relative path"""
+    digest = hashlib.sha256()
+    for file_path in sorted(glob.glob(os.path.join(data_dir, '**', '*.csv'), recursive=True)):
+        digest.update(os.path.relpath(file_path, data_dir).replace(os.sep, '/').encode())
+        digest.update(file_sha256(file_path).encode())
+    return digest.hexdigest()
+
+def compute_training_fingerprint(data_path, feature_columns, player_data_dir=player_data_path):
+    """
+    Hash of the training data, the player_data tables, each format's feature columns
+    ({format: [columns]}) and the model version
+    """
+    digest = hashlib.sha256(file_sha256(data_path).encode())
+    digest.update(player_data_sha256(player_data_dir).encode())
+    digest.update(json.dumps({
+        'feature_columns': {fmt: list(columns) for fmt, columns in sorted(feature_columns.items())},
+        'model_version': MODEL_VERSION
+    }).encode())
+    return digest.hexdigest()
+
+def load_model_metadata():
+    """Metadata saved alongside the persisted model, or {} if there is none"""
+    if not os.path.exists(model_metadata_path):
+        return {}
+    try:
+        with open(model_metadata_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_model_artifact(fingerprint=None):
+    """
+    Load the persisted model family: {format: {'model': pipeline, 'feature_cols': [...],
+    'history': history index}}. Returns None if the model was saved by another
+    MODEL_VERSION, or if a fingerprint is given and doesn't match the saved one.
+    """
+    metadata = load_model_metadata()
+    if not metadata or not os.path.exists(model_artifact_path):
+        return None
+    if metadata.get('model_version') != MODEL_VERSION:
+        return None
+    if fingerprint is not None and metadata.get('fingerprint') != fingerprint:
+        return None
     
-    print(f"Saved {len(formatted_predictions)} prediction results to {output_path}")
-def main():
+    try:
+        artifact = joblib.load(model_artifact_path)
+    except Exception as e:
+        print(f"Warning: Could not load persisted model: {e}")
+        return None
+    return artifact.get('models')
+
+def save_model_artifact(model_family, fingerprint):
+    """Persist the trained model family with the fingerprint of the data it was trained on"""
+    os.makedirs(os.path.dirname(model_artifact_path), exist_ok=True)
+    joblib.dump({'models': model_family}, model_artifact_path)
+    
+    metadata = {
+        'fingerprint': fingerprint,
+        'data_sha256': file_sha256(processed_data_path),
+        'player_data_sha256': player_data_sha256(),
+        'formats': {fmt: list(entry['feature_cols']) for fmt, entry in model_family.items()},
+        'model_version': MODEL_VERSION,
+        'trained_at': datetime.now().isoformat()
+    }
+    with open(model_metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    print(f"Saved {len(model_family)} models to {model_artifact_path}")
+
+def train_format_model(format_type, format_train_data, n_jobs=-1):
+    """Worker: train the model for one format"""
+    print(f"Training {format_type} model on {len(format_train_data)} matches...")
+    model, feature_cols = train_model(format_train_data, n_jobs=n_jobs)
+    return format_type, model, feature_cols
+
+def train_model_family(format_data, workers=None, n_jobs=-1):
+    """
+    Train one model per format, concurrently in a process pool.
+    Returns {format: {'model': pipeline, 'feature_cols': [...], 'history': history index}};
+    the history index is kept so predict-only runs never need the training data.
+    """
+    cpu_count = os.cpu_count() or 1
+    if workers is None:
+        workers = min(len(format_data), cpu_count)
+    
+    results = []
+    if workers > 1 and len(format_data) > 1:
+        # Split the cores between the formats so concurrent searches don't oversubscribe them
+        if n_jobs == -1:
+            n_jobs = max(1, cpu_count // workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(train_format_model, format_type, format_train_data, n_jobs)
+                       for format_type, format_train_data in format_data.items()]
+            results = [future.result() for future in futures]
+    else:
+        results = [train_format_model(format_type, format_train_data, n_jobs)
+                   for format_type, format_train_data in format_data.items()]
+    
+    return {format_type: {'model': model, 'feature_cols': feature_cols,
+                          'history': build_history_index(format_data[format_type])}
+            for format_type, model, feature_cols in results}
+
+def main(mode='auto', ndjson=False, n_jobs=-1, workers=None, visualize=True, charts='png', thumbnails=False):
     # Set pandas options to display more columns
     pd.set_option('display.max_columns', 100)
     
@@ -716,66 +1020,122 @@ def main():
     # Check if player_stats has the required columns before enhancing data
     has_team_column = False
     
-    # Default format type - try to detect from test data first
-    format_type = 'odi'  # Default
-    
-    # Analyze what format the test matches are in
-    match_formats = []
-    for match in test_data:
-        match_info = match['details']['matchInfo']
-        if 'matchFormat' in match_info:
-            match_formats.append(match_info['matchFormat'].lower())
-    
-    # If most matches are T20, use that as primary format
-    if match_formats and match_formats.count('t20') > len(match_formats)/2:
-        format_type = 't20'
-    
-    # Check if any of the dataframes in player_stats has a 'team' column
-    for key, df in player_stats.items():
-        if 'team' in df.columns:
+    # Check if any of the dataframes in player_stats has a 'team' column (headers only, nothing is loaded)
+    for key in player_stats:
+        if 'team' in player_stats.columns(key):
             has_team_column = True
             break
     
-    # Rest of the function remains similar...
-    
-    if has_team_column:
-        # Enhance training data with player-based features
-        enhanced_train_data = extract_features_from_processed_data(train_data, player_stats, format_type)
-    else:
+    if not has_team_column:
         print("Warning: No 'team' column found in player statistics. Skipping player-based feature extraction.")
-        enhanced_train_data = train_data.copy()
     
-    # Clean training data
-    cleaned_train_data = clean_training_data(enhanced_train_data)
+    # Clean training data once for every format, then split it per format; each format
+    # gets player-based features from its own player tables
+    cleaned_train_data = clean_training_data(train_data, match_format=None)
+    format_data = split_training_by_format(cleaned_train_data, player_stats if has_team_column else None)
+    if not format_data:
+        print("Error: No format has enough training matches to train a model")
+        return
     
-    # Prepare test data
-    prepared_test_data = prepare_test_data(test_data, player_stats, cleaned_train_data)
+    # Prepare test data, routing each fixture to its format's model
+    histories = {fmt: build_history_index(df) for fmt, df in format_data.items()}
+    prepared_test_data = prepare_fixtures_by_format(test_data, player_stats, histories)
     
-    # Train prediction model
     try:
-        model, feature_cols = train_model(cleaned_train_data)
+        # Reuse the persisted models unless the training data or features changed
+        feature_columns = {fmt: list(df.columns) for fmt, df in format_data.items()}
+        fingerprint = compute_training_fingerprint(processed_data_path, feature_columns)
+        model_family = None if mode == 'train' else load_model_artifact(fingerprint)
+        
+        if model_family is None:
+            # Train one prediction model per format
+            model_family = train_model_family(format_data, workers=workers, n_jobs=n_jobs)
+            save_model_artifact(model_family, fingerprint)
+        else:
+            print("Training data unchanged, using persisted models")
         
         # Make predictions
-        # In your main function, after making predictions:
-        predictions = predict_matches(model, prepared_test_data, feature_cols)
+        predictions = predict_with_model_family(model_family, prepared_test_data)
                 
         # Save predictions to JSON for frontend use
-        save_predictions_to_json(predictions,prepared_test_data, prediction_output_path)
+        save_predictions_to_json(prepared_test_data, predictions_path(ndjson), ndjson=ndjson)
                 
-        # Create and save visualizations
-        create_visualizations(model, feature_cols, cleaned_train_data, prepared_test_data, visualizations_output_path)
-
-        # Display predictions
-        print("\nMatch Predictions:")
-        for pred in predictions:
-            print(f"\n{pred['Match']} at {pred['Venue']} ({pred['Format']})")
-            print("Win Probability:")
-            for team, probability in pred['Prediction'].items():
-                print(f"  {team}: {probability}")
+        # Create and save visualizations for the format most fixtures are scored with.
+        # Imported here so matplotlib/seaborn are only loaded when charts are wanted
+        if visualize:
+            from visualizations import create_visualizations
+            primary_format = prepared_test_data['model_format'].mode()[0]
+            primary_model = model_family[primary_format]
+            create_visualizations(primary_model['model'], primary_model['feature_cols'], format_data[primary_format],
+                                  prepared_test_data, visualizations_output_path,
+                                  output_format=charts, thumbnails=thumbnails)
+
+        display_predictions(predictions)
     except Exception as e:
         print(f"Error during model training or prediction: {e}")
         import traceback
         traceback.print_exc()
 
+def predict_only(ndjson=False):
+    """
+    Score upcoming matches with the persisted models, without reading the training
+    data or retraining: team win percentages and venue categories come from the history
+    index saved with each model. Falls back to a full run if no current model has been saved.
+    """
+    model_family = load_model_artifact()
+    if model_family is None:
+        print("No persisted model found, running full training")
+        return main(mode='auto', ndjson=ndjson)
+    
+    metadata = load_model_metadata()
+    if metadata.get('data_sha256') != file_sha256(processed_data_path):
+        print("Warning: training data has changed since the persisted model was trained; run without predict-only to retrain")
+    if metadata.get('player_data_sha256') != player_data_sha256():
+        print("Warning: player_data has changed since the persisted model was trained; run without predict-only to retrain")
+    
+    with open(matches_json_path, 'r') as f:
+        test_data = json.load(f)
+    
+    # Fixture XIs still need the player tables, which are read lazily per format
+    player_stats = load_all_player_stats()
+    histories = {fmt: entry['history'] for fmt, entry in model_family.items()}
+    prepared_test_data = prepare_fixtures_by_format(test_data, player_stats, histories)
+    
+    predictions = predict_with_model_family(model_family, prepared_test_data)
+    save_predictions_to_json(prepared_test_data, predictions_path(ndjson), ndjson=ndjson)
+    display_predictions(predictions)
+
+def display_predictions(predictions):
+    """Print predictions to the console"""
+    print("\nMatch Predictions:")
+    for pred in predictions:
+        print(f"\n{pred['Match']} at {pred['Venue']} ({pred['Format']})")
+        print("Win Probability:")
+        for team, probability in pred['Prediction'].items():
+            print(f"  {team}: {probability}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the match prediction model and score upcoming matches")
+    parser.add_argument("mode", nargs="?", default="auto", choices=["auto", "train", "predict-only"],
+                        help="auto: retrain only if the training data changed (default); "
+                             "train: always retrain; predict-only: score with the persisted model")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Stream predictions to predictions.ndjson, one match per line")
+    parser.add_argument("--jobs", type=int, default=-1,
+                        help="Parallel jobs for cross-validation and forest fits (default: all cores)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes for training the per-format models concurrently (default: one per format, up to the core count)")
+    parser.add_argument("--no-visualizations", action="store_true",
+                        help="Skip rendering the charts in public/visualizations")
+    parser.add_argument("--charts", default="png", choices=["png", "json", "both"],
+                        help="png: render chart images (default); json: write only the chart data "
+                             "(visualizations/charts.json) for the frontend to draw; both: do both")
+    parser.add_argument("--thumbnails", action="store_true",
+                        help="Also write low-resolution WebP/PNG previews of the rendered charts")
+    args = parser.parse_args()
+    
+    if args.mode == 'predict-only':
+        predict_only(ndjson=args.ndjson)
+    else:
+        main(mode=args.mode, ndjson=args.ndjson, n_jobs=args.jobs, workers=args.workers,
+             visualize=not args.no_visualizations, charts=args.charts, thumbnails=args.thumbnails)
\ No newline at end of file
@@ -0,0 +1,342 @@
+import os
+import json
+import math
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import log_loss
+
+from delivery_cache import PUBLIC_DIR, load_deliveries, load_matches
+
+MODEL_PATH = os.path.join(PUBLIC_DIR, 'model', 'live_win_probability.json')
+MODEL_VERSION = 1
+
+# Archives in the delivery cache that the model is trained on
+TRAINING_SOURCES = ['teamData', 'statsData']
+
+# Limited-overs formats only (a Test can be drawn); IPL is a T20 competition
+FORMAT_ALIASES = {'t20': 't20', 'it20': 't20', 'ipl': 't20', 'odi': 'odi', 'odm': 'odi'}
+MAX_BALLS = {'t20': 120, 'odi': 300}
+
+# Retirements are recorded as wickets but don't use up one of the batting side's ten
+NON_WICKET_KINDS = ('retired hurt', 'retired not out')
+ILLEGAL_EXTRAS = ('wides', 'noballs')
+
+# Venue pars are shrunk toward the format's average first-innings total by this many matches
+VENUE_PAR_PRIOR = 5
+
+def innings_features(innings, runs, wickets, legal_balls, target, max_balls, par):
+    """
+    Model inputs for a match state; works on scalars (live updates) and on
+    NumPy arrays (training) alike. First innings: progress against the venue par;
+    second innings: what the chase still needs.
+    """
+    balls_left = max_balls - legal_balls
+    overs_fraction_left = balls_left / max_balls
+    wickets_left = (10 - wickets) / 10
+
+    if innings == 1:
+        return [
+            (runs - par * (1 - overs_fraction_left)) / par,  # runs ahead of par so far
+            wickets_left,
+            wickets_left * overs_fraction_left,               # resources left
+            overs_fraction_left
+        ]
+
+    runs_needed = target - runs
+    return [
+        runs_needed / par,
+        runs_needed / np.maximum(balls_left, 1) * 0.6,        # required rate per over, in tens
+        wickets_left,
+        wickets_left * overs_fraction_left,
+        overs_fraction_left
+    ]
+
+class LiveState:
+    """Running state of a live limited-overs match; team_1 batted first"""
+
+    __slots__ = ('params', 'innings', 'runs', 'wickets', 'legal_balls', 'target',
+                 'max_balls', 'par', 'team_1', 'team_2', 'first_innings_total')
+
+    def __init__(self, params, par, team_1=None, team_2=None):
+        self.params = params
+        self.innings = 1
+        self.runs = 0
+        self.wickets = 0
+        self.legal_balls = 0
+        self.target = 0
+        self.max_balls = params['max_balls']
+        self.par = par
+        self.team_1 = team_1
+        self.team_2 = team_2
+        self.first_innings_total = None
+
+def next_innings(state):
+    """Start the chase: the target is one more than the first-innings total"""
+    state.first_innings_total = state.runs
+    state.target = state.runs + 1
+    state.innings = 2
+    state.runs = 0
+    state.wickets = 0
+    state.legal_balls = 0
+    return state
+
+def innings_complete(state):
+    return state.wickets >= 10 or state.legal_balls >= state.max_balls
+
+def batting_side_probability(state, innings, runs, wickets, legal_balls, target):
+    """Probability that the side batting in the given innings state wins"""
+    model = state.params['innings'][str(innings)]
+    features = innings_features(innings, runs, wickets, legal_balls, target, state.max_balls, state.par)
+    logit = model['intercept']
+    for coefficient, value in zip(model['coef'], features):
+        logit += coefficient * value
+    return 1 / (1 + math.exp(-logit))
+
+def probability(state):
+    """
+    Win probability of team_1 (the side batting first) in the current state.
+    In the first innings the first-innings model is blended, by the batting
+    resources (wickets x overs) used up, into the chase model facing the projected
+    total. Once the innings is over that is exactly the chase model at the real
+    target, so the probability carries over the innings break without a jump.
+    """
+    if state.innings == 2:
+        runs_needed = state.target - state.runs
+        if runs_needed <= 0:
+            return 0.0
+        if innings_complete(state):
+            return 0.5 if runs_needed == 1 else 1.0
+        return 1 - batting_side_probability(state, 2, state.runs, state.wickets, state.legal_balls, state.target)
+
+    overs_fraction_left = max(state.max_balls - state.legal_balls, 0) / state.max_balls
+    resources_left = max(10 - state.wickets, 0) / 10 * overs_fraction_left
+    projected_total = state.runs + state.par * resources_left
+    chase = 1 - batting_side_probability(state, 2, 0, 0, 0, projected_total + 1)
+    if resources_left <= 0:
+        return chase
+    first_innings = batting_side_probability(state, 1, state.runs, state.wickets, state.legal_balls, 0)
+    return resources_left * first_innings + (1 - resources_left) * chase
+
+def update(state, delivery):
+    """
+    Apply one Cricsheet-style delivery (runs / extras / wickets) to the state and
+    return team_1's win probability. Constant work per ball. The first innings
+    rolls over into the chase automatically once it is bowled out or its overs are
+    used up; call next_innings for declarations or interruptions.
+    """
+    if state.innings == 1 and innings_complete(state):
+        next_innings(state)
+
+    state.runs += delivery.get('runs', {}).get('total', 0)
+
+    extras = delivery.get('extras')
+    if not extras or not any(kind in extras for kind in ILLEGAL_EXTRAS):
+        state.legal_balls += 1
+
+    wickets = delivery.get('wickets')
+    if wickets:
+        if isinstance(wickets, dict):
+            wickets = [wickets]
+        state.wickets += sum(1 for wicket in wickets if wicket and wicket.get('kind') not in NON_WICKET_KINDS)
+
+    return probability(state)
+
+class LiveWinProbability:
+    """Trained in-play model: per format, a logistic model per innings plus venue pars"""
+
+    def __init__(self, model_path=MODEL_PATH):
+        with open(model_path, 'r', encoding='utf-8') as f:
+            self.model = json.load(f)
+
+    def new_state(self, format_type, venue=None, team_1=None, team_2=None):
+        """State at the start of a match; team_1 bats first"""
+        format_type = FORMAT_ALIASES.get(str(format_type).lower())
+        if format_type not in self.model['formats']:
+            raise ValueError(f"No live model for format: {format_type}")
+        params = self.model['formats'][format_type]
+        par = params['venue_par'].get(venue, params['par'])
+        return LiveState(params, par, team_1, team_2)
+
+    update = staticmethod(update)
+    probability = staticmethod(probability)
+    next_innings = staticmethod(next_innings)
+
+    def probabilities(self, state):
+        """Win probability for each team"""
+        team_1_wins = probability(state)
+        return {state.team_1: team_1_wins, state.team_2: 1 - team_1_wins}
+
+def load_training_states(sources=TRAINING_SOURCES):
+    """
+    One row per delivery of decided limited-overs matches: the state after the ball,
+    the match's format and venue, and whether the batting side went on to win
+    """
+    deliveries = []
+    matches = []
+    seen = set()
+    for source in sources:
+        source_matches = load_matches(source).astype({'match_id': str, 'format': str, 'venue': str})
+        # The same match can be in several archives; keep the first copy
+        source_matches = source_matches[~source_matches['match_id'].isin(seen)]
+        seen.update(source_matches['match_id'])
+
+        source_deliveries = load_deliveries(source, columns=[
+            'match_id', 'innings', 'super_over', 'batting_team', 'runs_total', 'is_legal', 'wickets',
+            'wicket_kind', 'wicket_kind_2'
+        ]).astype({'match_id': str, 'batting_team': str, 'wicket_kind': object, 'wicket_kind_2': object})
+        matches.append(source_matches)
+        deliveries.append(source_deliveries[source_deliveries['match_id'].isin(source_matches['match_id'])])
+
+    matches = pd.concat(matches, ignore_index=True)
+    matches['format'] = matches['format'].str.lower().map(FORMAT_ALIASES)
+    matches = matches[matches['format'].notna() & matches['winner'].notna()]
+    matches = matches.astype({'winner': str})
+
+    deliveries = pd.concat(deliveries, ignore_index=True)
+    deliveries = deliveries[~deliveries['super_over'] & deliveries['innings'].isin([1, 2])]
+    deliveries = deliveries[deliveries['match_id'].isin(matches['match_id'])]
+
+    retired = (deliveries['wicket_kind'].isin(NON_WICKET_KINDS).astype(np.int8) +
+               deliveries['wicket_kind_2'].isin(NON_WICKET_KINDS).astype(np.int8))
+    innings_key = [deliveries['match_id'], deliveries['innings']]
+    states = pd.DataFrame({
+        'match_id': deliveries['match_id'],
+        'innings': deliveries['innings'].astype(np.int64),
+        'runs': deliveries['runs_total'].groupby(innings_key).cumsum(),
+        'wickets': (deliveries['wickets'] - retired).groupby(innings_key).cumsum(),
+        'legal_balls': deliveries['is_legal'].astype(np.int64).groupby(innings_key).cumsum(),
+        'batting_team': deliveries['batting_team']
+    })
+
+    match_info = matches.set_index('match_id')
+    states['format'] = states['match_id'].map(match_info['format'])
+    states['venue'] = states['match_id'].map(match_info['venue'])
+    states['batting_side_won'] = (states['batting_team'] == states['match_id'].map(match_info['winner'])).astype(int)
+
+    # Chases need the first-innings total
+    first_innings_totals = states[states['innings'] == 1].groupby('match_id')['runs'].last()
+    states['target'] = states['match_id'].map(first_innings_totals).fillna(0) + 1
+    states = states[(states['innings'] == 1) | states['match_id'].isin(first_innings_totals.index)]
+    return states, first_innings_totals
+
+def venue_pars(states, first_innings_totals):
+    """Average first-innings total per format and per venue (shrunk toward the format average)"""
+    firsts = pd.DataFrame({'total': first_innings_totals})
+    match_rows = states.drop_duplicates('match_id').set_index('match_id')
+    firsts['format'] = match_rows['format']
+    firsts['venue'] = match_rows['venue']
+
+    pars = {}
+    for format_type, format_firsts in firsts.groupby('format'):
+        par = float(format_firsts['total'].mean())
+        venues = format_firsts.groupby('venue')['total'].agg(['sum', 'count'])
+        shrunk = (venues['sum'] + VENUE_PAR_PRIOR * par) / (venues['count'] + VENUE_PAR_PRIOR)
+        pars[format_type] = (par, shrunk.round(1).to_dict())
+    return pars
+
+def train(output_path=MODEL_PATH, sources=TRAINING_SOURCES, holdout_fraction=0.2, seed=42):
+    """Fit the per-format, per-innings logistic models and save their coefficients as JSON"""
+    states, first_innings_totals = load_training_states(sources)
+    pars = venue_pars(states, first_innings_totals)
+
+    # Hold out whole matches to report how well the probabilities are calibrated
+    match_ids = states['match_id'].unique()
+    rng = np.random.default_rng(seed)
+    holdout_ids = set(rng.choice(match_ids, int(len(match_ids) * holdout_fraction), replace=False))
+
+    formats = {}
+    for format_type, format_states in states.groupby('format'):
+        if format_type not in pars:
+            continue
+        par, venue_par = pars[format_type]
+        match_par = format_states['venue'].map(venue_par).fillna(par).to_numpy()
+
+        params = {'max_balls': MAX_BALLS[format_type], 'par': round(par, 1), 'venue_par': venue_par, 'innings': {}}
+        for innings in (1, 2):
+            mask = (format_states['innings'] == innings).to_numpy()
+            rows = format_states[mask]
+            if rows['batting_side_won'].nunique() < 2:
+                continue
+
+            X = np.column_stack(innings_features(
+                innings, rows['runs'].to_numpy(), rows['wickets'].to_numpy(), rows['legal_balls'].to_numpy(),
+                rows['target'].to_numpy(), MAX_BALLS[format_type], match_par[mask]))
+            y = rows['batting_side_won'].to_numpy()
+            holdout = rows['match_id'].isin(holdout_ids).to_numpy()
+
+            classifier = LogisticRegression(C=1.0, max_iter=1000)
+            classifier.fit(X[~holdout], y[~holdout])
+            if holdout.any() and len(np.unique(y[holdout])) == 2:
+                loss = log_loss(y[holdout], classifier.predict_proba(X[holdout])[:, 1])
+                print(f"{format_type} innings {innings}: {(~holdout).sum()} training states, holdout log loss {loss:.3f}")
+
+            # Refit on every match for the saved model
+            classifier.fit(X, y)
+            params['innings'][str(innings)] = {
+                'coef': [float(value) for value in classifier.coef_[0]],
+                'intercept': float(classifier.intercept_[0])
+            }
+
+        if len(params['innings']) == 2:
+            formats[format_type] = params
+
+    model = {
+        'model_version': MODEL_VERSION,
+        'trained_at': pd.Timestamp.now().isoformat(),
+        'formats': formats
+    }
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(model, f, indent=2)
+    print(f"Saved live win probability model for {', '.join(formats)} to {output_path}")
+    return model
+
+def replay(match_path, model_path=MODEL_PATH):
+    """Replay a Cricsheet match file ball by ball, printing team_1's win probability each over"""
+    with open(match_path, 'r', encoding='utf-8') as f:
+        match_data = json.load(f)
+
+    info = match_data.get('info', {})
+    innings_list = [inning for inning in match_data.get('innings', []) if not inning.get('super_over')]
+    if not innings_list:
+        raise ValueError(f"No innings in {match_path}")
+
+    team_1 = innings_list[0].get('team')
+    team_2 = next((team for team in info.get('teams', []) if team != team_1), None)
+
+    live_model = LiveWinProbability(model_path)
+    state = live_model.new_state(info.get('match_type'), info.get('venue'), team_1, team_2)
+
+    updates = 0
+    elapsed = 0.0
+    for innings_number, inning in enumerate(innings_list[:2], 1):
+        if innings_number == 2 and state.innings == 1:
+            next_innings(state)
+        for over_data in inning.get('overs', []):
+            for delivery in over_data.get('deliveries', []):
+                start = time.perf_counter()
+                win_probability = update(state, delivery)
+                elapsed += time.perf_counter() - start
+                updates += 1
+            print(f"Innings {state.innings} over {over_data.get('over', 0) + 1}: "
+                  f"{state.runs}/{state.wickets}  {team_1} {win_probability * 100:.1f}%")
+
+    print(f"Winner: {info.get('outcome', {}).get('winner', 'none')}")
+    print(f"{updates} updates, {elapsed / max(updates, 1) * 1e6:.1f} microseconds per update")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ball-by-ball live win probability model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("train", help="Train on the cached Cricsheet deliveries")
+    replay_parser = subparsers.add_parser("replay", help="Replay a Cricsheet match file ball by ball")
+    replay_parser.add_argument("match_file")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train()
+    else:
+        replay(args.match_file)
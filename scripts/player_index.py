@@ -0,0 +1,275 @@
+import os
+import bisect
+from collections.abc import MutableMapping
+
+import numpy as np
+import pandas as pd
+
+from delivery_cache import HAS_PYARROW, read_table, write_table
+
+# Stat columns gathered per table type, with the caps final_model has always
+# applied to infinite / implausibly large values: (column, cap threshold, capped value)
+STAT_COLUMNS = {
+    'batting': [
+        ('batting_average', 100, 50),
+        ('strike_rate', 250, 100),
+        ('runs', None, None)
+    ],
+    'bowling': [
+        ('bowling_average', 100, 30),
+        ('bowling_strike_rate', 100, 50),
+        ('economy', 100, 8),
+        ('wickets', None, None)
+    ],
+    'all_round': [
+        ('all_round_index', None, None)
+    ]
+}
+
+# Tables under public/player_data, by format and stat type
+PLAYER_FORMATS = ['odi', 't20', 'test']
+PLAYER_STAT_TYPES = ['batting', 'bowling', 'fielding', 'all_round']
+
+# Columns read as categories; everything numeric is read as float32
+TEXT_COLUMNS = ('player', 'team', 'role', 'name', 'country')
+
+def normalize_name(name):
+    """Lowercase a player name and collapse whitespace so lookups are case-insensitive"""
+    if not isinstance(name, str):
+        return ''
+    return ' '.join(name.lower().split())
+
+class PlayerIndex:
+    """
+    Name -> row lookup over a single player stats table.
+
+    Exact (normalized) names resolve through a hash map. Anything else falls back to
+    a sorted token list: every token of the query must be a prefix of some token of
+    the player's name, and the first matching row in file order wins, the same row
+    the old str.contains scan would have returned for whole-word queries.
+    """
+
+    def __init__(self, df, stat_type):
+        self.stat_type = stat_type
+        self.size = len(df)
+
+        names = df['player'].tolist() if 'player' in df.columns else []
+
+        self.exact = {}
+        token_rows = {}
+        for row, name in enumerate(names):
+            normalized = normalize_name(name)
+            if not normalized:
+                continue
+            self.exact.setdefault(normalized, row)
+            for token in normalized.split():
+                token_rows.setdefault(token, []).append(row)
+
+        self.tokens = sorted(token_rows)
+        self.token_rows = [np.array(token_rows[token], dtype=np.int64) for token in self.tokens]
+
+        # Pre-capped float columns so a team lookup is a single gather
+        self.columns = {}
+        for column, threshold, capped in STAT_COLUMNS.get(stat_type, []):
+            if column not in df.columns:
+                continue
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, copy=True)
+            if threshold is not None:
+                values[np.isinf(values) | (values > threshold)] = capped
+            self.columns[column] = values
+
+        self._cache = {}
+
+    def _prefix_rows(self, token):
+        """Rows whose name has a token starting with the given prefix"""
+        start = bisect.bisect_left(self.tokens, token)
+        end = bisect.bisect_left(self.tokens, token + '\uffff')
+        if start == end:
+            return None
+        if end - start == 1:
+            return self.token_rows[start]
+        return np.unique(np.concatenate(self.token_rows[start:end]))
+
+    def lookup(self, name):
+        """Return the row position for a player name, or -1 if there is no match"""
+        normalized = normalize_name(name)
+        if normalized in self._cache:
+            return self._cache[normalized]
+
+        row = self.exact.get(normalized, -1)
+        if row < 0 and normalized:
+            candidates = None
+            for token in normalized.split():
+                rows = self._prefix_rows(token)
+                if rows is None:
+                    candidates = None
+                    break
+                candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+                if len(candidates) == 0:
+                    break
+            if candidates is not None and len(candidates) > 0:
+                row = int(candidates[0])
+
+        self._cache[normalized] = row
+        return row
+
+    def lookup_players(self, player_details, resolver=None, team=None):
+        """
+        Resolve a list of player dicts (name / fullName) to row positions.
+        With a PlayerResolver, names that aren't in the table verbatim are mapped to
+        their registry name ('Shreyas Iyer' -> 'SS Iyer') instead of the token-prefix
+        fallback, which can't bridge full names to initials and picks arbitrarily
+        between players sharing a surname.
+        """
+        positions = np.full(len(player_details), -1, dtype=np.int64)
+        for i, player in enumerate(player_details):
+            player_name = player['name']
+            names = (player_name, player.get('fullName', player_name))
+            if resolver is None:
+                for name in names:
+                    row = self.lookup(name)
+                    if row >= 0:
+                        positions[i] = row
+                        break
+                continue
+
+            for name in names:
+                row = self.exact.get(normalize_name(name), -1)
+                if row >= 0:
+                    break
+            else:
+                resolved = resolver.resolve_player(player, team)
+                row = self.exact.get(normalize_name(resolved), -1) if resolved else -1
+            positions[i] = row
+        return positions
+
+    def gather(self, positions):
+        """Sum each stat column over the matched rows; returns (sums, matched count)"""
+        matched = positions[positions >= 0]
+        sums = {column: float(values[matched].sum()) for column, values in self.columns.items()}
+        return sums, len(matched)
+
+def build_player_indexes(player_stats):
+    """Build a PlayerIndex for every batting / bowling / all-round table in player_stats"""
+    indexes = {}
+    for key, df in player_stats.items():
+        for stat_type in STAT_COLUMNS:
+            if key.endswith(f"_{stat_type}"):
+                indexes[key] = PlayerIndex(df, stat_type)
+                break
+    return indexes
+
+class PlayerStatsTables(MutableMapping):
+    """
+    Mapping of player stats tables that loads each table on first access (see
+    player_table_sources and read_player_table). It also carries the tables' name
+    indexes, built on demand by get_player_index, and optionally a PlayerResolver
+    for names that aren't in the tables verbatim.
+    """
+
+    def __init__(self, sources=None, cache_dir=None):
+        self.sources = dict(sources or {})
+        self.cache_dir = cache_dir
+        self.tables = {}
+        self.indexes = {}
+        self.resolver = None
+
+    def __getitem__(self, key):
+        if key not in self.tables:
+            if key not in self.sources:
+                raise KeyError(key)
+            self.tables[key] = read_player_table(self.sources[key], self.cache_dir)
+        return self.tables[key]
+
+    def __setitem__(self, key, df):
+        self.tables[key] = df
+        self.indexes.pop(key, None)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.tables.pop(key, None)
+        self.sources.pop(key, None)
+        self.indexes.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self.tables or key in self.sources
+
+    def __iter__(self):
+        return iter(dict.fromkeys([*self.sources, *self.tables]))
+
+    def __len__(self):
+        return len(set(self.sources) | set(self.tables))
+
+    def columns(self, key):
+        """Column names of a table, from the CSV header if it hasn't been loaded yet"""
+        if key in self.tables:
+            return list(self.tables[key].columns)
+        return list(pd.read_csv(self.sources[key], nrows=0).columns)
+
+    def build_indexes(self):
+        """Eagerly load every table and build its index"""
+        self.indexes = build_player_indexes(self)
+        return self
+
+def player_table_sources(player_data_path, formats=PLAYER_FORMATS, stat_types=PLAYER_STAT_TYPES):
+    """
+    Table key -> CSV path for the player_data tables that exist: {format}/{format}_{stat}.csv
+    as '{format}_{stat}', and recent_form/{format}_{stat}_recent.csv as 'recent_{format}_{stat}'
+    """
+    sources = {}
+    for format_type in formats:
+        for stat_type in stat_types:
+            file_path = os.path.join(player_data_path, format_type, f"{format_type}_{stat_type}.csv")
+            if os.path.exists(file_path):
+                sources[f"{format_type}_{stat_type}"] = file_path
+    for format_type in formats:
+        for stat_type in stat_types:
+            file_path = os.path.join(player_data_path, "recent_form", f"{format_type}_{stat_type}_recent.csv")
+            if os.path.exists(file_path):
+                sources[f"recent_{format_type}_{stat_type}"] = file_path
+    return sources
+
+def read_player_table(file_path, cache_dir=None):
+    """
+    Read a player_data CSV with compact dtypes: category for names and other text
+    columns, float32 for the stats. With a cache_dir, the typed table is cached
+    (Parquet, or a pickle without pyarrow) and reused until the CSV is modified.
+    """
+    cache_path = None
+    if cache_dir:
+        extension = 'parquet' if HAS_PYARROW else 'pkl'
+        cache_path = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(file_path))[0]}.{extension}")
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            try:
+                return read_table(cache_path)
+            except Exception:
+                pass
+
+    header = pd.read_csv(file_path, nrows=0).columns
+    df = pd.read_csv(file_path, dtype={column: 'category' for column in header if column in TEXT_COLUMNS})
+    for column in df.columns:
+        if pd.api.types.is_numeric_dtype(df[column]) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(np.float32)
+        elif pd.api.types.is_string_dtype(df[column]) or pd.api.types.is_object_dtype(df[column]):
+            df[column] = df[column].astype('category')
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_table(df, cache_path)
+    return df
+
+def get_player_index(player_stats, key):
+    """Return the prebuilt index for a table, building one if the caller passed a plain dict"""
+    indexes = getattr(player_stats, 'indexes', None)
+    if indexes is not None and key in indexes:
+        return indexes[key]
+    if key not in player_stats:
+        return None
+    for stat_type in STAT_COLUMNS:
+        if key.endswith(f"_{stat_type}"):
+            index = PlayerIndex(player_stats[key], stat_type)
+            if indexes is not None:
+                indexes[key] = index
+            return index
+    return None
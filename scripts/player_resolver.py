@@ -0,0 +1,211 @@
+import os
+import json
+import unicodedata
+
+import pandas as pd
+
+from player_index import normalize_name
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+PLAYER_DATA_DIR = os.path.abspath(os.path.join(script_dir, '..', 'public', 'player_data'))
+METADATA_PATH = os.path.join(PLAYER_DATA_DIR, 'metadata.csv')
+CACHE_PATH = os.path.join(PLAYER_DATA_DIR, 'name_resolution_cache.json')
+CACHE_VERSION = 2
+
+# Fuzzy matches need at least this trigram overlap (Jaccard) with the registry name
+MIN_TRIGRAM_SIMILARITY = 0.6
+
+def ascii_name(name):
+    """normalize_name with accents folded, punctuation dropped ('Ma'ula' -> 'maula')"""
+    folded = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    return normalize_name(''.join(ch if ch.isalnum() or ch.isspace() else ' ' if ch in '-.' else '' for ch in folded))
+
+def trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def split_given_names(name):
+    """
+    ('initials', 'surname', given names) for a registry name. Cricsheet writes given
+    names as upper-case initials ('SS Iyer' -> ('ss', 'iyer', [])); spelled-out given
+    names are reduced to their first letters and also returned ('Naseem Shah' ->
+    ('n', 'shah', ['naseem'])). Lower-case particles ('SP de Alwis') are skipped.
+    """
+    tokens = str(name).split()
+    if len(tokens) < 2:
+        return '', ascii_name(name), []
+    given = [token for token in tokens[:-1] if not token[0].islower()]
+    if not given:
+        return '', ascii_name(tokens[-1]), []
+    if len(given) == 1 and given[0].isupper() and len(given[0]) <= 4:
+        return given[0].lower(), ascii_name(tokens[-1]), []
+    return ''.join(token[0].lower() for token in given), ascii_name(tokens[-1]), [ascii_name(token) for token in given]
+
+def given_names_agree(registry_name, query_name):
+    """Spelled-out given names agree if one abbreviates the other or they share 4+ leading letters"""
+    shorter, longer = sorted((registry_name, query_name), key=len)
+    return longer.startswith(shorter) or shorter[:4] == longer[:4] and len(shorter) >= 4
+
+class PlayerResolver:
+    """
+    Resolves names as Cricbuzz spells them ('Shreyas Iyer', 'Stoinis') to the
+    Cricsheet-style names the player_data tables use ('SS Iyer', 'MP Stoinis'),
+    anchored on the metadata.csv registry.
+
+    Steps, first hit wins: exact registry name; same surname with compatible
+    initials / given names; a lone surname only if exactly one registry player (or
+    one on the given team) has it; trigram similarity. When several players fit,
+    the team hint has to single one out, otherwise the name resolves to None instead
+    of guessing ('Rohit Sharma' fits both 'RG Sharma' and 'R Sharma'). Hints are
+    national teams as in the registry; anything else (a franchise) is ignored.
+    Resolutions are memoized and persisted to disk, keyed on the registry's size and mtime.
+    """
+
+    def __init__(self, metadata, cache_path=None, registry_signature=None):
+        self.cache_path = cache_path
+        self.registry_signature = registry_signature
+        self.cache = {}
+        self.dirty = False
+
+        metadata = metadata.dropna(subset=['name']).drop_duplicates('name')
+        self.names = metadata['name'].tolist()
+        self.teams = [normalize_name(team) for team in metadata.get('team', pd.Series([''] * len(metadata))).fillna('')]
+        self.known_teams = set(self.teams) - {''}
+
+        self.exact = {}
+        self.by_surname = {}
+        self.given = []
+        self.trigram_index = {}
+        self.trigram_sets = []
+        for row, name in enumerate(self.names):
+            folded = ascii_name(name)
+            self.exact.setdefault(folded, row)
+            initials, surname, given_names = split_given_names(name)
+            self.given.append((initials, given_names))
+            self.by_surname.setdefault(surname, []).append(row)
+
+            grams = trigrams(folded)
+            self.trigram_sets.append(grams)
+            for gram in grams:
+                self.trigram_index.setdefault(gram, []).append(row)
+
+    @classmethod
+    def load(cls, metadata_path=METADATA_PATH, cache_path=CACHE_PATH):
+        """Resolver over metadata.csv, with the on-disk cache if it was built from the same registry"""
+        metadata = pd.read_csv(metadata_path, usecols=lambda column: column in ('name', 'team'))
+        stat = os.stat(metadata_path)
+        resolver = cls(metadata, cache_path, [stat.st_size, int(stat.st_mtime)])
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('version') == CACHE_VERSION and cached.get('registry') == resolver.registry_signature:
+                    resolver.cache = cached.get('names', {})
+            except (OSError, ValueError):
+                pass
+        return resolver
+
+    def save(self):
+        """Write new resolutions back to the disk cache"""
+        if not self.cache_path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'registry': self.registry_signature, 'names': self.cache}, f)
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+    def resolve(self, name, team=None):
+        """Registry name for a player name, or None if it can't be resolved unambiguously"""
+        team = normalize_name(team) if team else ''
+        if team not in self.known_teams:
+            team = ''
+        key = f"{ascii_name(name)}|{team}"
+        if key in self.cache:
+            return self.cache[key]
+
+        row = self._resolve(ascii_name(name), team)
+        resolved = self.names[row] if row is not None else None
+        self.cache[key] = resolved
+        self.dirty = True
+        return resolved
+
+    def resolve_player(self, player, team=None):
+        """Resolve a Cricbuzz player dict, trying fullName before the (often shortened) name"""
+        for name in (player.get('fullName'), player.get('name')):
+            if name:
+                resolved = self.resolve(name, team)
+                if resolved is not None:
+                    return resolved
+        return None
+
+    def _pick(self, rows, team):
+        """The one row left after applying the team hint, or None if the rows stay ambiguous"""
+        if team:
+            on_team = [row for row in rows if self.teams[row] == team]
+            if on_team:
+                rows = on_team
+        return rows[0] if len(rows) == 1 else None
+
+    def _resolve(self, query, team):
+        if not query:
+            return None
+
+        # 1. Exact registry name
+        if query in self.exact:
+            return self.exact[query]
+
+        tokens = query.split()
+        surname_rows = self.by_surname.get(tokens[-1], [])
+
+        # 2. Lone surname ('Stoinis'): only if it identifies one player
+        if len(tokens) == 1:
+            return self._pick(surname_rows, team)
+
+        # 3. Same surname with compatible given names / initials ('Shreyas Iyer' -> 'SS Iyer').
+        # Cricsheet initials sometimes lead with names the player doesn't go by
+        # ('Dushmantha Chameera' -> 'PVD Chameera'), so a later initial counts too, ranked lower
+        first_initial = tokens[0][0]
+        compatible = {}
+        for row in surname_rows:
+            initials, given_names = self.given[row]
+            if given_names:
+                # A spelled-out registry given name has to agree ('Josh Inglis' is not 'Jack Inglis')
+                if given_names_agree(given_names[0], tokens[0]):
+                    compatible[row] = 2
+            elif initials.startswith(first_initial):
+                compatible[row] = 2
+            elif first_initial in initials:
+                compatible[row] = 1
+        if compatible:
+            strongest = max(compatible.values())
+            return self._pick([row for row, strength in compatible.items() if strength == strongest], team)
+
+        # 4. Fuzzy: trigram overlap with any registry name
+        query_grams = trigrams(query)
+        overlaps = {}
+        for gram in query_grams:
+            for row in self.trigram_index.get(gram, ()):
+                overlaps[row] = overlaps.get(row, 0) + 1
+
+        candidates = {}
+        for row, shared in overlaps.items():
+            similarity = shared / (len(query_grams) + len(self.trigram_sets[row]) - shared)
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                candidates[row] = round(similarity, 6)
+        if team and any(self.teams[row] == team for row in candidates):
+            candidates = {row: similarity for row, similarity in candidates.items() if self.teams[row] == team}
+        if not candidates:
+            return None
+        # Spelling is the only signal here, so the closest name wins, but only if it is alone
+        best = max(candidates.values())
+        return self._pick([row for row, similarity in candidates.items() if similarity == best], team)
+
+if __name__ == "__main__":
+    import sys
+    resolver = PlayerResolver.load()
+    for name in sys.argv[1:]:
+        print(f"{name} -> {resolver.resolve(name)}")
+    resolver.save()
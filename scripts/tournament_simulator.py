@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.abspath(os.path.join(script_dir, '..', 'public'))
+
+PREDICTIONS_PATH = os.path.join(PUBLIC_DIR, 'model', 'predictions.json')
+MATCHES_PATH = os.path.join(PUBLIC_DIR, 'matches.json')
+OUTPUT_PATH = os.path.join(PUBLIC_DIR, 'model', 'tournament_odds.json')
+
+DEFAULT_SIMULATIONS = 100000
+DEFAULT_CHUNK_SIZE = 25000
+DEFAULT_SEED = 42
+
+# Points-table rules used for any tournament without an entry in the rules file.
+# playoffs: 'ipl' (qualifier 1, eliminator, qualifier 2, final), 'knockout'
+# (seeded bracket, 1 v n, 2 v n-1, ...) or 'none' (table topper wins the title)
+DEFAULT_RULES = {
+    'points_for_win': 2,
+    'qualifiers': 4,
+    'playoffs': 'knockout',
+    'standings': {}
+}
+
+# Win probabilities are clipped before fitting team ratings so a 100% prediction stays finite
+PROBABILITY_CLIP = 0.01
+
+def load_predictions(predictions_path=PREDICTIONS_PATH):
+    """Prediction records from final_model (predictions.json, or predictions.ndjson)"""
+    with open(predictions_path, 'r', encoding='utf-8') as f:
+        if predictions_path.endswith('.ndjson'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+def load_fixture_tournaments(matches_path=MATCHES_PATH):
+    """
+    match_id -> tournament name from matches.json, falling back to the fixture's series
+    name. Fixtures with neither are left out rather than pooled into one table.
+    """
+    if not os.path.exists(matches_path):
+        return {}
+    with open(matches_path, 'r', encoding='utf-8') as f:
+        matches = json.load(f)
+
+    tournaments = {}
+    for match in matches:
+        match_info = match['details']['matchInfo']
+        tournament = match.get('tournament') or (match_info.get('series') or {}).get('name')
+        if tournament:
+            tournaments[match_info['matchId']] = tournament
+    return tournaments
+
+def group_fixtures(predictions, fixture_tournaments):
+    """
+    Group prediction records into tournaments as lists of (team1, team2, team1 win probability).
+    Predictions whose fixture has no known tournament are skipped.
+    """
+    tournaments = {}
+    skipped = 0
+    for prediction in predictions:
+        tournament = fixture_tournaments.get(prediction.get('match_id'))
+        if tournament is None:
+            skipped += 1
+            continue
+        team1 = prediction['teams']['team1']
+        team2 = prediction['teams']['team2']
+        probability = prediction['probabilities'].get(team1, 50) / 100
+        tournaments.setdefault(tournament, []).append((team1, team2, probability))
+    if skipped:
+        print(f"Skipped {skipped} predictions with no known tournament")
+    return tournaments
+
+def fit_team_ratings(team1_idx, team2_idx, probabilities, team_count):
+    """
+    Rate teams so that sigmoid(rating[team1] - rating[team2]) reproduces each fixture's
+    win probability as closely as possible (least squares on the log-odds).
+    Used to price playoff matches between teams the fixture list never pairs up.
+    """
+    clipped = np.clip(probabilities, PROBABILITY_CLIP, 1 - PROBABILITY_CLIP)
+    log_odds = np.log(clipped / (1 - clipped))
+
+    design = np.zeros((len(log_odds) + 1, team_count))
+    design[np.arange(len(log_odds)), team1_idx] = 1
+    design[np.arange(len(log_odds)), team2_idx] = -1
+    # Ratings are only defined up to a constant; pin their mean to zero
+    design[-1, :] = 1
+    targets = np.append(log_odds, 0)
+
+    ratings = np.linalg.lstsq(design, targets, rcond=None)[0]
+    return 1 / (1 + np.exp(-(ratings[:, None] - ratings[None, :])))
+
+def play(rng, head_to_head, team_a, team_b):
+    """Vectorized knockout match: winners and losers for arrays of pairings"""
+    team_a_wins = rng.random(len(team_a)) < head_to_head[team_a, team_b]
+    return np.where(team_a_wins, team_a, team_b), np.where(team_a_wins, team_b, team_a)
+
+def simulate_playoffs(rng, head_to_head, seeds, playoffs):
+    """
+    Play the playoffs for a chunk of simulations.
+    seeds holds the qualifiers in table order, one row per simulation.
+    Returns (finalists, champions) as team index arrays.
+    """
+    if playoffs == 'none' or seeds.shape[1] == 1:
+        return seeds[:, :2], seeds[:, 0]
+
+    if playoffs == 'ipl':
+        if seeds.shape[1] != 4:
+            raise ValueError("IPL playoffs need exactly 4 qualifiers")
+        qualifier1_winner, qualifier1_loser = play(rng, head_to_head, seeds[:, 0], seeds[:, 1])
+        eliminator_winner, _ = play(rng, head_to_head, seeds[:, 2], seeds[:, 3])
+        qualifier2_winner, _ = play(rng, head_to_head, qualifier1_loser, eliminator_winner)
+        finalists = np.column_stack([qualifier1_winner, qualifier2_winner])
+    elif playoffs == 'knockout':
+        qualifier_count = seeds.shape[1]
+        if qualifier_count & (qualifier_count - 1):
+            raise ValueError("Knockout playoffs need a power-of-two number of qualifiers")
+        # Seeded bracket: 1 v n, 2 v n-1, ... with winners re-paired the same way each round
+        bracket = seeds
+        while bracket.shape[1] > 2:
+            half = bracket.shape[1] // 2
+            winners, _ = play(rng, head_to_head, bracket[:, :half].ravel(), bracket[:, :half - 1:-1].ravel())
+            bracket = winners.reshape(-1, half)
+        finalists = bracket
+    else:
+        raise ValueError(f"Unknown playoff format: {playoffs}")
+
+    champions, _ = play(rng, head_to_head, finalists[:, 0], finalists[:, 1])
+    return finalists, champions
+
+def playoff_format(rules, team_count):
+    """
+    (qualifiers, playoffs) the rules allow with team_count teams. IPL playoffs need
+    exactly 4 qualifiers and otherwise fall back to a knockout; a knockout is cut to
+    the largest power of two that fits; with fewer than two qualifiers the table topper wins.
+    """
+    qualifiers = min(rules['qualifiers'], team_count)
+    playoffs = rules['playoffs']
+
+    if playoffs == 'ipl' and qualifiers != 4:
+        playoffs = 'knockout'
+    if playoffs == 'knockout':
+        qualifiers = 1 << (qualifiers.bit_length() - 1) if qualifiers > 0 else 0
+    if qualifiers < 2:
+        qualifiers, playoffs = 1, 'none'
+    return qualifiers, playoffs
+
+def simulate_tournament(fixtures, rules=None, simulations=DEFAULT_SIMULATIONS,
+                        seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Monte Carlo simulation of a points-table tournament followed by playoffs.
+
+    fixtures is a list of (team1, team2, team1 win probability). Simulations run in
+    chunks of chunk_size, each fully vectorized, so memory stays bounded however many
+    are requested. Results are reproducible for a given seed and chunk size.
+    Ties on points are broken at random (net run rate isn't modelled).
+    """
+    rules = {**DEFAULT_RULES, **(rules or {})}
+    standings = rules['standings']
+
+    teams = sorted({team for team1, team2, _ in fixtures for team in (team1, team2)} | set(standings))
+    team_index = {team: i for i, team in enumerate(teams)}
+    team_count = len(teams)
+    qualifiers, playoffs = playoff_format(rules, team_count)
+    if (qualifiers, playoffs) != (min(rules['qualifiers'], team_count), rules['playoffs']):
+        print(f"{rules['qualifiers']} qualifiers of {team_count} teams: playing '{playoffs}' playoffs with {qualifiers} qualifiers")
+
+    team1_idx = np.array([team_index[team1] for team1, _, _ in fixtures], dtype=np.int64)
+    team2_idx = np.array([team_index[team2] for _, team2, _ in fixtures], dtype=np.int64)
+    probabilities = np.array([probability for _, _, probability in fixtures], dtype=np.float64)
+
+    # Points table as a matrix product: every fixture is worth points_for_win to team2,
+    # moved over to team1 when team1 wins
+    points_for_win = rules['points_for_win']
+    swing = np.zeros((len(fixtures), team_count))
+    swing[np.arange(len(fixtures)), team1_idx] += points_for_win
+    swing[np.arange(len(fixtures)), team2_idx] -= points_for_win
+    base_points = np.bincount(team2_idx, minlength=team_count) * points_for_win
+    base_points = base_points + np.array([standings.get(team, 0) for team in teams], dtype=np.float64)
+
+    head_to_head = fit_team_ratings(team1_idx, team2_idx, probabilities, team_count)
+
+    rng = np.random.default_rng(seed)
+    total_points = np.zeros(team_count)
+    total_position = np.zeros(team_count)
+    qualified = np.zeros(team_count, dtype=np.int64)
+    reached_final = np.zeros(team_count, dtype=np.int64)
+    titles = np.zeros(team_count, dtype=np.int64)
+
+    for start in range(0, simulations, chunk_size):
+        size = min(chunk_size, simulations - start)
+
+        team1_wins = rng.random((size, len(fixtures))) < probabilities
+        points = base_points + team1_wins @ swing
+
+        # Random tie-break below the smallest points step, so it only reorders teams level on points
+        order = np.argsort(-(points + rng.random((size, team_count)) * 0.5), axis=1)
+        positions = np.empty_like(order)
+        np.put_along_axis(positions, order, np.arange(team_count), axis=1)
+
+        finalists, champions = simulate_playoffs(rng, head_to_head, order[:, :qualifiers], playoffs)
+
+        total_points += points.sum(axis=0)
+        total_position += positions.sum(axis=0)
+        qualified += np.bincount(order[:, :qualifiers].ravel(), minlength=team_count)
+        reached_final += np.bincount(finalists.ravel(), minlength=team_count)
+        titles += np.bincount(champions, minlength=team_count)
+
+    odds = {}
+    for i, team in enumerate(teams):
+        odds[team] = {
+            'qualify': round(qualified[i] / simulations * 100, 2),
+            'final': round(reached_final[i] / simulations * 100, 2),
+            'title': round(titles[i] / simulations * 100, 2),
+            'expected_points': round(total_points[i] / simulations, 2),
+            'average_position': round(total_position[i] / simulations + 1, 2)
+        }
+
+    # Most likely champions first
+    return dict(sorted(odds.items(), key=lambda item: -item[1]['title']))
+
+def load_rules(rules_path):
+    """Per-tournament rules from a JSON file: {tournament name: {points_for_win, qualifiers, playoffs, standings}}"""
+    if not rules_path:
+        return {}
+    with open(rules_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main(predictions_path=PREDICTIONS_PATH, rules_path=None, output_path=OUTPUT_PATH,
+         simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE):
+    predictions = load_predictions(predictions_path)
+    tournaments = group_fixtures(predictions, load_fixture_tournaments())
+    tournament_rules = load_rules(rules_path)
+
+    results = {}
+    for tournament, fixtures in tournaments.items():
+        start = time.perf_counter()
+        try:
+            odds = simulate_tournament(fixtures, tournament_rules.get(tournament), simulations, seed, chunk_size)
+        except Exception as e:
+            # One misconfigured tournament shouldn't cost every other tournament its odds
+            print(f"Error simulating {tournament}: {e}")
+            continue
+        print(f"Simulated {tournament} ({len(fixtures)} fixtures) {simulations} times in {time.perf_counter() - start:.2f}s")
+
+        results[tournament] = {
+            'fixtures': len(fixtures),
+            'odds': odds
+        }
+
+    output = {
+        'simulations': simulations,
+        'seed': seed,
+        'tournaments': results
+    }
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"Saved tournament odds to {output_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo tournament odds from the match predictions")
+    parser.add_argument("--predictions", default=PREDICTIONS_PATH,
+                        help="predictions.json (or .ndjson) written by final_model.py")
+    parser.add_argument("--rules", default=None,
+                        help="JSON file of per-tournament rules (points_for_win, qualifiers, playoffs, standings)")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Where to write the odds")
+    parser.add_argument("--simulations", type=int, default=DEFAULT_SIMULATIONS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Simulations per vectorized batch (bounds memory)")
+    args = parser.parse_args()
+
+    main(args.predictions, args.rules, args.output, args.simulations, args.seed, args.chunk_size)
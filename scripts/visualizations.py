@@ -1,10 +1,117 @@
 # visualizations.py
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Charts are only ever written to files, so render with the non-interactive backend
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 import seaborn as sns
-from sklearn.inspection import permutation_importance
-import os
+
+RENDER_DPI = 300
+
+# Chart file -> hash of the data it was drawn from, so unchanged charts are skipped
+RENDER_CACHE_FILE = 'render_cache.json'
+# Bump when a chart's drawing code changes so cached charts are redrawn
+RENDER_VERSION = 2
+
+# Output modes: 'png' renders the charts, 'json' writes only the data behind them
+# (charts.json) for the frontend to draw, 'both' does both
+CHART_OUTPUTS = ('png', 'json', 'both')
+CHART_DATA_FILE = 'charts.json'
+
+# Optional small previews written next to each PNG as <chart>_thumb.<ext>
+THUMBNAIL_DPI = 40
+
+def thumbnail_format():
+    """WebP when Pillow was built with it, PNG otherwise"""
+    try:
+        from PIL import features
+        return 'webp' if features.check('webp') else 'png'
+    except ImportError:
+        return 'png'
+
+def save_figure(fig, save_path, dpi=RENDER_DPI, label='Plot'):
+    """Save a figure and release it (pyplot keeps every open figure alive otherwise)"""
+    fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"{label} saved to {save_path}")
+
+def feature_importance_data(model, feature_names, top_n=15):
+    """
+    Top feature importances of a fitted pipeline as {'features': [...], 'importances': [...]},
+    from the classifier's feature_importances_ or, failing that, the permutation
+    importances train_model attaches. None if the model has neither.
+    """
+    if hasattr(model['classifier'], 'feature_importances_'):
+        importances = model['classifier'].feature_importances_
+    elif getattr(model, 'permutation_importances_', None) is not None:
+        # Measured on the raw input columns, so they line up with feature_names
+        importances = model.permutation_importances_
+    else:
+        print("Model has neither feature_importances_ nor permutation importances")
+        return None
+    
+    # Handle case where feature_names and importances have different lengths
+    if len(feature_names) != len(importances):
+        print(f"Warning: Feature names length ({len(feature_names)}) doesn't match importances length ({len(importances)})")
+        
+        # Try to extract feature names from the pipeline if possible
+        if hasattr(model, 'get_feature_names_out'):
+            try:
+                # For newer scikit-learn versions
+                feature_names = model.get_feature_names_out()
+            except:
+                try:
+                    # For older scikit-learn versions or custom pipelines
+                    feature_names = model.named_steps['preprocessor'].get_feature_names_out()
+                except:
+                    print("Could not extract feature names from pipeline, using generic names")
+                    # Create generic feature names based on importances length
+                    feature_names = [f'Feature_{i}' for i in range(len(importances))]
+        else:
+            # If we still have a mismatch, truncate or pad the feature_names list
+            if len(feature_names) > len(importances):
+                print("Truncating feature names to match importances length")
+                feature_names = feature_names[:len(importances)]
+            else:
+                print("Padding feature names with generic names")
+                additional_names = [f'Feature_{i+len(feature_names)}' for i in range(len(importances) - len(feature_names))]
+                feature_names = list(feature_names) + additional_names
+    
+    importance_df = pd.DataFrame({
+        'Feature': [str(name) for name in feature_names],
+        'Importance': importances
+    }).sort_values(by='Importance', ascending=False).head(top_n)
+    
+    return {
+        'features': importance_df['Feature'].tolist(),
+        'importances': importance_df['Importance'].astype(float).round(6).tolist()
+    }
+
+def draw_feature_importance(data, save_path=None, dpi=RENDER_DPI):
+    """Horizontal bar chart of feature_importance_data output"""
+    importance_df = pd.DataFrame({'Feature': data['features'], 'Importance': data['importances']})
+    
+    fig, ax = plt.subplots(figsize=(12, 8))
+    sns.barplot(x='Importance', y='Feature', data=importance_df, palette='viridis', ax=ax)
+    
+    # Add value labels
+    for i, v in enumerate(importance_df['Importance']):
+        ax.text(v + 0.005, i, f'{v:.3f}', va='center')
+    
+    ax.set_title('Top Feature Importance in Cricket Match Prediction', fontsize=16)
+    ax.set_xlabel('Relative Importance', fontsize=12)
+    ax.set_ylabel('Feature', fontsize=12)
+    fig.tight_layout()
+    
+    if save_path:
+        save_figure(fig, save_path, dpi, 'Feature importance plot')
+    return fig
 
 def plot_feature_importance(model, feature_names, top_n=15, save_path=None):
     """
@@ -26,87 +133,12 @@ def plot_feature_importance(model, feature_names, top_n=15, save_path=None):
     matplotlib.figure.Figure
         The feature importance plot
     """
-    plt.figure(figsize=(12, 8))
-    
-    # Extract feature importances from the model
-    if hasattr(model['classifier'], 'feature_importances_'):
-        importances = model['classifier'].feature_importances_
-        
-        # Handle case where feature_names and importances have different lengths
-        if len(feature_names) != len(importances):
-            print(f"Warning: Feature names length ({len(feature_names)}) doesn't match importances length ({len(importances)})")
-            
-            # Try to extract feature names from the pipeline if possible
-            if hasattr(model, 'get_feature_names_out'):
-                try:
-                    # For newer scikit-learn versions
-                    feature_names = model.get_feature_names_out()
-                except:
-                    try:
-                        # For older scikit-learn versions or custom pipelines
-                        feature_names = model.named_steps['preprocessor'].get_feature_names_out()
-                    except:
-                        print("Could not extract feature names from pipeline, using generic names")
-                        # Create generic feature names based on importances length
-                        feature_names = [f'Feature_{i}' for i in range(len(importances))]
-            else:
-                # If we still have a mismatch, truncate or pad the feature_names list
-                if len(feature_names) > len(importances):
-                    print("Truncating feature names to match importances length")
-                    feature_names = feature_names[:len(importances)]
-                else:
-                    print("Padding feature names with generic names")
-                    additional_names = [f'Feature_{i+len(feature_names)}' for i in range(len(importances) - len(feature_names))]
-                    feature_names = feature_names + additional_names
-        
-        # Create DataFrame for plotting
-        importance_df = pd.DataFrame({
-            'Feature': feature_names,
-            'Importance': importances
-        }).sort_values(by='Importance', ascending=False).head(top_n)
-        
-        # Plot horizontal bar chart
-        ax = sns.barplot(x='Importance', y='Feature', data=importance_df, palette='viridis')
-        
-        # Add value labels
-        for i, v in enumerate(importance_df['Importance']):
-            ax.text(v + 0.005, i, f'{v:.3f}', va='center')
-        
-        plt.title('Top Feature Importance in Cricket Match Prediction', fontsize=16)
-        plt.xlabel('Relative Importance', fontsize=12)
-        plt.ylabel('Feature', fontsize=12)
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Feature importance plot saved to {save_path}")
-            
-        return plt.gcf()
-    else:
-        print("Model doesn't have feature_importances_ attribute")
-        return None
+    data = feature_importance_data(model, feature_names, top_n)
+    return draw_feature_importance(data, save_path) if data else None
 
 
-def plot_win_predictions(test_data, min_threshold=0.6, save_path=None):
-    """
-    Visualize win predictions for upcoming matches.
-    
-    Parameters:
-    -----------
-    test_data : pandas.DataFrame
-        DataFrame containing match predictions
-    min_threshold : float, default=0.6
-        Minimum probability threshold to consider a prediction certain
-    save_path : str, optional
-        Path to save the figure
-    
-    Returns:
-    --------
-    matplotlib.figure.Figure
-        The win predictions plot
-    """
-    plt.figure(figsize=(12, 8))
-    
+def win_predictions_data(test_data, min_threshold=0.6):
+    """Both teams' win probabilities for every fixture, or None if predictions are missing"""
     # Check if test_data has the required columns
     required_columns = ['team_1', 'team_2', 'venue', 'team_1_win_probability', 'team_2_win_probability']
     missing_columns = [col for col in required_columns if col not in test_data.columns]
@@ -115,41 +147,37 @@ def plot_win_predictions(test_data, min_threshold=0.6, save_path=None):
         print(f"Warning: Test data is missing required columns: {missing_columns}")
         return None
     
-    # Create a DataFrame with both teams and their probabilities
-    plot_data = []
-    
-    for _, match in test_data.iterrows():
-        team1 = match['team_1']
-        team2 = match['team_2']
-        
-        # Check if probability columns exist, otherwise calculate them
-        if 'team_1_win_probability' in match:
-            team1_prob = match['team_1_win_probability']
-            team2_prob = match['team_2_win_probability']
-        else:
-            print("Warning: Probability columns not found, setting to default 0.5")
-            team1_prob = 0.5
-            team2_prob = 0.5
-        
-        # Create venue label, handling potential missing venue data
-        venue = match.get('venue', 'Unknown Venue')
-        
-        match_label = f"{team1} vs {team2}\n({venue})"
-        
-        plot_data.append({
-            'Match': match_label,
-            'Team': team1,
-            'Win Probability': team1_prob,
-            'Predicted Winner': team1_prob > team2_prob
-        })
-        
-        plot_data.append({
-            'Match': match_label,
-            'Team': team2,
-            'Win Probability': team2_prob,
-            'Predicted Winner': team2_prob > team1_prob
+    fixtures = []
+    for team1, team2, venue, team1_prob, team2_prob in zip(
+            test_data['team_1'], test_data['team_2'], test_data['venue'].astype(object).fillna('Unknown Venue'),
+            test_data['team_1_win_probability'], test_data['team_2_win_probability']):
+        fixtures.append({
+            'team1': team1,
+            'team2': team2,
+            'venue': venue,
+            'team1_probability': round(float(team1_prob), 4),
+            'team2_probability': round(float(team2_prob), 4)
         })
     
+    return {'min_threshold': min_threshold, 'fixtures': fixtures}
+
+def draw_win_predictions(data, save_path=None, dpi=RENDER_DPI):
+    """Grouped bar chart of win_predictions_data output"""
+    min_threshold = data['min_threshold']
+    
+    # One row per team, labelled with its fixture
+    plot_data = []
+    for fixture in data['fixtures']:
+        match_label = f"{fixture['team1']} vs {fixture['team2']}\n({fixture['venue']})"
+        for team, probability, opponent_probability in (
+                (fixture['team1'], fixture['team1_probability'], fixture['team2_probability']),
+                (fixture['team2'], fixture['team2_probability'], fixture['team1_probability'])):
+            plot_data.append({
+                'Match': match_label,
+                'Team': team,
+                'Win Probability': probability,
+                'Predicted Winner': probability > opponent_probability
+            })
     plot_df = pd.DataFrame(plot_data)
     
     # Sort by match to ensure teams from the same match are adjacent
@@ -158,22 +186,25 @@ def plot_win_predictions(test_data, min_threshold=0.6, save_path=None):
     # Create a custom palette based on whether team is predicted winner
     colors = ['#2ecc71' if winner else '#3498db' for winner in plot_df['Predicted Winner']]
     
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
     # Plot horizontal bar chart
-    ax = sns.barplot(
+    sns.barplot(
         x='Win Probability', 
         y='Match', 
         hue='Team',
         data=plot_df,
         palette=colors,
-        dodge=True
+        dodge=True,
+        ax=ax
     )
     
     # Add confidence threshold line
-    plt.axvline(x=min_threshold, color='red', linestyle='--', alpha=0.7, 
-                label=f'Confidence Threshold ({min_threshold})')
+    ax.axvline(x=min_threshold, color='red', linestyle='--', alpha=0.7, 
+               label=f'Confidence Threshold ({min_threshold})')
     
     # Add value labels to the bars
-    for i, bar in enumerate(ax.patches):
+    for bar in ax.patches:
         width = bar.get_width()
         ax.text(
             width + 0.01,
@@ -183,38 +214,127 @@ def plot_win_predictions(test_data, min_threshold=0.6, save_path=None):
             va='center'
         )
     
-    plt.title('Win Probability Predictions for Upcoming Matches', fontsize=16)
-    plt.xlabel('Win Probability', fontsize=12)
-    plt.ylabel('Match', fontsize=12)
-    plt.xlim(0, 1.1)
-    plt.legend(title='Team', loc='upper right')
-    plt.grid(axis='x', linestyle='--', alpha=0.7)
-    plt.tight_layout()
+    ax.set_title('Win Probability Predictions for Upcoming Matches', fontsize=16)
+    ax.set_xlabel('Win Probability', fontsize=12)
+    ax.set_ylabel('Match', fontsize=12)
+    ax.set_xlim(0, 1.1)
+    ax.legend(title='Team', loc='upper right')
+    ax.grid(axis='x', linestyle='--', alpha=0.7)
+    fig.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Win predictions plot saved to {save_path}")
-        
-    return plt.gcf()
-
+        save_figure(fig, save_path, dpi, 'Win predictions plot')
+    return fig
 
-def plot_team_performance_comparison(train_data, test_data, save_path=None):
+def plot_win_predictions(test_data, min_threshold=0.6, save_path=None):
     """
-    Compare team performance metrics between teams in upcoming matches.
+    Visualize win predictions for upcoming matches.
     
     Parameters:
     -----------
-    train_data : pandas.DataFrame
-        DataFrame containing training data with team performance metrics
     test_data : pandas.DataFrame
-        DataFrame containing test data with upcoming matches
+        DataFrame containing match predictions
+    min_threshold : float, default=0.6
+        Minimum probability threshold to consider a prediction certain
     save_path : str, optional
         Path to save the figure
     
     Returns:
     --------
     matplotlib.figure.Figure
-        The team performance comparison plot
+        The win predictions plot
+    """
+    data = win_predictions_data(test_data, min_threshold)
+    return draw_win_predictions(data, save_path) if data else None
+
+
+# Radar chart metrics and their axis labels
+TEAM_METRICS = [
+    'batting_average_odi',
+    'batting_strike_rate_odi',
+    'bowling_average_odi',
+    'bowling_strike_rate_odi',
+    'economy_odi',
+    'win_percentage'
+]
+TEAM_METRIC_LABELS = [
+    'Batting Avg', 
+    'Batting SR', 
+    'Bowling Avg', 
+    'Bowling SR', 
+    'Economy', 
+    'Win %'
+]
+
+# Bowling stats are better when lower, so they're inverted on the radar
+INVERTED_METRICS = ('bowling', 'economy')
+
+def metric_columns(columns, side):
+    """(column, metric) pairs for the team-side columns (e.g. 'avg_economy_odi_team_1') holding each metric"""
+    return [(col, metric) for col in columns if f'_team_{side}' in col
+            for metric in TEAM_METRICS[:-1] if metric in col]
+
+def melt_team_metrics(df, side):
+    """Long (team, metric, value) rows for one team side of a fixtures frame"""
+    pairs = metric_columns(df.columns, side)
+    if not pairs:
+        return pd.DataFrame(columns=['team', 'metric', 'value', 'order'])
+    column_metric = pd.DataFrame(pairs, columns=['column', 'metric'])
+    
+    long = df[[f'team_{side}'] + list(column_metric['column'].unique())].melt(
+        id_vars=f'team_{side}', var_name='column', value_name='value')
+    long = long.rename(columns={f'team_{side}': 'team'}).merge(column_metric, on='column')
+    # Keep the source column's position so the first matching column can win
+    long['order'] = long['column'].map({col: i for i, col in enumerate(df.columns)})
+    return long[['team', 'metric', 'value', 'order']]
+
+def team_metric_table(train_data, test_data):
+    """
+    Tidy (team, metric, value) table for every team in test_data.
+    
+    Stat metrics average every non-null training value in the team's own side
+    columns, falling back to the team's first value in the fixture columns and then
+    to 0. win_percentage comes from training results (50 for teams with none).
+    Metrics with no column in either frame are left out.
+    """
+    teams = pd.unique(pd.concat([test_data['team_1'], test_data['team_2']]))
+    
+    # Check which metrics are available in the data
+    columns = list(train_data.columns) + list(test_data.columns)
+    available_metrics = [metric for metric in TEAM_METRICS[:-1] if any(metric in col for col in columns)]
+    
+    # Training averages: one melt of both team sides, one groupby
+    train_long = pd.concat([melt_team_metrics(train_data, 1), melt_team_metrics(train_data, 2)])
+    train_values = train_long.dropna(subset=['value']).groupby(['team', 'metric'])['value'].mean()
+    
+    # Fixture values for teams without training data: first matching column, first row
+    test_long = pd.concat([melt_team_metrics(test_data, 1), melt_team_metrics(test_data, 2)])
+    test_values = (test_long.sort_values('order', kind='stable')
+                   .drop_duplicates(['team', 'metric'])
+                   .set_index(['team', 'metric'])['value'])
+    
+    grid = pd.MultiIndex.from_product([teams, available_metrics], names=['team', 'metric'])
+    values = train_values.reindex(grid)
+    values = values.fillna(test_values.reindex(grid)).fillna(0) if len(grid) else values
+    
+    # Calculate win percentage
+    # (team columns may be categoricals with different categories, so compare as objects)
+    team_1, team_2, winner = (train_data[col].astype(object) for col in ('team_1', 'team_2', 'winner'))
+    appearances = pd.concat([team_1, team_2]).value_counts()
+    wins = winner[(winner == team_1) | (winner == team_2)].value_counts()
+    win_percentage = (wins.reindex(teams, fill_value=0) / appearances.reindex(teams) * 100).fillna(50)
+    
+    table = pd.concat([
+        values.reset_index(name='value'),
+        pd.DataFrame({'team': teams, 'metric': 'win_percentage', 'value': win_percentage.to_numpy()})
+    ], ignore_index=True)
+    table['value'] = table['value'].astype(float)
+    return table
+
+def team_comparison_data(train_data, test_data):
+    """
+    Radar chart data for every fixture: the available metrics, and each team's
+    values scaled to 0-1 against the pair (bowling stats inverted, lower is better)
     """
     # Check if test_data and train_data have required columns
     if 'team_1' not in test_data.columns or 'team_2' not in test_data.columns:
@@ -225,222 +345,220 @@ def plot_team_performance_comparison(train_data, test_data, save_path=None):
         print("Warning: Training data is missing required columns")
         return None
     
-    plt.figure(figsize=(15, 10))
-    
-    # Extract unique teams from test data
-    teams = set()
-    for _, match in test_data.iterrows():
-        teams.add(match['team_1'])
-        teams.add(match['team_2'])
-    
-    teams = list(teams)
-    
-    # Define key performance metrics to compare
-    metrics = [
-        'batting_average_odi',
-        'batting_strike_rate_odi',
-        'bowling_average_odi',
-        'bowling_strike_rate_odi',
-        'economy_odi',
-        'win_percentage'
-    ]
-    
-    # Check which metrics are available in the data
-    available_metrics = [metric for metric in metrics[:-1] if 
-                        any(metric in col for col in train_data.columns) or 
-                        any(metric in col for col in test_data.columns)]
-    available_metrics.append('win_percentage')  # Always calculate win percentage
-    
-    if not available_metrics:
-        print("Warning: No matching metrics found in the data")
+    if test_data.empty:
+        print("Warning: Empty test data, cannot create team performance comparison")
         return None
     
-    # Extract metrics for each team
-    team_metrics = {}
-    for team in teams:
-        team_metrics[team] = {}
-        
-        # Calculate win percentage
-        team_matches = train_data[(train_data['team_1'] == team) | (train_data['team_2'] == team)]
-        team_wins_condition1 = (train_data['team_1'] == team) & (train_data['winner'] == team)
-        team_wins_condition2 = (train_data['team_2'] == team) & (train_data['winner'] == team)
-        team_wins = len(train_data[team_wins_condition1 | team_wins_condition2])
-        
-        win_percentage = team_wins / len(team_matches) * 100 if len(team_matches) > 0 else 50
-        team_metrics[team]['win_percentage'] = win_percentage
-        
-        # Extract other metrics
-        for metric in available_metrics[:-1]:  # Exclude win_percentage as we calculated it above
-            # Look for columns matching the metric pattern for both team positions
-            cols = [col for col in train_data.columns if metric in col]
-            
-            for col in cols:
-                if '_team_1' in col:
-                    team1_data = train_data[train_data['team_1'] == team][col].dropna()
-                    if not team1_data.empty:
-                        if metric not in team_metrics[team]:
-                            team_metrics[team][metric] = []
-                        team_metrics[team][metric].extend(team1_data.tolist())
-                
-                if '_team_2' in col:
-                    team2_data = train_data[train_data['team_2'] == team][col].dropna()
-                    if not team2_data.empty:
-                        if metric not in team_metrics[team]:
-                            team_metrics[team][metric] = []
-                        team_metrics[team][metric].extend(team2_data.tolist())
-            
-            # Calculate average if we have data
-            if metric in team_metrics[team] and team_metrics[team][metric]:
-                team_metrics[team][metric] = np.mean(team_metrics[team][metric])
-            else:
-                # Use test data if available
-                test_cols = [col for col in test_data.columns if metric in col]
-                for col in test_cols:
-                    if '_team_1' in col and team in test_data['team_1'].values:
-                        test_team1_data = test_data[test_data['team_1'] == team][col]
-                        if not test_team1_data.empty:
-                            team_metrics[team][metric] = test_team1_data.iloc[0]
-                            break
-                    elif '_team_2' in col and team in test_data['team_2'].values:
-                        test_team2_data = test_data[test_data['team_2'] == team][col]
-                        if not test_team2_data.empty:
-                            team_metrics[team][metric] = test_team2_data.iloc[0]
-                            break
-                else:
-                    team_metrics[team][metric] = 0  # Default if no data available
-    
-    # Check if we have valid test data
-    if not test_data.empty:
-        # Create radar chart for each upcoming match
-        match_count = len(test_data)
-        rows = int(np.ceil(match_count / 2))
-        cols = min(2, match_count)
-        
-        fig, axes = plt.subplots(rows, cols, figsize=(15, 5 * rows), subplot_kw=dict(polar=True))
-        
-        # Handle the case of a single subplot
-        if match_count == 1:
-            axes = np.array([axes])  # Convert to array for consistent indexing
-        elif rows == 1:
-            axes = axes.reshape(1, -1)  # Ensure 2D array for consistent indexing
+    table = team_metric_table(train_data, test_data).pivot(index='team', columns='metric', values='value')
+    metrics = [metric for metric in TEAM_METRICS if metric in table.columns]
+    labels = [label for metric, label in zip(TEAM_METRICS, TEAM_METRIC_LABELS) if metric in table.columns]
+    table = table[metrics]
+    
+    # Scale every fixture's pair of values at once
+    team1_values = table.loc[test_data['team_1']].to_numpy()
+    team2_values = table.loc[test_data['team_2']].to_numpy()
+    max_val = np.maximum(team1_values, team2_values) * 1.2
+    max_val[max_val == 0] = 1  # Avoid division by zero
+    inverted = np.array([metric.startswith(INVERTED_METRICS) for metric in metrics])
+    # Rounded so float noise in the averages doesn't change the chart's content hash
+    team1_scaled = np.where(inverted, (max_val - team1_values) / max_val, team1_values / max_val).round(6)
+    team2_scaled = np.where(inverted, (max_val - team2_values) / max_val, team2_values / max_val).round(6)
+    
+    venues = test_data['venue'].astype(object).fillna('Unknown Venue') if 'venue' in test_data.columns \
+        else pd.Series('Unknown Venue', index=test_data.index)
+    cities = test_data['city'].astype(object).fillna('') if 'city' in test_data.columns \
+        else pd.Series('', index=test_data.index)
+    
+    fixtures = []
+    for i, (team1, team2, venue, city) in enumerate(zip(test_data['team_1'], test_data['team_2'], venues, cities)):
+        fixtures.append({
+            'team1': team1,
+            'team2': team2,
+            'location': f"{venue}, {city}" if city else venue,
+            'metrics': labels,
+            'team1_values': team1_scaled[i].tolist(),
+            'team2_values': team2_scaled[i].tolist()
+        })
+    
+    return {'fixtures': fixtures}
+
+def draw_team_performance_comparison(data, save_path=None, dpi=RENDER_DPI):
+    """Grid of radar charts, two per row, from team_comparison_data output"""
+    fixtures = data['fixtures']
+    match_count = len(fixtures)
+    rows = int(np.ceil(match_count / 2))
+    cols = min(2, match_count)
+    
+    fig, axes = plt.subplots(rows, cols, figsize=(15, 5 * rows), subplot_kw=dict(polar=True))
+    axes = np.atleast_1d(axes).ravel()
+    
+    for ax, fixture in zip(axes, fixtures):
+        if not fixture['metrics']:
+            ax.text(0, 0, "Not enough data\nfor visualization", 
+                    ha='center', va='center', fontsize=12)
+            ax.axis('off')
+            continue
         
-        for i, (_, match) in enumerate(test_data.iterrows()):
-            team1 = match['team_1']
-            team2 = match['team_2']
-            
-            # Handle different subplot layout cases
-            if match_count == 1:
-                ax = axes[0]
-            elif match_count <= 2:
-                ax = axes[i]
-            else:
-                ax = axes[i // cols, i % cols]
-            
-            # Set up radar chart
-            metrics_display = [
-                'Batting Avg', 
-                'Batting SR', 
-                'Bowling Avg', 
-                'Bowling SR', 
-                'Economy', 
-                'Win %'
-            ]
-            
-            # Filter metrics that we have data for
-            available_metrics_display = []
-            available_metrics_data = []
-            
-            for m, m_display in zip(metrics, metrics_display):
-                if m in team_metrics[team1] and m in team_metrics[team2]:
-                    available_metrics_display.append(m_display)
-                    available_metrics_data.append(m)
-            
-            if not available_metrics_data:
-                ax.text(0, 0, "Not enough data\nfor visualization", 
-                        ha='center', va='center', fontsize=12)
-                ax.axis('off')
-                continue
-            
-            # Number of metrics
-            N = len(available_metrics_data)
-            
-            # Create angle for each metric
-            angles = np.linspace(0, 2*np.pi, N, endpoint=False).tolist()
-            angles += angles[:1]  # Close the polygon
-            
-            # Extract metric values for both teams
-            team1_values = []
-            team2_values = []
-            
-            for metric in available_metrics_data:
-                # Normalize metrics (lower is better for bowling stats)
-                val1 = team_metrics[team1].get(metric, 0)
-                val2 = team_metrics[team2].get(metric, 0)
-                
-                if 'bowling' in metric or 'economy' in metric:
-                    # Invert bowling stats for visualization (lower is better)
-                    max_val = max(val1, val2) * 1.2
-                    if max_val == 0:
-                        max_val = 1  # Avoid division by zero
-                    team1_values.append((max_val - val1) / max_val)
-                    team2_values.append((max_val - val2) / max_val)
-                else:
-                    # Normalize batting stats and win percentage (higher is better)
-                    max_val = max(val1, val2) * 1.2
-                    if max_val == 0:
-                        max_val = 1  # Avoid division by zero
-                    team1_values.append(val1 / max_val)
-                    team2_values.append(val2 / max_val)
-            
-            # Close the polygon
-            team1_values += team1_values[:1]
-            team2_values += team2_values[:1]
-            
-            # Adjust angles list to match the data length
-            plot_angles = angles[:len(team1_values)]
-            
-            # Plot both teams
-            ax.plot(plot_angles, team1_values, 'o-', linewidth=2, label=team1)
-            ax.fill(plot_angles, team1_values, alpha=0.25)
-            ax.plot(plot_angles, team2_values, 'o-', linewidth=2, label=team2)
-            ax.fill(plot_angles, team2_values, alpha=0.25)
-            
-            # Set labels
-            ax.set_xticks(plot_angles[:-1])
-            ax.set_xticklabels(available_metrics_display)
-            
-            # Set title
-            venue = match.get('venue', 'Unknown Venue')
-            city = match.get('city', '')
-            location = f"{venue}, {city}" if city else venue
-            
-            ax.set_title(f"{team1} vs {team2}\n{location}")
-            ax.legend(loc='upper right', bbox_to_anchor=(0.1, 0.1))
+        # One angle per metric, with the first repeated to close the polygon
+        angles = np.linspace(0, 2*np.pi, len(fixture['metrics']), endpoint=False).tolist()
+        angles += angles[:1]
+        team1_values = fixture['team1_values'] + fixture['team1_values'][:1]
+        team2_values = fixture['team2_values'] + fixture['team2_values'][:1]
         
-        # Handle empty subplots if odd number of matches
-        if match_count > 1 and match_count % 2 == 1:
-            if rows > 1:
-                fig.delaxes(axes[rows-1, cols-1])
-            else:
-                fig.delaxes(axes[0, cols-1])
+        # Plot both teams
+        ax.plot(angles, team1_values, 'o-', linewidth=2, label=fixture['team1'])
+        ax.fill(angles, team1_values, alpha=0.25)
+        ax.plot(angles, team2_values, 'o-', linewidth=2, label=fixture['team2'])
+        ax.fill(angles, team2_values, alpha=0.25)
         
-        plt.tight_layout()
-        plt.suptitle('Team Performance Comparison for Upcoming Matches', fontsize=20, y=1.05)
+        # Set labels
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(fixture['metrics'])
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Team performance comparison plot saved to {save_path}")
-            
-        return fig
+        ax.set_title(f"{fixture['team1']} vs {fixture['team2']}\n{fixture['location']}")
+        ax.legend(loc='upper right', bbox_to_anchor=(0.1, 0.1))
+    
+    # Handle the empty subplot if odd number of matches
+    for ax in axes[match_count:]:
+        fig.delaxes(ax)
+    
+    fig.tight_layout()
+    fig.suptitle('Team Performance Comparison for Upcoming Matches', fontsize=20, y=1.05)
+    
+    if save_path:
+        save_figure(fig, save_path, dpi, 'Team performance comparison plot')
+    return fig
+
+def plot_team_performance_comparison(train_data, test_data, save_path=None):
+    """
+    Compare team performance metrics between teams in upcoming matches.
+    
+    Parameters:
+    -----------
+    train_data : pandas.DataFrame
+        DataFrame containing training data with team performance metrics
+    test_data : pandas.DataFrame
+        DataFrame containing test data with upcoming matches
+    save_path : str, optional
+        Path to save the figure
+    
+    Returns:
+    --------
+    matplotlib.figure.Figure
+        The team performance comparison plot
+    """
+    data = team_comparison_data(train_data, test_data)
+    return draw_team_performance_comparison(data, save_path) if data else None
+
+
+# Chart file name -> function drawing it from its data
+CHART_RENDERERS = {
+    'feature_importance': draw_feature_importance,
+    'win_predictions': draw_win_predictions,
+    'team_performance_comparison': draw_team_performance_comparison
+}
+
+def chart_hash(chart, data, outputs):
+    """Content hash of everything a chart's files depend on: its data and the files/dpi it's saved at"""
+    files = [[os.path.basename(save_path), dpi] for save_path, dpi in outputs]
+    payload = json.dumps([RENDER_VERSION, chart, files, data], sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_render_cache(output_dir):
+    try:
+        with open(os.path.join(output_dir, RENDER_CACHE_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_render_cache(output_dir, render_cache):
+    with open(os.path.join(output_dir, RENDER_CACHE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(render_cache, f, indent=2)
+
+def render_chart(task):
+    """Worker: draw one chart once and save it to each (path, dpi) output"""
+    chart, data, outputs = task
+    fig = CHART_RENDERERS[chart](data)
+    try:
+        for save_path, dpi in outputs:
+            fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+            print(f"{chart} saved to {save_path}")
+    finally:
+        plt.close(fig)
+    return chart
+
+def render_charts(charts, output_dir, workers=None, dpi=RENDER_DPI, thumbnails=False):
+    """
+    Render {chart name: data} to <output_dir>/<chart>.png (and a <chart>_thumb
+    preview when thumbnails is set), one chart per worker process.
+    Charts whose data hashes the same as the last render (and whose files still
+    exist) are skipped. Returns the names of the charts that were drawn.
+    """
+    render_cache = load_render_cache(output_dir)
+    thumbnail_ext = thumbnail_format() if thumbnails else None
+    
+    tasks = []
+    hashes = {}
+    for chart, data in charts.items():
+        if data is None:
+            continue
+        outputs = [(os.path.join(output_dir, f"{chart}.png"), dpi)]
+        if thumbnails:
+            outputs.append((os.path.join(output_dir, f"{chart}_thumb.{thumbnail_ext}"), THUMBNAIL_DPI))
+        hashes[chart] = chart_hash(chart, data, outputs)
+        if render_cache.get(chart) == hashes[chart] and all(os.path.exists(path) for path, _ in outputs):
+            print(f"{chart} unchanged, keeping {outputs[0][0]}")
+            continue
+        tasks.append((chart, data, outputs))
+    
+    if workers is None:
+        workers = min(len(tasks), os.cpu_count() or 1)
+    
+    rendered = []
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(render_chart, task): task[0] for task in tasks}
+            for future, chart in futures.items():
+                try:
+                    rendered.append(future.result())
+                except Exception as e:
+                    print(f"Error rendering {chart} visualization: {e}")
     else:
-        print("Warning: Empty test data, cannot create team performance comparison")
-        return None
+        for task in tasks:
+            try:
+                rendered.append(render_chart(task))
+            except Exception as e:
+                print(f"Error rendering {task[0]} visualization: {e}")
+    
+    for chart in rendered:
+        render_cache[chart] = hashes[chart]
+    if rendered:
+        save_render_cache(output_dir, render_cache)
+    return rendered
+
+def export_chart_data(charts, output_dir):
+    """
+    Write the data behind every chart to <output_dir>/charts.json, compactly, for the
+    frontend to draw client-side: feature importances, per-fixture win probabilities
+    and the scaled radar vectors.
+    """
+    output_path = os.path.join(output_dir, CHART_DATA_FILE)
+    chart_data = {chart: data for chart, data in charts.items() if data is not None}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': RENDER_VERSION, 'charts': chart_data}, f, separators=(',', ':'), default=float)
+    print(f"Chart data saved to {output_path}")
+    return output_path
 
 
-def create_visualizations(model, feature_names, train_data, test_data, output_dir="../public/visualizations"):
+def create_visualizations(model, feature_names, train_data, test_data, output_dir="../public/visualizations",
+                          workers=None, output_format='png', thumbnails=False):
     """
     Create and save all visualizations for the cricket match prediction model.
     
+    Chart data is extracted here; drawing happens in a process pool (render_charts)
+    and is skipped for charts whose data hasn't changed since the last run.
+    With output_format 'json' nothing is drawn and only charts.json is written.
+    
     Parameters:
     -----------
     model : sklearn Pipeline
@@ -451,8 +569,14 @@ def create_visualizations(model, feature_names, train_data, test_data, output_di
         DataFrame containing training data
     test_data : pandas.DataFrame
         DataFrame containing test data with predictions
-    output_dir : str, default="visualizations"
+    output_dir : str, default="../public/visualizations"
         Directory to save visualizations
+    workers : int, optional
+        Processes to render charts with (default: one per chart, up to the core count)
+    output_format : {'png', 'json', 'both'}, default='png'
+        Render PNGs, export the chart data as JSON, or both
+    thumbnails : bool, default=False
+        Also write a low-resolution WebP (or PNG) preview of each rendered chart
     
     Returns:
     --------
@@ -463,26 +587,24 @@ def create_visualizations(model, feature_names, train_data, test_data, output_di
         os.makedirs(output_dir)
         print(f"Created directory: {output_dir}")
     
-    try:
-        # 1. Feature Importance Visualization
-        feature_importance_path = os.path.join(output_dir, "feature_importance.png")
-        plot_feature_importance(model, feature_names, save_path=feature_importance_path)
-    except Exception as e:
-        print(f"Error creating feature importance visualization: {e}")
-    
-    try:
-        # 2. Win Predictions Visualization
-        win_predictions_path = os.path.join(output_dir, "win_predictions.png")
-        plot_win_predictions(test_data, save_path=win_predictions_path)
-    except Exception as e:
-        print(f"Error creating win predictions visualization: {e}")
-    
-    try:
-        # 3. Team Performance Comparison
-        team_comparison_path = os.path.join(output_dir, "team_performance_comparison.png")
-        plot_team_performance_comparison(train_data, test_data, save_path=team_comparison_path)
-    except Exception as e:
-        print(f"Error creating team performance comparison visualization: {e}")
+    charts = {}
+    chart_data = [
+        ('feature_importance', lambda: feature_importance_data(model, feature_names)),
+        ('win_predictions', lambda: win_predictions_data(test_data)),
+        ('team_performance_comparison', lambda: team_comparison_data(train_data, test_data))
+    ]
+    for chart, extract in chart_data:
+        try:
+            charts[chart] = extract()
+        except Exception as e:
+            print(f"Error creating {chart.replace('_', ' ')} visualization: {e}")
+    
+    if output_format not in CHART_OUTPUTS:
+        raise ValueError(f"Unknown chart output format: {output_format}")
+    if output_format in ('json', 'both'):
+        export_chart_data(charts, output_dir)
+    if output_format in ('png', 'both'):
+        render_charts(charts, output_dir, workers, thumbnails=thumbnails)
     
     print(f"Visualizations have been saved to the '{output_dir}' directory")
 
@@ -491,4 +613,4 @@ def create_visualizations(model, feature_names, train_data, test_data, output_di
 """
 # After training the model and making predictions
 create_visualizations(model, feature_cols, cleaned_train_data, prepared_test_data)
-"""
\ No newline at end of file
+"""
@@ -1,9 +1,15 @@
 import os
 import json
+import heapq
+import argparse
+import numpy as np
 import pandas as pd
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from delivery_cache import load_deliveries, load_matches
+
 # Get the directory where the script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -38,38 +44,92 @@ SA20_TEAMS = [
 # Combined list of teams we want to include
 INCLUDED_TEAMS = INTERNATIONAL_TEAMS + IPL_TEAMS + SA20_TEAMS
 
+# The VR page draws at most 20 shots, balanced between fours and sixes, so more
+# than 20 of each type per player is never displayed
+MAX_SHOTS_PER_TYPE = 20
 
-def process_match_data(file_path):
-    """Process a single match JSON file and extract boundary information"""
+# Number of players written to top_players.json
+TOP_PLAYERS_COUNT = 15
+
+# Number of most recent matches used for each player's recent form
+RECENT_MATCHES_WINDOW = 10
+
+
+def probe_match_info(file_path, chunk_size=16384):
+    """
+    Parse only the 'info' object of a Cricsheet match file.
+    Cricsheet writes meta, info, innings in that order, so info is decoded from the
+    first few KB and the (much larger) innings are never read.
+    Returns None if the header can't be found, so callers can fall back to a full parse
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
     with open(file_path, 'r', encoding='utf-8') as f:
-        match_data = json.load(f)
-    
-    # Basic match information
-    match_info = {
-        'date': match_data['info']['dates'][0],
-        'teams': match_data['info']['teams'],
-        'venue': match_data['info']['venue'],
-        'match_type': match_data['info']['match_type']
-    }
-    
-    # Check if this is an international, IPL, or SA20 match
-    teams = match_data['info']['teams']
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return None
+            buffer += chunk
+            
+            key_start = buffer.find('"info"')
+            if key_start < 0:
+                continue
+            colon = buffer.find(':', key_start + len('"info"'))
+            if colon < 0:
+                continue
+            value_start = colon + 1
+            while value_start < len(buffer) and buffer[value_start].isspace():
+                value_start += 1
+            
+            try:
+                info, _ = decoder.raw_decode(buffer, value_start)
+            except json.JSONDecodeError:
+                continue  # info object not complete yet, read more
+            return info if isinstance(info, dict) else None
+
+def is_relevant_match(info):
+    """Check if this is an international, IPL, or SA20 match"""
+    teams = info['teams']
     
     # Check if any of the teams are in our included list
-    is_relevant_match = any(team in INCLUDED_TEAMS for team in teams)
+    is_relevant = any(team in INCLUDED_TEAMS for team in teams)
     
     # For IPL and SA20, we might also check for competition name if available
-    if 'event' in match_data['info']:
-        event_name = match_data['info']['event'].get('name', '').lower()
+    if 'event' in info:
+        event_name = info['event'].get('name', '').lower()
         if 'ipl' in event_name or 'indian premier league' in event_name or 'sa20' in event_name:
-            is_relevant_match = True
+            is_relevant = True
+    
+    return is_relevant
+
+def get_match_info(info):
+    """Basic match information"""
+    return {
+        'date': info['dates'][0],
+        'teams': info['teams'],
+        'venue': info['venue'],
+        'match_type': info['match_type']
+    }
+
+def process_match_data(file_path):
+    """Process a single match JSON file and extract boundary information"""
+    # Reject irrelevant (e.g. domestic) matches from the header alone
+    info = probe_match_info(file_path)
+    if info is not None and not is_relevant_match(info):
+        return {}, get_match_info(info)  # Return empty stats if not a relevant match
     
-    if not is_relevant_match:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        match_data = json.load(f)
+    
+    match_info = get_match_info(match_data['info'])
+    
+    if not is_relevant_match(match_data['info']):
         return {}, match_info  # Return empty stats if not a relevant match
 
     # Initialize player stats
     player_stats = defaultdict(lambda: {'name': '', 'team': '', 'fours': 0, 'sixes': 0, 
-                                        'shots': [], 'matches': 0, 'runs': 0})
+                                        'shots': [], 'matches': 0, 'runs': 0,
+                                        'balls_faced': 0, 'dismissals': 0})
     
     # Process each innings
     for innings in match_data.get('innings', []):
@@ -95,6 +155,22 @@ def process_match_data(file_path):
                 runs = delivery.get('runs', {}).get('batter', 0)
                 player_stats[batter]['runs'] += runs
                 
+                # Wides don't count as a ball faced (no-balls do)
+                if 'wides' not in delivery.get('extras', {}):
+                    player_stats[batter]['balls_faced'] += 1
+                
+                # Count dismissals (the player out may be the non-striker, e.g. a run out)
+                wickets = delivery.get('wickets', [])
+                if isinstance(wickets, dict):
+                    wickets = [wickets]
+                for wicket in wickets:
+                    player_out = wicket.get('player_out') if wicket else None
+                    if player_out:
+                        if not player_stats[player_out]['team']:
+                            player_stats[player_out]['team'] = team
+                        player_stats[player_out]['matches'] = 1
+                        player_stats[player_out]['dismissals'] += 1
+                
                 # Check for boundaries (4s and 6s)
                 if runs == 4:
                     player_stats[batter]['fours'] += 1
@@ -149,76 +225,226 @@ def should_update_data():
         print(f"Error checking last update time: {e}")
         return True  # If there's an error, update anyway
 
-def main():
-    
-    
-    all_player_stats = defaultdict(lambda: {'name': '', 'team': '', 'fours': 0, 'sixes': 0, 
-                                           'shots': [], 'matches': 0, 'runs': 0})
+def create_player_totals():
+    """Running totals for one player across all processed matches"""
+    return {'name': '', 'team': '', 'fours': 0, 'sixes': 0, 'shots': [], 'matches': 0, 'runs': 0,
+            'balls_faced': 0, 'dismissals': 0, 'recent': []}
+
+def merge_match_stats(all_player_stats, player_stats, match_key):
+    """
+    Streaming reducer: fold one match's player stats into the running totals.
+    Only the first MAX_SHOTS_PER_TYPE fours and sixes are kept per player, so the
+    shot lists stay bounded however large the archive grows.
+    match_key orders matches by recency, e.g. (date, file position)
+    """
+    for player_id, stats in player_stats.items():
+        totals = all_player_stats[player_id]
+        totals['name'] = stats['name'] or player_id
+        totals['team'] = stats['team']
+        
+        # Every boundary adds a shot, so the boundary counts tell us how many are kept already
+        kept = {'four': min(totals['fours'], MAX_SHOTS_PER_TYPE),
+                'six': min(totals['sixes'], MAX_SHOTS_PER_TYPE)}
+        for shot in stats['shots']:
+            if kept[shot['type']] < MAX_SHOTS_PER_TYPE:
+                totals['shots'].append(shot)
+                kept[shot['type']] += 1
+        
+        totals['fours'] += stats['fours']
+        totals['sixes'] += stats['sixes']
+        totals['matches'] += stats['matches']
+        totals['runs'] += stats['runs']
+        totals['balls_faced'] += stats['balls_faced']
+        totals['dismissals'] += stats['dismissals']
+        
+        # Keep this match's line in the player's fixed-size window of most recent matches.
+        # Files don't arrive in date order, so the window is a min-heap on match_key
+        # holding at most RECENT_MATCHES_WINDOW entries rather than a plain FIFO
+        entry = (match_key, stats['runs'], stats['balls_faced'], stats['dismissals'])
+        if len(totals['recent']) < RECENT_MATCHES_WINDOW:
+            heapq.heappush(totals['recent'], entry)
+        else:
+            heapq.heappushpop(totals['recent'], entry)
+
+def batting_rates(runs, balls_faced, dismissals):
+    """Batting average (runs per dismissal, or runs if never out) and strike rate"""
+    average = round(runs / dismissals, 2) if dismissals > 0 else float(runs)
+    strike_rate = round((runs / balls_faced) * 100, 2) if balls_faced > 0 else 0
+    return average, strike_rate
+
+def process_match_file(file_path):
+    """Worker-safe wrapper around process_match_data that returns plain dicts or the error"""
+    try:
+        player_stats, match_info = process_match_data(file_path)
+        return dict(player_stats), match_info, None
+    except Exception as e:
+        return None, None, e
+
+def iter_match_results(file_paths, workers):
+    """Yields (file path, (player stats, match info, error)) in file order, parsing in a process pool if workers > 1"""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() keeps file order, so the reduced output is identical to a serial run
+            results = executor.map(process_match_file, file_paths, chunksize=16)
+            yield from zip(file_paths, results)
+    else:
+        for file_path in file_paths:
+            yield file_path, process_match_file(file_path)
+
+def collect_player_stats(workers=1):
+    """Player totals from parsing every match file in DATA_DIR"""
+    all_player_stats = defaultdict(create_player_totals)
     
     print("Processing match data files...")
-    json_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.json')]
+    # Sorted so the recency tie-break and each player's team don't depend on directory order
+    json_files = sorted(f for f in os.listdir(DATA_DIR) if f.endswith('.json'))
+    file_paths = [os.path.join(DATA_DIR, file_name) for file_name in json_files]
     
     processed_count = 0
-    for file_name in json_files:
-        file_path = os.path.join(DATA_DIR, file_name)
-        print(f"Processing {file_name}...")
+    for file_count, (file_path, (player_stats, match_info, error)) in enumerate(iter_match_results(file_paths, workers), 1):
+        if error is not None:
+            print(f"Error processing {os.path.basename(file_path)}: {error}")
+            continue
         
-        try:
-            player_stats, match_info = process_match_data(file_path)
-            
-            # Skip if no relevant stats (not international/IPL)
-            if not player_stats:
-                continue
-                
-            processed_count += 1
+        if file_count % 100 == 0:
+            print(f"Processed {file_count}/{len(file_paths)} files...")
+        
+        # Skip if no relevant stats (not international/IPL)
+        if not player_stats:
+            continue
             
-            # Aggregate player statistics across matches
-            for player_id, stats in player_stats.items():
-                all_player_stats[player_id]['name'] = stats['name'] or player_id
-                all_player_stats[player_id]['team'] = stats['team']
-                all_player_stats[player_id]['fours'] += stats['fours']
-                all_player_stats[player_id]['sixes'] += stats['sixes']
-                all_player_stats[player_id]['shots'].extend(stats['shots'])
-                all_player_stats[player_id]['matches'] += stats['matches']
-                all_player_stats[player_id]['runs'] += stats['runs']
+        processed_count += 1
         
-        except Exception as e:
-            print(f"Error processing {file_name}: {e}")
+        # Aggregate player statistics across matches
+        merge_match_stats(all_player_stats, player_stats, (match_info['date'], file_count))
     
     print(f"Processed {processed_count} international/IPL matches")
+    return all_player_stats
+
+def collect_player_stats_from_cache(workers=1):
+    """
+    The same player totals as collect_player_stats, read from the shared delivery cache
+    (delivery_cache.py) instead of re-parsing every match file. Per-match batting
+    counters come from one groupby over the deliveries; only the per-match shot lists
+    are folded in Python. The cache has no commentary, which get_zone_from_commentary
+    ignores anyway, so shots are identical.
+    """
+    print("Loading deliveries from the delivery cache...")
+    matches = load_matches(DATA_DIR, columns=['match_id', 'date', 'event', 'team_1', 'team_2'], workers=workers)
+    deliveries = load_deliveries(DATA_DIR, workers=workers, columns=[
+        'match_id', 'batting_team', 'batter', 'runs_batter', 'extras_type', 'player_out', 'player_out_2'])
     
-    # Calculate derived statistics
-    for player_id, stats in all_player_stats.items():
-        if stats['matches'] > 0:
-            stats['average'] = round(stats['runs'] / stats['matches'], 2)
-            
-            # Calculate strike rate (assuming typical T20 format with ~20 balls faced per match)
-            # In a real implementation, you would count actual balls faced
-            estimated_balls = stats['matches'] * 20
-            stats['strikeRate'] = round((stats['runs'] / estimated_balls) * 100, 2) if estimated_balls > 0 else 0
-    
-    # Convert to list and sort by total boundaries (fours + sixes)
-    players_list = []
-    for player_id, stats in all_player_stats.items():
+    # Same rule as is_relevant_match: an included team, or an IPL / SA20 event
+    events = matches['event'].astype(object).fillna('').str.lower()
+    relevant = (matches['team_1'].isin(INCLUDED_TEAMS) | matches['team_2'].isin(INCLUDED_TEAMS) |
+                events.str.contains('ipl|indian premier league|sa20'))
+    match_ids = matches['match_id'].astype(object)
+    # Cache rows follow sorted file order, matching collect_player_stats' file count
+    match_keys = dict(zip(match_ids, zip(matches['date'].dt.strftime('%Y-%m-%d'), range(1, len(matches) + 1))))
+    
+    deliveries = deliveries[deliveries['match_id'].isin(match_ids[relevant]) &
+                            deliveries['batting_team'].isin(INCLUDED_TEAMS)]
+    match_id = deliveries['match_id'].astype(object).to_numpy()
+    team = deliveries['batting_team'].astype(object).to_numpy()
+    position = np.arange(len(deliveries))
+    runs = deliveries['runs_batter'].to_numpy(dtype=np.int64)
+    
+    # One row per batter appearance and one per dismissal (either batter can be out),
+    # stable-sorted by delivery so each player's first row is where they were first seen
+    appearances = [pd.DataFrame({
+        'match_id': match_id, 'player': deliveries['batter'].astype(object).to_numpy(), 'team': team,
+        'position': position, 'runs': runs,
+        'balls_faced': (deliveries['extras_type'] != 'wides').to_numpy(dtype=np.int64),
+        'fours': (runs == 4).astype(np.int64), 'sixes': (runs == 6).astype(np.int64), 'dismissals': 0
+    })]
+    for column in ('player_out', 'player_out_2'):
+        out = deliveries[column].notna().to_numpy()
+        appearances.append(pd.DataFrame({
+            'match_id': match_id[out], 'player': deliveries[column].astype(object).to_numpy()[out],
+            'team': team[out], 'position': position[out],
+            'runs': 0, 'balls_faced': 0, 'fours': 0, 'sixes': 0, 'dismissals': 1
+        }))
+    appearances = pd.concat(appearances, ignore_index=True).sort_values('position', kind='stable')
+    
+    per_player = appearances.groupby(['match_id', 'player'], sort=False).agg(
+        team=('team', 'first'), position=('position', 'first'), runs=('runs', 'sum'),
+        balls_faced=('balls_faced', 'sum'), fours=('fours', 'sum'), sixes=('sixes', 'sum'),
+        dismissals=('dismissals', 'sum')).sort_values('position').reset_index()
+    
+    # Boundaries in delivery order, per match and batter
+    boundaries = appearances[(appearances['fours'] + appearances['sixes']) > 0]
+    shot_types = boundaries.groupby(['match_id', 'player'], sort=False)['sixes'].agg(
+        lambda sixes: ['six' if six else 'four' for six in sixes]).to_dict()
+    
+    all_player_stats = defaultdict(create_player_totals)
+    player_stats = {}
+    current_match = None
+    processed_count = 0
+    
+    # Fold each match's players into the totals, in the order the file loop sees them
+    for row in per_player.itertuples(index=False):
+        if row.match_id != current_match:
+            if player_stats:
+                merge_match_stats(all_player_stats, player_stats, match_keys[current_match])
+                processed_count += 1
+            current_match, player_stats = row.match_id, {}
+        
+        shots = shot_types.get((row.match_id, row.player), [])
+        player_stats[row.player] = {
+            'name': '', 'team': row.team, 'fours': row.fours, 'sixes': row.sixes,
+            'shots': [{'type': shot_type, 'angle': None, 'zone': None} for shot_type in shots],
+            'matches': 1, 'runs': row.runs, 'balls_faced': row.balls_faced, 'dismissals': row.dismissals
+        }
+    
+    if player_stats:
+        merge_match_stats(all_player_stats, player_stats, match_keys[current_match])
+        processed_count += 1
+    
+    print(f"Processed {processed_count} international/IPL matches")
+    return all_player_stats
+
+def main(workers=1, use_cache=False):
+    if use_cache:
+        all_player_stats = collect_player_stats_from_cache(workers)
+    else:
+        all_player_stats = collect_player_stats(workers)
+    
+    # Keep the top players by total boundaries (fours + sixes); nlargest is
+    # equivalent to a stable descending sort truncated to the top N
+    top_entries = heapq.nlargest(TOP_PLAYERS_COUNT, all_player_stats.items(),
+                                 key=lambda item: (item[1]['fours'] + item[1]['sixes']))
+    
+    top_players = []
+    for player_id, stats in top_entries:
+        # Derived statistics from real balls faced and dismissals
+        average, strike_rate = batting_rates(stats['runs'], stats['balls_faced'], stats['dismissals'])
+        
+        recent_runs = sum(entry[1] for entry in stats['recent'])
+        recent_balls = sum(entry[2] for entry in stats['recent'])
+        recent_dismissals = sum(entry[3] for entry in stats['recent'])
+        recent_average, recent_strike_rate = batting_rates(recent_runs, recent_balls, recent_dismissals)
+        
         player_data = {
             'id': player_id,
             'name': stats['name'],
             'team': stats['team'],
             'matches': stats['matches'],
             'runs': stats['runs'],
-            'average': stats.get('average', 0),
-            'strikeRate': stats.get('strikeRate', 0),
+            'ballsFaced': stats['balls_faced'],
+            'dismissals': stats['dismissals'],
+            'average': average,
+            'strikeRate': strike_rate,
+            'recentForm': {
+                'matches': len(stats['recent']),
+                'runs': recent_runs,
+                'average': recent_average,
+                'strikeRate': recent_strike_rate
+            },
             'fours': stats['fours'],
             'sixes': stats['sixes'],
             'shots': stats['shots']
         }
-        players_list.append(player_data)
-    
-    # Sort by total boundaries (fours + sixes)
-    players_list.sort(key=lambda x: (x['fours'] + x['sixes']), reverse=True)
-    
-    # Get top 10 players
-    top_players = players_list[:15]
+        top_players.append(player_data)
     
     # Save results to JSON file
     output_file = os.path.join(OUTPUT_DIR, 'top_players.json')
@@ -237,4 +463,11 @@ def main():
         print(f"{i}. {player['name']} ({player['team']}): {player['fours']} fours, {player['sixes']} sixes")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build top boundary hitters from the vrdata archive")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes for parsing match files (default: 1, serial)")
+    parser.add_argument("--delivery-cache", action="store_true",
+                        help="Read deliveries from the shared delivery cache instead of parsing every match file")
+    args = parser.parse_args()
+    
+    main(workers=args.workers, use_cache=args.delivery_cache)
\ No newline at end of file
@@ -0,0 +1,45 @@
+import os
+import sys
+import shutil
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PUBLIC_DIR = os.path.join(ROOT_DIR, 'public')
+
+# The scripts are flat modules that import their siblings, so put their directories on the path
+for path in (os.path.join(ROOT_DIR, 'scripts'), os.path.join(PUBLIC_DIR, 'match_data')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+def copy_match_files(source_dir, target_dir, limit=None):
+    """Copy the first `limit` Cricsheet match files (sorted by name) from source_dir into target_dir"""
+    os.makedirs(target_dir, exist_ok=True)
+    file_names = sorted(f for f in os.listdir(source_dir) if f.endswith('.json'))[:limit]
+    for file_name in file_names:
+        shutil.copy2(os.path.join(source_dir, file_name), os.path.join(target_dir, file_name))
+    return [os.path.join(target_dir, file_name) for file_name in file_names]
+
+@pytest.fixture
+def team_data_dir(tmp_path):
+    """A small teamData archive: a few real match files per format sub-directory"""
+    input_dir = tmp_path / 'teamData'
+    for format_name in ('t20', 'odi', 'test', 'ipl'):
+        copy_match_files(os.path.join(PUBLIC_DIR, 'teamData', format_name), input_dir / format_name, limit=6)
+    return input_dir
+
+@pytest.fixture
+def vr_data(tmp_path, monkeypatch):
+    """vrDataPrep pointed at a copy of part of the vrdata archive, with its own output and delivery cache"""
+    import vrDataPrep
+    import delivery_cache
+
+    data_dir = tmp_path / 'vrdata'
+    output_dir = tmp_path / 'stats'
+    output_dir.mkdir()
+    copy_match_files(os.path.join(PUBLIC_DIR, 'vrdata'), data_dir, limit=120)
+    monkeypatch.setattr(vrDataPrep, 'DATA_DIR', str(data_dir))
+    monkeypatch.setattr(vrDataPrep, 'OUTPUT_DIR', str(output_dir))
+    monkeypatch.setattr(vrDataPrep, 'LAST_UPDATE_FILE', str(output_dir / 'last_updated.txt'))
+    monkeypatch.setattr(delivery_cache, 'CACHE_DIR', str(tmp_path / 'deliveryCache'))
+    return vrDataPrep
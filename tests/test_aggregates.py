@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+
+import aggregates
+from aggregates import MATCH_RESULTS_FILE, STATE_FILE_NAME, append_results, update_aggregates
+
+def read_matches():
+    return pd.read_csv(os.path.join(aggregates.base_dir, MATCH_RESULTS_FILE), dtype={"match_id": str})
+
+def assert_tables_equal(tables, expected):
+    assert tables.keys() == expected.keys()
+    for name, table in tables.items():
+        pd.testing.assert_frame_equal(table, expected[name], check_dtype=False, obj=name)
+
+def test_appended_results_fold_into_the_same_tables_as_a_full_rebuild(tmp_path):
+    matches = read_matches()
+    full_dir = tmp_path / "full"
+    full_dir.mkdir()
+    matches.to_csv(full_dir / MATCH_RESULTS_FILE, index=False)
+    full = update_aggregates(str(full_dir), chunk_size=700, full_rebuild=True)
+
+    # Aggregate the first part, then append the rest (overlapping a few already-counted matches)
+    incremental_dir = tmp_path / "incremental"
+    incremental_dir.mkdir()
+    split = 4000
+    matches.iloc[:split].to_csv(incremental_dir / MATCH_RESULTS_FILE, index=False)
+    partial = update_aggregates(str(incremental_dir), chunk_size=700)
+    assert (incremental_dir / STATE_FILE_NAME).exists()
+    assert partial["team_statistics"]["total_matches"].sum() < full["team_statistics"]["total_matches"].sum()
+
+    new_results = tmp_path / "new_results.csv"
+    matches.iloc[split - 50:].to_csv(new_results, index=False)
+    assert append_results(str(new_results), str(incremental_dir)) == len(matches) - split
+    assert append_results(str(new_results), str(incremental_dir)) == 0
+
+    assert_tables_equal(update_aggregates(str(incremental_dir), chunk_size=700), full)
+    # Nothing new: the saved counters alone reproduce the tables
+    assert_tables_equal(update_aggregates(str(incremental_dir), chunk_size=700), full)
+
+def test_rewritten_results_trigger_a_rebuild(tmp_path):
+    matches = read_matches()
+    matches.to_csv(tmp_path / MATCH_RESULTS_FILE, index=False)
+    update_aggregates(str(tmp_path))
+
+    # Drop a match from the already-aggregated part; its counters can't be un-added, so everything is recomputed
+    trimmed = matches.drop(index=10)
+    trimmed.to_csv(tmp_path / MATCH_RESULTS_FILE, index=False)
+    tables = update_aggregates(str(tmp_path))
+
+    rebuild_dir = tmp_path / "rebuild"
+    rebuild_dir.mkdir()
+    trimmed.to_csv(rebuild_dir / MATCH_RESULTS_FILE, index=False)
+    assert_tables_equal(tables, update_aggregates(str(rebuild_dir), full_rebuild=True))
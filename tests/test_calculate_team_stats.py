@@ -0,0 +1,61 @@
+import json
+
+from calculateTeamStats import FORMATS, StatsAccumulator, calculate_team_stats, process_match_file
+
+def read_outputs(output_dir):
+    """Every per-format stats file plus the summary, keyed by file name"""
+    names = [f"{format_name}_stats.json" for format_name in FORMATS] + ["summary.json"]
+    return {name: json.loads((output_dir / name).read_text(encoding='utf-8')) for name in names}
+
+def test_parallel_matches_serial(team_data_dir, tmp_path):
+    calculate_team_stats(workers=1, input_dir=team_data_dir, output_dir=tmp_path / 'serial')
+    calculate_team_stats(workers=2, input_dir=team_data_dir, output_dir=tmp_path / 'parallel')
+
+    serial = read_outputs(tmp_path / 'serial')
+    assert serial["t20_stats.json"], "fixture archive produced no teams"
+    assert read_outputs(tmp_path / 'parallel') == serial
+
+def test_incremental_run_matches_full_rebuild(team_data_dir, tmp_path):
+    # Hold back one match per format, aggregate the rest, then add them back
+    held_back = {}
+    for format_dir in team_data_dir.iterdir():
+        match_files = sorted(format_dir.glob('*.json'))
+        if match_files:
+            held_back[match_files[-1]] = match_files[-1].read_bytes()
+            match_files[-1].unlink()
+
+    incremental_dir = tmp_path / 'incremental'
+    calculate_team_stats(input_dir=team_data_dir, output_dir=incremental_dir)
+    partial = read_outputs(incremental_dir)
+    for path, contents in held_back.items():
+        path.write_bytes(contents)
+    calculate_team_stats(input_dir=team_data_dir, output_dir=incremental_dir)
+
+    calculate_team_stats(input_dir=team_data_dir, output_dir=tmp_path / 'full', full_rebuild=True)
+    full = read_outputs(tmp_path / 'full')
+    assert partial != full
+    assert read_outputs(incremental_dir) == full
+
+def accumulate(match_files):
+    """A fresh accumulator fed every (format, path) in match_files"""
+    accumulator = StatsAccumulator()
+    for format_name, file_path in match_files:
+        process_match_file(file_path, format_name, accumulator)
+    return accumulator
+
+def expand(accumulator):
+    return {format_name: accumulator.to_team_stats(format_name) for format_name in FORMATS}
+
+def test_accumulator_merge_and_state_round_trip(team_data_dir):
+    match_files = [(format_dir.name, str(path)) for format_dir in sorted(team_data_dir.iterdir())
+                   for path in sorted(format_dir.glob('*.json'))]
+    whole = accumulate(match_files)
+
+    # Interleaved shards, each interning names in its own order, merge back to one pass over every file
+    merged = StatsAccumulator()
+    for shard in (match_files[1::2], match_files[::2]):
+        merged.merge(accumulate(shard))
+    assert expand(merged) == expand(whole)
+
+    restored = StatsAccumulator.from_state(json.loads(json.dumps(whole.to_state())))
+    assert expand(restored) == expand(whole)
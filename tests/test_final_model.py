@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from final_model import (FORMAT_FALLBACKS, MIN_FORMAT_MATCHES, MODEL_FORMATS, build_history_index,
+                         predict_with_model_family, prepare_fixtures_by_format, prepare_test_data,
+                         resolve_model_format, split_training_by_format)
+
+def fixture(match_id, team_1, team_2, venue, match_format='ODI'):
+    """An upcoming match as matches.json stores it, without player lists"""
+    return {'details': {'matchInfo': {
+        'matchId': match_id,
+        'team1': {'name': team_1, 'playerDetails': []},
+        'team2': {'name': team_2, 'playerDetails': []},
+        'venue': {'name': venue, 'city': 'City'},
+        'matchFormat': match_format,
+    }}}
+
+def training_frame(rows, match_type='ODI'):
+    """Cleaned training rows (team_1, team_2, winner, venue, venue_category), categoricals as clean_training_data leaves them"""
+    frame = pd.DataFrame(rows, columns=['team_1', 'team_2', 'winner', 'venue', 'venue_category'])
+    frame['match_type'] = match_type
+    return frame.astype({column: 'category' for column in frame.columns})
+
+def scan_history(train_data, team_1, team_2, venue):
+    """The per-fixture DataFrame scans prepare_test_data ran before the history index"""
+    values = {}
+    for team_key, team in (('team_1', team_1), ('team_2', team_2)):
+        matches = train_data[(train_data['team_1'] == team) | (train_data['team_2'] == team)]
+        wins = len(train_data[((train_data['team_1'] == team) & (train_data['winner'] == team)) |
+                              ((train_data['team_2'] == team) & (train_data['winner'] == team))])
+        values[f'{team_key}_win_percentage'] = wins / len(matches) * 100 if len(matches) > 0 else 50
+    venue_data = train_data[train_data['venue'] == venue]
+    values['venue_category'] = venue_data['venue_category'].mode()[0] if not venue_data.empty else 'Neutral'
+    return values
+
+ODI_ROWS = [
+    ('India', 'Australia', 'India', 'Wankhede', 'Batting-Friendly'),
+    ('Australia', 'India', 'Australia', 'Wankhede', 'Bowling-Friendly'),  # tied venue category counts
+    ('India', 'England', 'India', 'MCG', 'Balanced'),
+    ('England', 'Australia', 'No result', 'MCG', 'Balanced'),
+    ('Pakistan', 'England', 'England', 'MCG', None),
+    ('Nepal', 'Pakistan', 'Pakistan', 'Lord\'s', 'Bowling-Friendly'),      # Nepal never wins, only on one side
+    ('Scotland', 'Nepal', 'Scotland', 'Lord\'s', 'Balanced'),
+]
+T20_ROWS = [
+    ('India', 'Pakistan', 'Pakistan', 'Dubai', 'Bowling-Friendly'),
+    ('Pakistan', 'India', 'Pakistan', 'Dubai', 'Bowling-Friendly'),
+    ('England', 'India', 'India', 'Eden Gardens', 'Batting-Friendly'),
+]
+
+FIXTURES = [
+    fixture(1, 'India', 'Australia', 'Wankhede'),
+    fixture(2, 'Nepal', 'Scotland', 'Lord\'s'),
+    fixture(3, 'England', 'Pakistan', 'MCG'),
+    fixture(4, 'Netherlands', 'India', 'Unknown Oval'),  # no history for the team or the venue
+]
+
+def history_columns(prepared):
+    return prepared[['team_1_win_percentage', 'team_2_win_percentage', 'venue_category']].to_dict('records')
+
+def expected_history(train_data, fixtures):
+    return [scan_history(train_data, *(info['team1']['name'], info['team2']['name'], info['venue']['name']))
+            for info in (match['details']['matchInfo'] for match in fixtures)]
+
+def test_history_index_matches_the_per_fixture_scan():
+    train_data = training_frame(ODI_ROWS)
+    prepared = prepare_test_data(FIXTURES, {}, train_data)
+    assert history_columns(prepared) == pytest.approx(expected_history(train_data, FIXTURES))
+    unknown = history_columns(prepared)[3]
+    assert (unknown['team_1_win_percentage'], unknown['venue_category']) == (50, 'Neutral')
+
+    index = build_history_index(train_data)
+    assert index['team_matches']['Nepal'] == 2 and 'Nepal' not in index['team_wins']
+
+def test_fallback_format_uses_its_own_history():
+    odi, t20 = training_frame(ODI_ROWS), training_frame(T20_ROWS, 'T20')
+    histories = {'odi': build_history_index(odi), 't20': build_history_index(t20)}
+    fixtures = [
+        fixture(1, 'India', 'Pakistan', 'Dubai', 'T20'),
+        fixture(2, 'India', 'Pakistan', 'Dubai', 'ODI'),
+        fixture(3, 'India', 'England', 'MCG', 'Test'),  # no Test model: scored with the ODI model and history
+    ]
+    prepared = prepare_fixtures_by_format(fixtures, {}, histories)
+
+    assert prepared['match_id'].tolist() == [1, 2, 3]
+    assert prepared['model_format'].tolist() == ['t20', 'odi', 'odi']
+    expected = (expected_history(t20, fixtures[:1]) + expected_history(odi, fixtures[1:]))
+    assert history_columns(prepared) == pytest.approx(expected)
+
+def cleaned_frame(format_counts):
+    """Cleaned training rows for each match_type, team_1 winning every other match"""
+    rows = []
+    for match_type, count in format_counts.items():
+        for i in range(count):
+            rows.append({'team_1': f"{match_type} A", 'team_2': f"{match_type} B", 'match_type': match_type,
+                         'winner': f"{match_type} A" if i % 2 else f"{match_type} B",
+                         'venue': 'Ground', 'team_1_won': i % 2})
+    return pd.DataFrame(rows).astype({'match_type': 'category'})
+
+def test_formats_below_the_threshold_get_no_model():
+    cleaned = cleaned_frame({'ODI': MIN_FORMAT_MATCHES, 'T20': MIN_FORMAT_MATCHES + 5,
+                             'Test': MIN_FORMAT_MATCHES - 1, 'The Hundred': 80})
+    format_data = split_training_by_format(cleaned)
+
+    assert sorted(format_data) == ['odi', 't20']
+    for format_type, subset in format_data.items():
+        # Every row is of the format's own match_type; unknown match types train nothing
+        assert set(subset['match_type'].astype(str)) == {MODEL_FORMATS[format_type]}
+    assert len(format_data['t20']) == MIN_FORMAT_MATCHES + 5
+
+class FormatModel:
+    """Stands in for a trained pipeline: a fixed probability per format, remembering what it scored"""
+    def __init__(self, probability):
+        self.probability = probability
+        self.scored = []
+
+    def predict_proba(self, X):
+        self.scored.extend(X.index)
+        return np.column_stack([np.full(len(X), 1 - self.probability), np.full(len(X), self.probability)])
+
+def test_each_fixture_is_scored_by_its_routed_model():
+    odi, t20 = training_frame(ODI_ROWS), training_frame(T20_ROWS, 'T20')
+    model_family = {
+        'odi': {'model': FormatModel(0.25), 'feature_cols': ['team_1_win_percentage'], 'history': build_history_index(odi)},
+        't20': {'model': FormatModel(0.75), 'feature_cols': ['team_2_win_percentage'], 'history': build_history_index(t20)},
+    }
+    assert resolve_model_format('test', model_family) == FORMAT_FALLBACKS['test'][0] == 'odi'
+    assert resolve_model_format('hundred', model_family) in model_family
+
+    fixtures = [
+        fixture(1, 'India', 'Pakistan', 'Dubai', 'T20'),
+        fixture(2, 'India', 'England', 'MCG', 'Test'),
+        fixture(3, 'India', 'England', 'MCG', 'Hundred'),  # unknown format
+        fixture(4, 'India', 'Pakistan', 'Dubai', 'ODI'),
+    ]
+    histories = {format_type: entry['history'] for format_type, entry in model_family.items()}
+    prepared = prepare_fixtures_by_format(fixtures, {}, histories)
+    predict_with_model_family(model_family, prepared)
+
+    expected_formats = ['t20', 'odi', resolve_model_format('hundred', model_family), 'odi']
+    assert prepared['model_format'].tolist() == expected_formats
+    for position, format_type in enumerate(expected_formats):
+        assert prepared['team_1_win_probability'][position] == model_family[format_type]['model'].probability
+    for format_type, entry in model_family.items():
+        assert sorted(entry['model'].scored) == [i for i, routed in enumerate(expected_formats) if routed == format_type]
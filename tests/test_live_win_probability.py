@@ -0,0 +1,79 @@
+import pytest
+
+from live_win_probability import MAX_BALLS, LiveWinProbability, next_innings, probability, update
+
+DOT = {'runs': {'batter': 0, 'extras': 0, 'total': 0}}
+SINGLE = {'runs': {'batter': 1, 'extras': 0, 'total': 1}}
+WIDE = {'runs': {'batter': 0, 'extras': 1, 'total': 1}, 'extras': {'wides': 1}}
+NO_BALL = {'runs': {'batter': 4, 'extras': 1, 'total': 5}, 'extras': {'noballs': 1}}
+LEG_BYE = {'runs': {'batter': 0, 'extras': 1, 'total': 1}, 'extras': {'legbyes': 1}}
+BOWLED = {'runs': {'batter': 0, 'extras': 0, 'total': 0}, 'wickets': [{'player_out': 'A', 'kind': 'bowled'}]}
+RETIRED = {'runs': {'batter': 0, 'extras': 0, 'total': 0}, 'wickets': [{'player_out': 'A', 'kind': 'retired hurt'}]}
+DOUBLE_RUN_OUT = {'runs': {'batter': 0, 'extras': 0, 'total': 0},
+                  'wickets': [{'player_out': 'A', 'kind': 'run out'}, {'player_out': 'B', 'kind': 'run out'}]}
+
+@pytest.fixture(scope='module')
+def live_model():
+    return LiveWinProbability()
+
+def state_at(live_model, format_type, runs, wickets, legal_balls):
+    state = live_model.new_state(format_type, team_1='A', team_2='B')
+    state.runs, state.wickets, state.legal_balls = runs, wickets, legal_balls
+    return state
+
+def test_only_legal_balls_use_up_the_overs(live_model):
+    state = live_model.new_state('odi')
+    for delivery in (WIDE, NO_BALL, LEG_BYE, SINGLE):
+        update(state, delivery)
+    assert (state.runs, state.legal_balls, state.wickets) == (8, 2, 0)
+
+def test_retirements_are_not_wickets(live_model):
+    state = live_model.new_state('t20')
+    for delivery in (BOWLED, RETIRED, DOUBLE_RUN_OUT):
+        update(state, delivery)
+    assert (state.wickets, state.legal_balls) == (3, 3)
+
+def test_first_innings_rolls_over_into_the_chase(live_model):
+    state = state_at(live_model, 't20', 150, 4, MAX_BALLS['t20'])
+    update(state, SINGLE)
+    assert (state.innings, state.target, state.first_innings_total) == (2, 151, 150)
+    assert (state.runs, state.wickets, state.legal_balls) == (1, 0, 1)
+
+@pytest.mark.parametrize('format_type, runs, wickets', [
+    ('odi', 200, 5), ('odi', 160, 6), ('odi', 250, 9), ('t20', 120, 0), ('t20', 180, 3),
+])
+def test_probability_is_continuous_at_the_innings_break(live_model, format_type, runs, wickets):
+    max_balls = MAX_BALLS[format_type]
+    last_ball = probability(state_at(live_model, format_type, runs, wickets, max_balls - 1))
+    end_of_innings = probability(state_at(live_model, format_type, runs, wickets, max_balls))
+    state = state_at(live_model, format_type, runs, wickets, max_balls)
+    after_first_dot_ball = update(state, DOT)
+
+    assert state.innings == 2
+    assert abs(end_of_innings - last_ball) < 0.02
+    assert abs(after_first_dot_ball - end_of_innings) < 0.02
+
+def test_wickets_do_not_help_the_batting_side(live_model):
+    # Once the overs are used up the total is all that counts
+    assert probability(state_at(live_model, 'odi', 250, 9, 300)) == probability(state_at(live_model, 'odi', 250, 2, 300))
+    mid_innings = [probability(state_at(live_model, 'odi', 150, wickets, 150)) for wickets in range(10)]
+    assert mid_innings == sorted(mid_innings, reverse=True)
+
+def test_all_out_ends_the_first_innings(live_model):
+    state = state_at(live_model, 'odi', 180, 9, 200)
+    update(state, BOWLED)
+    update(state, DOT)
+    assert (state.innings, state.target) == (2, 181)
+
+@pytest.mark.parametrize('runs, wickets, legal_balls, expected', [
+    (151, 3, 60, 0.0),    # target reached
+    (149, 10, 100, 1.0),  # bowled out short
+    (149, 4, 120, 1.0),   # overs used up short
+    (150, 6, 120, 0.5),   # scores level
+])
+def test_terminal_chase_states(live_model, runs, wickets, legal_balls, expected):
+    state = state_at(live_model, 't20', 150, 0, 120)
+    next_innings(state)
+    state.runs, state.wickets, state.legal_balls = runs, wickets, legal_balls
+    assert probability(state) == expected
+    assert live_model.probabilities(state) == {'A': expected, 'B': 1 - expected}
@@ -0,0 +1,40 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import merge
+from aggregates import MATCH_RESULTS_FILE, TABLE_FILES
+
+@pytest.fixture
+def match_data_dir(tmp_path):
+    """A copy of match_results.csv and the snapshot tables, so runs don't write into the repo"""
+    for file_name in [MATCH_RESULTS_FILE] + list(TABLE_FILES.values()):
+        shutil.copy2(os.path.join(merge.base_dir, file_name), tmp_path / file_name)
+    return tmp_path
+
+def read_merged(output_path):
+    return pd.read_csv(output_path, dtype={"match_id": str}, low_memory=False)
+
+@pytest.mark.parametrize("snapshots", [False, True])
+def test_merge_keeps_one_row_per_match_across_chunk_sizes(match_data_dir, snapshots):
+    matches = pd.read_csv(match_data_dir / MATCH_RESULTS_FILE, dtype={"match_id": str})
+
+    outputs = []
+    for chunk_size in (merge.DEFAULT_CHUNK_SIZE, 1000, 337):
+        output_path = str(match_data_dir / f"merged_{chunk_size}.csv")
+        merge.merge(str(match_data_dir), output_path, chunk_size, "csv", snapshots)
+        merged = read_merged(output_path)
+        assert len(merged) == len(matches)
+        assert merged["match_id"].tolist() == matches["match_id"].tolist()
+        outputs.append(merged)
+
+    for merged in outputs[1:]:
+        pd.testing.assert_frame_equal(merged, outputs[0])
+
+def test_duplicate_lookup_keys_fail_before_merging():
+    venues = pd.DataFrame({"venue": ["Eden Gardens", "Eden Gardens", "Lord's"], "matches_played": [10, 12, 30]})
+    with pytest.raises(ValueError, match="venue_statistics has 2 rows"):
+        merge.check_unique_keys(venues, ["venue"], "venue_statistics")
+    merge.check_unique_keys(venues.drop_duplicates("venue"), ["venue"], "venue_statistics")
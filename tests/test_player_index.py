@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from player_index import read_player_table
+
+def test_read_player_table_compacts_every_column(tmp_path):
+    # 'nationality' is not a known text column, so it is read as the default string dtype
+    file_path = tmp_path / 't20_batting.csv'
+    file_path.write_text("player,nationality,total_runs,batting_average\n"
+                         "SPD Smith,Australia,1090,20.5\n"
+                         "V Kohli,India,4188,48.7\n", encoding='utf-8')
+
+    df = read_player_table(str(file_path))
+    for column in ('player', 'nationality'):
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+    for column in ('total_runs', 'batting_average'):
+        assert df[column].dtype == np.float32
+    assert df['nationality'].tolist() == ['Australia', 'India']
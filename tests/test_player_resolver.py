@@ -0,0 +1,30 @@
+import pytest
+
+from player_resolver import PlayerResolver
+
+@pytest.fixture(scope='module')
+def resolver():
+    return PlayerResolver.load(cache_path=None)
+
+@pytest.mark.parametrize('name, team, expected', [
+    ('Rohit Sharma', 'India', 'RG Sharma'),
+    ('Khaleel Ahmed', 'India', 'KK Ahmed'),
+    ('Khaled Ahmed', 'Bangladesh', 'Khaled Ahmed'),
+    ('Rohit Sharma', 'Singapore', 'R Sharma'),
+])
+def test_team_hint_picks_between_compatible_players(resolver, name, team, expected):
+    assert resolver.resolve(name, team) == expected
+
+@pytest.mark.parametrize('name, team', [
+    ('Rohit Sharma', None),
+    ('Rohit Sharma', 'Mumbai Indians'),
+    ('Khaleel Ahmed', None),
+    ('Khaleel Ahmed', 'Chennai Super Kings'),
+])
+def test_ambiguous_names_do_not_guess(resolver, name, team):
+    # Several registry players fit and the hint (none, or a franchise) can't separate them
+    assert resolver.resolve(name, team) is None
+
+def test_unique_matches_resolve_without_a_hint(resolver):
+    assert resolver.resolve('RG Sharma') == 'RG Sharma'
+    assert resolver.resolve('Abhishek Sharma') == 'Abhishek Sharma'
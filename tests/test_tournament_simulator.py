@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from tournament_simulator import group_fixtures, load_fixture_tournaments, playoff_format, simulate_tournament
+
+def round_robin(teams, probability=0.6):
+    """Every pair of teams once, the first-listed team winning with the given probability"""
+    return [(team1, team2, probability) for i, team1 in enumerate(teams) for team2 in teams[i + 1:]]
+
+def test_same_seed_gives_identical_odds():
+    fixtures = round_robin(['A', 'B', 'C', 'D', 'E', 'F'])
+    first = simulate_tournament(fixtures, simulations=5000, seed=7, chunk_size=1000)
+    assert simulate_tournament(fixtures, simulations=5000, seed=7, chunk_size=1000) == first
+    assert simulate_tournament(fixtures, simulations=5000, seed=8, chunk_size=1000) != first
+    assert sum(team['title'] for team in first.values()) == pytest.approx(100)
+
+@pytest.mark.parametrize('teams, rules, expected', [
+    (3, {}, (2, 'knockout')),                                    # default 4 qualifiers, 3 teams
+    (5, {'qualifiers': 8}, (4, 'knockout')),
+    (3, {'playoffs': 'ipl'}, (2, 'knockout')),
+    (2, {'playoffs': 'ipl', 'qualifiers': 1}, (1, 'none')),
+    (10, {'playoffs': 'ipl'}, (4, 'ipl')),
+    (10, {'playoffs': 'ipl', 'qualifiers': 6}, (4, 'knockout')),  # IPL format needs exactly 4 qualifiers
+    (10, {'playoffs': 'ipl', 'qualifiers': 2}, (2, 'knockout')),
+])
+def test_playoffs_fit_the_number_of_teams(teams, rules, expected):
+    team_names = [f"Team {i}" for i in range(teams)]
+    full_rules = {'points_for_win': 2, 'qualifiers': 4, 'playoffs': 'knockout', 'standings': {}, **rules}
+    assert playoff_format(full_rules, teams) == expected
+
+    odds = simulate_tournament(round_robin(team_names), rules, simulations=2000, chunk_size=500)
+    assert sum(team['title'] for team in odds.values()) == pytest.approx(100)
+    assert sum(team['qualify'] for team in odds.values()) == pytest.approx(expected[0] * 100)
+
+def test_fixtures_without_a_tournament_are_not_pooled(tmp_path):
+    matches = [
+        {'tournament': 'Cup', 'details': {'matchInfo': {'matchId': 1}}},
+        {'details': {'matchInfo': {'matchId': 2, 'series': {'name': 'Series 2025'}}}},
+        {'details': {'matchInfo': {'matchId': 3}}},
+    ]
+    matches_path = tmp_path / 'matches.json'
+    matches_path.write_text(json.dumps(matches), encoding='utf-8')
+    assert load_fixture_tournaments(str(matches_path)) == {1: 'Cup', 2: 'Series 2025'}
+
+    predictions = [{'match_id': match_id, 'teams': {'team1': 'A', 'team2': 'B'}, 'probabilities': {'A': 60.0}}
+                   for match_id in (1, 2, 3)]
+    grouped = group_fixtures(predictions, load_fixture_tournaments(str(matches_path)))
+    assert grouped == {'Cup': [('A', 'B', 0.6)], 'Series 2025': [('A', 'B', 0.6)]}
@@ -0,0 +1,94 @@
+import os
+import json
+
+def run_main(vr_data, **kwargs):
+    vr_data.main(**kwargs)
+    with open(f"{vr_data.OUTPUT_DIR}/top_players.json", 'r', encoding='utf-8') as f:
+        return json.load(f)['topPlayers']
+
+def test_delivery_cache_path_matches_file_parse(vr_data):
+    from_files = vr_data.collect_player_stats()
+    assert from_files, "fixture archive has no relevant matches"
+    from_cache = vr_data.collect_player_stats_from_cache()
+    # Same players, first seen in the same order, with identical totals and shots
+    assert list(from_cache) == list(from_files)
+    assert from_cache == from_files
+    assert run_main(vr_data, use_cache=True) == run_main(vr_data)
+
+def test_probe_reads_the_same_info_as_a_full_parse(vr_data):
+    file_names = sorted(os.listdir(vr_data.DATA_DIR))
+    for file_name in file_names:
+        file_path = os.path.join(vr_data.DATA_DIR, file_name)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)['info']
+        # A tiny chunk size forces the probe to grow its buffer across many reads
+        assert vr_data.probe_match_info(file_path) == info
+        assert vr_data.probe_match_info(file_path, chunk_size=64) == info
+
+def test_probe_rejection_matches_full_parse(vr_data, tmp_path):
+    for file_name in sorted(os.listdir(vr_data.DATA_DIR)):
+        file_path = os.path.join(vr_data.DATA_DIR, file_name)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            match_data = json.load(f)
+        player_stats, match_info = vr_data.process_match_data(file_path)
+        assert bool(player_stats) == vr_data.is_relevant_match(match_data['info'])
+        assert match_info == vr_data.get_match_info(match_data['info'])
+
+    # No header to probe: falls back to the full parse instead of failing
+    headerless = tmp_path / 'headerless.json'
+    headerless.write_text('{"innings": []}', encoding='utf-8')
+    assert vr_data.probe_match_info(str(headerless)) is None
+
+def test_parallel_main_matches_serial(vr_data):
+    serial = run_main(vr_data, workers=1)
+    assert serial
+    assert run_main(vr_data, workers=2) == serial
+
+def test_strike_rate_uses_real_balls_faced(vr_data, tmp_path):
+    delivery = lambda batter, runs, **extra: {"batter": batter, "bowler": "B", "non_striker": "N",
+                                              "runs": {"batter": runs, "extras": 0, "total": runs}, **extra}
+    match = {
+        "info": {"dates": ["2024-01-01"], "teams": ["India", "Australia"], "venue": "V", "match_type": "T20"},
+        "innings": [{"team": "India", "overs": [{"over": 0, "deliveries": [
+            delivery("A", 4),
+            delivery("A", 0, extras={"wides": 1}),    # not a ball faced
+            delivery("A", 6, extras={"noballs": 1}),  # a ball faced
+            delivery("A", 1),
+            delivery("A", 0, wickets=[{"player_out": "A", "kind": "bowled"}]),
+        ]}]}]
+    }
+    match_path = tmp_path / 'synthetic.json'
+    match_path.write_text(json.dumps(match), encoding='utf-8')
+
+    stats = vr_data.process_match_data(str(match_path))[0]["A"]
+    assert (stats['runs'], stats['balls_faced'], stats['dismissals']) == (11, 4, 1)
+    assert (stats['fours'], stats['sixes']) == (1, 1)
+    assert vr_data.batting_rates(11, 4, 1) == (11.0, 275.0)
+    # Never dismissed: the average is the runs scored
+    assert vr_data.batting_rates(30, 20, 0) == (30.0, 150.0)
+
+def test_both_dismissals_on_one_ball_are_counted(vr_data):
+    import delivery_cache
+
+    delivery = lambda batter, runs, **extra: {"batter": batter, "bowler": "Bowler X", "non_striker": "Batter N",
+                                              "runs": {"batter": runs, "extras": 0, "total": runs}, **extra}
+    match = {
+        "info": {"dates": ["2099-01-01"], "teams": ["India", "Australia"], "venue": "V", "match_type": "T20"},
+        "innings": [{"team": "India", "overs": [{"over": 0, "deliveries": [
+            delivery("Batter A", 4),
+            delivery("Batter A", 0, wickets=[{"player_out": "Batter A", "kind": "run out"},
+                                               {"player_out": "Batter N", "kind": "obstructing the field"}]),
+        ]}]}]
+    }
+    match_path = os.path.join(vr_data.DATA_DIR, 'zz_double_dismissal.json')
+    with open(match_path, 'w', encoding='utf-8') as f:
+        json.dump(match, f)
+
+    deliveries = delivery_cache.flatten_match(match_path)[1]
+    columns = list(delivery_cache.DELIVERY_DTYPES)
+    last_ball = dict(zip(columns, deliveries[-1]))
+    assert (last_ball['wickets'], last_ball['player_out'], last_ball['player_out_2']) == (2, 'Batter A', 'Batter N')
+
+    from_files = vr_data.collect_player_stats()
+    assert [(from_files[player]['dismissals'], from_files[player]['balls_faced']) for player in ('Batter A', 'Batter N')] == [(1, 2), (1, 0)]
+    assert vr_data.collect_player_stats_from_cache() == from_files